@@ -1,5 +1,6 @@
-from notethis.app import main
-
-
 if __name__ == "__main__":
+    # Imported here so spawned export workers, which re-run this script as
+    # __mp_main__, do not load the Tk application.
+    from notethis.app import main
+
     main()
@@ -0,0 +1,143 @@
+"""Synthetic note corpora for the benchmarks.
+
+Notes look like the ones the app writes: headings, checkbox, numbered and
+bullet lists, participant lines, token placeholders and variable
+declarations. Generation is seeded, so a corpus can be rebuilt exactly.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import math
+import random
+
+from notethis.paths import FILE_PREFIX, FILE_SUFFIX
+
+TOKEN_NAMES = ("TODAY", "YEAR", "WEEK", "APP", "USER", "NOTE_ID", "CREATED_AT", "UPDATED_AT")
+TOKENS_CONFIG = {
+    "globals": {"APP": "NoteThis", "USER": "Benchmark"},
+    "tokens": {
+        "date": {
+            "TODAY": {"source": "date", "format": "%Y-%m-%d"},
+            "YEAR": {"source": "date", "format": "%Y"},
+            "WEEK": {"source": "date", "format": "%V"},
+        },
+        "note": {
+            "NOTE_ID": {"source": "note_id"},
+            "CREATED_AT": {"source": "created_at", "format": "%Y-%m-%d %H:%M"},
+            "UPDATED_AT": {"source": "updated_at", "format": "%Y-%m-%d %H:%M"},
+        },
+    },
+}
+WORDS = (
+    "möte", "projekt", "anteckning", "beslut", "uppföljning", "budget", "plan", "risk", "kund", "leverans",
+    "vecka", "mål", "idé", "fråga", "svar", "utkast", "granskning", "test", "release", "dokument",
+)
+NAMES = ("Anna", "Björn", "Cecilia", "David", "Elin", "Fredrik", "Greta", "Hugo")
+
+KB = 1024
+MB = 1024 * KB
+LARGE_CHUNK_SIZE = 256 * KB
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def note_blocks(rng: random.Random):
+    """Yield an endless stream of markdown blocks."""
+    yield f'[€ projekt = "{rng.choice(WORDS)} {rng.randint(1, 99)}"]'
+    yield f"# {sentence(rng, 4)} [TODAY]"
+    while True:
+        kind = rng.random()
+        if kind < 0.15:
+            yield f"{'#' * rng.randint(2, 4)} {sentence(rng, 3)}"
+        elif kind < 0.35:
+            yield "\n".join(f"- [ ] {sentence(rng, rng.randint(3, 8))}" for _ in range(rng.randint(2, 6)))
+        elif kind < 0.5:
+            yield "\n".join(f"{index}. {sentence(rng, rng.randint(3, 8))}" for index in range(1, rng.randint(3, 7)))
+        elif kind < 0.6:
+            participants = rng.sample(NAMES, rng.randint(2, len(NAMES)))
+            yield ", ".join(f'"{name}" <{name.lower()}@example.com>' for name in participants)
+        elif kind < 0.75:
+            yield f"{sentence(rng, 6)} [{rng.choice(TOKEN_NAMES)}] €projekt {sentence(rng, 4)}."
+        else:
+            yield f"{sentence(rng, rng.randint(10, 40))}."
+
+
+def generate_note(size_bytes: int, rng: random.Random) -> str:
+    parts: list[str] = []
+    length = 0
+    for block in note_blocks(rng):
+        parts.append(block)
+        length += len(block.encode("utf-8")) + 2
+        if length >= size_bytes:
+            break
+    return "\n\n".join(parts)
+
+
+def note_sizes(count: int, min_size: int, max_size: int, rng: random.Random) -> list[int]:
+    """Log-uniform sizes: most notes are small, a few are very large."""
+    if count <= 0:
+        return []
+    low, high = math.log(min_size), math.log(max(max_size, min_size))
+    sizes = [int(math.exp(rng.uniform(low, high))) for _ in range(count)]
+    sizes[rng.randrange(count)] = max_size
+    return sizes
+
+
+def generate_corpus(
+    target_dir: Path,
+    count: int,
+    min_size: int = 1 * KB,
+    max_size: int = 64 * KB,
+    seed: int = 1,
+) -> list[Path]:
+    rng = random.Random(seed)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    # Large notes share generated text so a 10 MB corpus does not take
+    # minutes to build; content variety only matters for the small ones.
+    large_chunk: str | None = None
+    for number, size in enumerate(note_sizes(count, min_size, max_size, rng), start=1):
+        if size > LARGE_CHUNK_SIZE:
+            if large_chunk is None:
+                large_chunk = generate_note(LARGE_CHUNK_SIZE, rng) + "\n\n"
+            text = large_chunk * (size // LARGE_CHUNK_SIZE)
+        else:
+            text = generate_note(size, rng)
+        path = target_dir / f"{FILE_PREFIX}{number:03d}{FILE_SUFFIX}"
+        path.write_text(text + "\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def write_tokens_config(path: Path) -> Path:
+    path.write_text(json.dumps(TOKENS_CONFIG, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().upper()
+    for suffix, factor in (("MB", MB), ("KB", KB), ("B", 1)):
+        if value.endswith(suffix):
+            return int(float(value[: -len(suffix)]) * factor)
+    return int(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Skapa en syntetisk korpus av anteckningar.")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--notes", type=int, default=100)
+    parser.add_argument("--min-size", type=parse_size, default=1 * KB)
+    parser.add_argument("--max-size", type=parse_size, default=64 * KB)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    paths = generate_corpus(args.output, args.notes, args.min_size, args.max_size, args.seed)
+    write_tokens_config(args.output / "tokens.json")
+    print(f"{len(paths)} anteckningar i {args.output}")
+
+
+if __name__ == "__main__":
+    main()
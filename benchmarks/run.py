@@ -0,0 +1,273 @@
+"""Time the hot paths of NoteThis on a synthetic corpus and write JSON.
+
+    python -m benchmarks.run --preset quick --output results.json
+    python -m benchmarks.run --preset standard --compare results.json
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from notethis import note_index
+from notethis import storage
+from notethis import text_tools
+from notethis import tokens
+
+from . import corpus
+
+RESULTS_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Preset:
+    notes: int
+    min_size: int
+    max_size: int
+    large_note: int
+    repeat: int
+    label_sample: int = 200
+
+
+PRESETS = {
+    "quick": Preset(notes=100, min_size=1 * corpus.KB, max_size=64 * corpus.KB, large_note=1 * corpus.MB, repeat=3),
+    "standard": Preset(notes=1_000, min_size=1 * corpus.KB, max_size=256 * corpus.KB, large_note=10 * corpus.MB, repeat=5),
+    "large": Preset(notes=100_000, min_size=1 * corpus.KB, max_size=4 * corpus.KB, large_note=10 * corpus.MB, repeat=3),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    runs: list[float]
+    params: dict = field(default_factory=dict)
+    skipped: str = ""
+
+    def summary(self) -> dict:
+        data = asdict(self)
+        if self.runs:
+            data.update(
+                min=min(self.runs),
+                median=statistics.median(self.runs),
+                mean=statistics.fmean(self.runs),
+            )
+        return data
+
+
+def time_runs(func: Callable[[], object], repeat: int, setup: Callable[[], object] | None = None) -> list[float]:
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+@contextmanager
+def notes_dir(path: Path) -> Iterator[None]:
+    previous = storage.NOTES_DIR
+    storage.NOTES_DIR = path
+    try:
+        yield
+    finally:
+        storage.NOTES_DIR = previous
+
+
+def git_revision() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return result.stdout.strip()
+
+
+def storage_benchmarks(notes: Path, preset: Preset) -> list[BenchmarkResult]:
+    results = []
+    with notes_dir(notes):
+        results.append(
+            BenchmarkResult(
+                "storage.list_note_files[cold]",
+                time_runs(storage.list_note_files, preset.repeat, setup=lambda: note_index.reset_index(notes)),
+                {"notes": preset.notes},
+            )
+        )
+        storage.list_note_files()
+        results.append(
+            BenchmarkResult(
+                "storage.list_note_files[warm]",
+                time_runs(storage.list_note_files, preset.repeat),
+                {"notes": preset.notes},
+            )
+        )
+        results.append(
+            BenchmarkResult("storage.next_note_file", time_runs(storage.next_note_file, preset.repeat), {"notes": preset.notes})
+        )
+
+        sample = sorted(notes.glob(f"{storage.FILE_PREFIX}*{storage.FILE_SUFFIX}"))[: preset.label_sample]
+
+        def label_sample() -> None:
+            storage.note_list_labels(sample)
+
+        results.append(BenchmarkResult("storage.note_list_labels", time_runs(label_sample, preset.repeat), {"files": len(sample)}))
+    return results
+
+
+def text_benchmarks(large_text: str, small_text: str, tokens_path: Path, preset: Preset) -> list[BenchmarkResult]:
+    results = []
+    now = datetime.now()
+    for label, text in (("small", small_text), ("large", large_text)):
+        params = {"bytes": len(text.encode("utf-8"))}
+        results.append(
+            BenchmarkResult(
+                f"tokens.apply_tokens[{label}]",
+                time_runs(
+                    lambda text=text: tokens.apply_tokens(text, tokens_path, Path("note_A001.md"), now, now, storage.FILE_PREFIX),
+                    preset.repeat,
+                ),
+                params,
+            )
+        )
+        results.append(
+            BenchmarkResult(
+                f"tokens.replace_dynamic_variables[{label}]",
+                time_runs(lambda text=text: tokens.replace_dynamic_variables(text), preset.repeat),
+                params,
+            )
+        )
+
+    participant_lines = [line for line in large_text.splitlines() if "@example.com" in line][:1000]
+    results.append(
+        BenchmarkResult(
+            "text_tools.parse_participant_list",
+            time_runs(lambda: [text_tools.parse_participant_list(line) for line in participant_lines], preset.repeat),
+            {"lines": len(participant_lines)},
+        )
+    )
+    return results
+
+
+def editor_benchmarks(large_text: str, preset: Preset) -> list[BenchmarkResult]:
+    names = (
+        "editor_ops.editor_text",
+        "editor_ops.apply_markdown_heading_styles",
+        "editor_ops.update_search_matches",
+    )
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+    except Exception as exc:
+        return [BenchmarkResult(name, [], skipped=f"Tk saknas: {exc}") for name in names]
+
+    from notethis import editor_ops
+    from notethis import search_engine
+
+    try:
+        root.withdraw()
+        widget = tk.Text(root)
+        widget.insert("1.0", large_text)
+        params = {"bytes": len(large_text.encode("utf-8"))}
+        query = search_engine.SearchQuery("projekt")
+
+        def search_fresh() -> None:
+            editor_ops.update_search_matches(widget, search_engine.SearchCache(), query)
+
+        return [
+            BenchmarkResult(names[0], time_runs(lambda: editor_ops.editor_text(widget), preset.repeat), params),
+            BenchmarkResult(
+                names[1], time_runs(lambda: editor_ops.apply_markdown_heading_styles(widget), preset.repeat), params
+            ),
+            BenchmarkResult(names[2], time_runs(search_fresh, preset.repeat), params),
+        ]
+    finally:
+        root.destroy()
+
+
+def run_benchmarks(preset: Preset, work_dir: Path, seed: int = 1) -> dict:
+    notes = work_dir / "notes"
+    corpus.generate_corpus(notes, preset.notes, preset.min_size, preset.max_size, seed)
+    tokens_path = corpus.write_tokens_config(work_dir / "tokens.json")
+    large_text = corpus.generate_corpus(work_dir / "large", 1, preset.large_note, preset.large_note, seed)[0].read_text(
+        encoding="utf-8"
+    )
+    small_text = corpus.generate_note(4 * corpus.KB, random.Random(seed))
+
+    results = storage_benchmarks(notes, preset)
+    results += text_benchmarks(large_text, small_text, tokens_path, preset)
+    results += editor_benchmarks(large_text, preset)
+    return {
+        "version": RESULTS_VERSION,
+        "revision": git_revision(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "preset": asdict(preset),
+        "results": [result.summary() for result in results],
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    previous = {result["name"]: result for result in baseline.get("results", [])}
+    lines = [f"{'benchmark':<44} {'före':>10} {'efter':>10} {'kvot':>7}"]
+    for result in current["results"]:
+        old = previous.get(result["name"])
+        if "median" not in result or old is None or "median" not in old:
+            continue
+        ratio = result["median"] / old["median"] if old["median"] else float("inf")
+        lines.append(f"{result['name']:<44} {old['median'] * 1000:9.2f}ms {result['median'] * 1000:9.2f}ms {ratio:6.2f}x")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Mät NoteThis på en syntetisk korpus.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--notes", type=int, help="ersätt antalet anteckningar i presetet")
+    parser.add_argument("--repeat", type=int, help="ersätt antalet upprepningar i presetet")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--compare", type=Path, help="tidigare resultatfil att jämföra med")
+    args = parser.parse_args(argv)
+
+    preset = PRESETS[args.preset]
+    if args.notes is not None:
+        preset = replace(preset, notes=args.notes)
+    if args.repeat is not None:
+        preset = replace(preset, repeat=args.repeat)
+
+    with tempfile.TemporaryDirectory(prefix="notethis-bench-") as work_dir:
+        report = run_benchmarks(preset, Path(work_dir), args.seed)
+    storage.flush_backups()
+
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    for result in report["results"]:
+        if result["skipped"]:
+            print(f"{result['name']:<44} hoppades över ({result['skipped']})")
+        else:
+            print(f"{result['name']:<44} median {result['median'] * 1000:9.2f} ms")
+    if args.compare is not None:
+        print()
+        print(compare(report, json.loads(args.compare.read_text(encoding="utf-8"))))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1 +1,12 @@
 """NoteThis package."""
+
+# Imported first so startup measurements begin with the package itself.
+from . import startup_timing  # noqa: F401
+
+
+def main() -> None:
+    # Imported on demand so that importing the package (for example from the
+    # command line interface) does not load tkinter.
+    from .app import main as run_app
+
+    run_app()
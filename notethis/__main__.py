@@ -1,5 +1,5 @@
-from .app import main
+from .cli import main
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -1,6 +1,6 @@
 from pathlib import Path
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import re
 import sys
 import tkinter as tk
@@ -8,30 +8,67 @@ import tkinter.font as tkfont
 from tkinter import messagebox
 from tkinter import ttk
 
-from . import dialogs
+from . import autosave
+from . import config_cache
+from . import diagnostics
+from . import editor_changes
 from . import editor_ops
-from . import exporting
+from . import editor_stats
+from . import fs_watcher
+from . import large_file
 from . import lifecycle
+from . import refresh_scheduler
+from . import search_engine
+from . import session
 from . import settings_store
+from . import startup_timing
 from . import storage
 from . import tokens
 from . import ui_tooltips
 from . import text_tools
-from .paths import AUTOSAVE_INTERVAL_MINUTES, AUTOSAVE_INTERVAL_MS, FILE_PREFIX, TOKENS_CONFIG_PATH
-
-@dataclass
+from .text_tools import EMPTY_BASELINE, ContentBaseline
+from .paths import (
+    AUTOSAVE_INTERVAL_MINUTES,
+    AUTOSAVE_INTERVAL_MS,
+    BACKUP_COUNT,
+    FILE_PREFIX,
+    TOKENS_CONFIG_PATH,
+    TOOLTIPS_CONFIG_PATH,
+    USER_SETTINGS_PATH,
+)
+
+# dialogs and export_ui (and through them markdown, batch export and the PDF
+# engine) are imported inside the functions that open them, so they are only
+# loaded the first time they are used.
+
+@dataclass(slots=True)
 class DocumentState:
     file_path: Path | None
     created_at: datetime | None
-    last_saved_text: str
     text_widget: tk.Text
+    changes: editor_changes.ChangeTracker
+    # What was last written to disk, as length and digest: the Text widget
+    # already holds the text, so the state does not keep a second copy.
+    saved: ContentBaseline = EMPTY_BASELINE
+    pending_heading_lines: tuple[int, int] | None = None
+    needs_full_restyle: bool = True
+    stats: editor_stats.DocumentStats = field(default_factory=editor_stats.DocumentStats)
+    search: search_engine.SearchCache = field(default_factory=search_engine.SearchCache)
+    loading: large_file.ChunkedLoad | None = None
+
+    def is_dirty(self) -> bool:
+        # A note still being inserted is neither saved nor edited yet.
+        return self.loading is None and self.changes.is_dirty()
 
 
 notebook = None
 doc_states: dict[str, DocumentState] = {}
+# Restored tabs without a Text widget yet; each is built on first selection.
+placeholder_tabs: dict[str, session.TabSession] = {}
 native_menubar = None
 menu_widgets: list[tk.Menu] = []
 custom_menubar = None
+editor_refresh: refresh_scheduler.RefreshScheduler | None = None
 
 document_label = None
 status_label = None
@@ -47,7 +84,16 @@ base_font_sizes = {}
 heading_fonts = {}
 current_theme_name = "light"
 theme_mode = "light"
+search_regex = False
+search_case_sensitive = False
+backup_count = BACKUP_COUNT
 user_settings = {}
+autosaver = autosave.AutosaveWorker()
+token_submenus: list[tk.Menu] = []
+TOKEN_MENU_START = 3
+STARTUP_FALLBACK_MS = 2000
+autosave_poll_scheduled = False
+notes_watcher: fs_watcher.InotifyWatcher | fs_watcher.PollingWatcher | None = None
 
 THEMES = {
     "light": {
@@ -207,6 +253,8 @@ def current_tab_id() -> str:
 
 def current_state() -> DocumentState:
     tab_id = current_tab_id()
+    if tab_id in placeholder_tabs:
+        return materialize_tab(tab_id)
     if not tab_id or tab_id not in doc_states:
         raise RuntimeError("Ingen aktiv flik.")
     return doc_states[tab_id]
@@ -218,21 +266,22 @@ def current_text_area() -> tk.Text:
 
 def update_tab_title(tab_id: str, state: DocumentState) -> None:
     name = state.file_path.name if state.file_path is not None else "Nytt"
-    dirty_marker = " *" if editor_ops.is_dirty(state.text_widget, state.last_saved_text) else ""
+    dirty_marker = " *" if state.is_dirty() else ""
     notebook.tab(tab_id, text=f"{name}{dirty_marker}")
 
 
 def bind_editor_events(text_widget: tk.Text) -> None:
-    text_widget.bind("<KeyRelease>", lambda _event: refresh_editor_state())
     text_widget.bind("<Return>", handle_return_key)
     text_widget.bind("<Control-z>", undo_last_change)
+    text_widget.bind("<<Selection>>", lambda _event: request_refresh("stats", debounce=True))
     text_widget.bind("<Control-Z>", undo_last_change)
 
 
-def create_tab(title: str = "Nytt", text: str = "") -> str:
-    frame = tk.Frame(notebook)
+def build_editor(frame: tk.Frame, text: str = "") -> DocumentState:
     text_widget = tk.Text(frame, wrap="word", font="TkTextFont", undo=True, maxundo=10, autoseparators=True)
     text_widget.pack(fill="both", expand=True, padx=12, pady=(0, 12))
+    changes = editor_changes.ChangeTracker()
+    changes.attach(text_widget)
     text_widget.insert("1.0", text)
     text_widget.tag_configure("search_match", background=current_theme()["search_match"])
     bind_editor_events(text_widget)
@@ -240,26 +289,117 @@ def create_tab(title: str = "Nytt", text: str = "") -> str:
     state = DocumentState(
         file_path=None,
         created_at=None,
-        last_saved_text="",
         text_widget=text_widget,
+        changes=changes,
     )
+    changes.reset_baseline()
+    changes.add_listener(lambda event: handle_document_edit(state, event))
+    doc_states[str(frame)] = state
+    configure_heading_fonts()
+    apply_theme(frame)
+    return state
+
+
+def create_tab(title: str = "Nytt", text: str = "") -> str:
+    frame = tk.Frame(notebook)
     notebook.add(frame, text=title)
+    build_editor(frame, text)
     tab_id = str(frame)
-    doc_states[tab_id] = state
     notebook.select(tab_id)
-    text_widget.focus_set()
-    configure_heading_fonts()
-    apply_theme(frame)
+    doc_states[tab_id].text_widget.focus_set()
     return tab_id
 
 
-def close_current_tab() -> None:
-    if not doc_states:
+def add_placeholder_tab(tab: session.TabSession) -> str:
+    frame = tk.Frame(notebook)
+    notebook.add(frame, text=tab.path.name)
+    tab_id = str(frame)
+    placeholder_tabs[tab_id] = tab
+    return tab_id
+
+
+def materialize_tab(tab_id: str) -> DocumentState:
+    tab = placeholder_tabs.pop(tab_id)
+    state = build_editor(notebook.nametowidget(tab_id))
+    try:
+        open_note_file(tab.path, state, view=tab)
+    except OSError:
+        set_status(f"Kunde inte läsa {tab.path.name}")
+    return state
+
+
+def restore_view(state: DocumentState, view: session.TabSession) -> None:
+    widget = state.text_widget
+    widget.mark_set(tk.INSERT, view.cursor)
+    # The widget may not have its final size yet; scroll once it is laid out.
+    widget.after_idle(lambda: widget.yview_moveto(view.yview))
+
+
+def ensure_open_tab() -> None:
+    if not notebook.tabs():
+        create_tab()
+
+
+def forget_tab(tab_id: str) -> None:
+    notebook.forget(tab_id)
+    state = doc_states.pop(tab_id, None)
+    if state is not None:
+        state.changes.detach()
+    placeholder_tabs.pop(tab_id, None)
+    notebook.nametowidget(tab_id).destroy()
+
+
+def capture_session() -> session.Session:
+    tabs: list[session.TabSession] = []
+    selected = 0
+    selected_tab = current_tab_id()
+    for tab_id in notebook.tabs():
+        tab_id = str(tab_id)
+        if tab_id in placeholder_tabs:
+            tab = placeholder_tabs[tab_id]
+        else:
+            state = doc_states.get(tab_id)
+            if state is None or state.file_path is None:
+                continue
+            widget = state.text_widget
+            tab = session.TabSession(state.file_path, widget.index(tk.INSERT), widget.yview()[0])
+        if tab_id == selected_tab:
+            selected = len(tabs)
+        tabs.append(tab)
+    return session.Session(tuple(tabs), selected)
+
+
+def save_session() -> None:
+    if notebook is None:
+        return
+    stored = session.session_to_settings(capture_session(), storage.NOTES_DIR)
+    if user_settings.get(session.SESSION_KEY) != stored:
+        user_settings[session.SESSION_KEY] = stored
+        settings_store.save_user_settings(user_settings)
+
+
+def restore_session() -> None:
+    saved = session.session_from_settings(user_settings.get(session.SESSION_KEY), storage.NOTES_DIR)
+    if not saved.tabs:
+        create_tab()
         return
+    tab_ids = [add_placeholder_tab(tab) for tab in saved.tabs]
+    notebook.select(tab_ids[saved.selected])
+    current_text_area().focus_set()
+
 
+def close_current_tab() -> None:
     tab_id = current_tab_id()
+    if not tab_id:
+        return
+    if tab_id in placeholder_tabs:
+        forget_tab(tab_id)
+        ensure_open_tab()
+        refresh_editor_state()
+        return
+
     state = doc_states[tab_id]
-    if editor_ops.is_dirty(state.text_widget, state.last_saved_text):
+    if state.is_dirty():
         choice = messagebox.askyesnocancel(
             "Spara ändringar",
             "Du har osparade ändringar i fliken. Vill du spara innan du stänger?",
@@ -270,11 +410,8 @@ def close_current_tab() -> None:
             if not save_note(state=state):
                 return
 
-    notebook.forget(tab_id)
-    doc_states.pop(tab_id, None)
-
-    if not doc_states:
-        create_tab()
+    forget_tab(tab_id)
+    ensure_open_tab()
     refresh_editor_state()
 
 def get_system_theme_name() -> str:
@@ -305,6 +442,8 @@ def apply_theme_mode(window: tk.Widget) -> None:
 
 
 def open_about_dialog(window: tk.Tk) -> None:
+    from . import dialogs
+
     dialogs.open_about_dialog(window, apply_theme, attach_tooltip)
 
 
@@ -323,21 +462,28 @@ def set_theme_mode(window: tk.Widget, mode: str) -> None:
 
 
 def is_dirty() -> bool:
-    state = current_state()
-    return editor_ops.is_dirty(state.text_widget, state.last_saved_text)
+    return current_state().is_dirty()
 
 
 def update_document_label() -> None:
     state = current_state()
     name = state.file_path.name if state.file_path is not None else "Nytt"
-    dirty_marker = " *" if editor_ops.is_dirty(state.text_widget, state.last_saved_text) else ""
+    dirty_marker = " *" if state.is_dirty() else ""
     document_label.config(text=f"Dokument: {name}{dirty_marker}")
     update_tab_title(current_tab_id(), state)
 
 
 def update_document_stats() -> None:
-    words, characters = editor_ops.update_document_stats(current_text_area())
-    stats_label.config(text=f"Ord: {words}  Tecken: {characters}")
+    state = current_state()
+    if state.loading is not None:
+        stats_label.config(text=f"Läser in: {state.loading.percent} %")
+        return
+    words, characters = state.stats.counts(lambda: editor_ops.editor_raw_text(state.text_widget))
+    label = f"Ord: {words}  Tecken: {characters}"
+    selection = editor_ops.selection_stats(state.text_widget)
+    if selection is not None:
+        label += f"  (markerat: {selection[0]} / {selection[1]})"
+    stats_label.config(text=label)
 
 
 def init_ui_scale() -> None:
@@ -399,8 +545,41 @@ def configure_heading_fonts() -> None:
         state.text_widget.tag_configure("md_h4", font=heading_fonts["h4"])
 
 
+def handle_document_edit(state: DocumentState, event: editor_changes.EditEvent) -> None:
+    state.search.note_edit(event)
+    state.stats.note_edit(event)
+    if not state.needs_full_restyle:
+        state.pending_heading_lines = editor_changes.merge_pending_lines(state.pending_heading_lines, event)
+    if doc_states.get(current_tab_id()) is state:
+        request_refresh("headings", "label", "stats", "search", "status", debounce=True)
+
+
 def apply_markdown_heading_styles() -> None:
-    editor_ops.apply_markdown_heading_styles(current_text_area())
+    state = current_state()
+    if state.loading is not None:
+        # The loader styles each chunk as it is inserted.
+        state.pending_heading_lines = None
+        return
+    if state.needs_full_restyle:
+        editor_ops.apply_markdown_heading_styles(state.text_widget)
+    elif state.pending_heading_lines is not None:
+        first_line, last_line = state.pending_heading_lines
+        editor_ops.restyle_heading_lines(state.text_widget, first_line, last_line)
+    state.needs_full_restyle = False
+    state.pending_heading_lines = None
+
+
+def set_search_option(name: str, value: bool) -> None:
+    global search_regex, search_case_sensitive
+    if name == "search_regex":
+        search_regex = value
+    elif name == "search_case_sensitive":
+        search_case_sensitive = value
+    else:
+        return
+    user_settings[name] = value
+    settings_store.save_user_settings(user_settings)
+    request_refresh("search", "status")
 
 
 def render_status_line() -> None:
@@ -413,10 +592,20 @@ def render_status_line() -> None:
 def update_search_matches() -> int:
     global search_status_message
 
-    query = search_entry.get().strip()
-    matches = editor_ops.update_search_matches(current_text_area(), query, tag="search_match")
+    query = search_engine.SearchQuery(search_entry.get().strip(), search_regex, search_case_sensitive)
+    state = current_state()
+    try:
+        if state.loading is not None:
+            matches = editor_ops.tag_visible_search_matches(state.text_widget, query, tag="search_match")
+            search_status_message = f"Sök: {matches} synliga träffar (läser in)" if query.text else ""
+            return matches
+        matches = editor_ops.update_search_matches(state.text_widget, state.search, query, tag="search_match")
+    except re.error:
+        search_status_message = "Sök: ogiltigt reguljärt uttryck"
+        return 0
+
     if matches == 0:
-        search_status_message = "" if not query else "Sök: 0 träffar (tips: kontrollera stavning)"
+        search_status_message = "" if not query.text else "Sök: 0 träffar (tips: kontrollera stavning)"
     elif matches == 1:
         search_status_message = "Sök: 1 träff"
     else:
@@ -425,27 +614,39 @@ def update_search_matches() -> int:
     return matches
 
 
-def refresh_editor_state() -> None:
+def run_document_stage(stage) -> None:
+    if notebook is None or not doc_states:
+        return
+    stage()
+
+
+def render_status_stage() -> None:
     if notebook is None or not doc_states:
         if status_label is not None:
             status_label.config(text=base_status_message)
         return
-    apply_markdown_heading_styles()
-    update_document_label()
-    update_document_stats()
-    update_search_matches()
     render_status_line()
 
 
+def request_refresh(*stages: str, debounce: bool = False) -> None:
+    if editor_refresh is not None:
+        editor_refresh.request(*stages, debounce=debounce)
+
+
+def refresh_editor_state() -> None:
+    request_refresh()
+
+
 def handle_tab_changed(_event=None) -> None:
-    refresh_editor_state()
+    # Selecting a restored tab builds its editor and reads its note.
     current_text_area().focus_set()
+    refresh_editor_state()
 
 
 def set_status(message: str) -> None:
     global base_status_message
     base_status_message = message
-    refresh_editor_state()
+    request_refresh("label", "status")
 
 
 def undo_last_change(_event=None) -> str:
@@ -458,9 +659,22 @@ def undo_last_change(_event=None) -> str:
     return "break"
 
 
+def apply_saved_text(state: DocumentState, text: str, resolved_text: str, saved: ContentBaseline) -> None:
+    state.saved = saved
+    if resolved_text != text:
+        state.text_widget.delete("1.0", tk.END)
+        state.text_widget.insert("1.0", resolved_text)
+        state.needs_full_restyle = True
+    state.changes.mark_saved(resolved_text, saved.digest)
+
+
 def save_note(show_empty_warning: bool = True, autosave: bool = False, state: DocumentState | None = None) -> bool:
     if state is None:
         state = current_state()
+    if state.loading is not None:
+        set_status(f"Vänta, anteckningen läses in ({state.loading.percent} %)")
+        return False
+    settle_autosave(state)
 
     text = editor_ops.editor_text(state.text_widget)
     if not text:
@@ -474,24 +688,26 @@ def save_note(show_empty_warning: bool = True, autosave: bool = False, state: Do
     if state.file_path is None:
         state.file_path = storage.next_note_file()
 
-    resolved_text = tokens.apply_tokens(
-        text=text,
-        config_path=TOKENS_CONFIG_PATH,
-        file_path=state.file_path,
-        created_at=state.created_at,
-        updated_at=datetime.now(),
-        file_prefix=FILE_PREFIX,
-    )
+    with diagnostics.measure("save_note.tokens"):
+        resolved_text = tokens.apply_tokens(
+            text=text,
+            config_path=TOKENS_CONFIG_PATH,
+            file_path=state.file_path,
+            created_at=state.created_at,
+            updated_at=datetime.now(),
+            file_prefix=FILE_PREFIX,
+        )
 
-    if resolved_text == state.last_saved_text:
+    if state.saved.matches(resolved_text):
+        if resolved_text == text:
+            state.changes.mark_saved(text, state.saved.digest)
         return False
 
-    storage.write_note_file(state.file_path, resolved_text, create_backup=autosave)
-    state.last_saved_text = resolved_text
-
-    if resolved_text != text:
-        state.text_widget.delete("1.0", tk.END)
-        state.text_widget.insert("1.0", resolved_text)
+    saved = ContentBaseline.of(resolved_text)
+    with diagnostics.measure("save_note.write"):
+        storage.write_note_file(state.file_path, resolved_text, create_backup=autosave, backup_count=backup_count)
+    with diagnostics.measure("save_note.apply"):
+        apply_saved_text(state, text, resolved_text, saved)
 
     status = "Autosparad" if autosave else "Sparad"
     set_status(f"{status}: {state.file_path.name}")
@@ -500,6 +716,10 @@ def save_note(show_empty_warning: bool = True, autosave: bool = False, state: Do
 
 def save_note_as_copy() -> bool:
     state = current_state()
+    if state.loading is not None:
+        set_status(f"Vänta, anteckningen läses in ({state.loading.percent} %)")
+        return False
+    settle_autosave(state)
 
     text = editor_ops.editor_text(state.text_widget)
     if not text:
@@ -517,38 +737,107 @@ def save_note_as_copy() -> bool:
         file_prefix=FILE_PREFIX,
     )
 
-    new_file_path.write_text(resolved_text + "\n", encoding="utf-8")
+    storage.write_note_file(new_file_path, resolved_text)
     state.file_path = new_file_path
     state.created_at = new_created_at
-    state.last_saved_text = resolved_text
-
-    if resolved_text != text:
-        state.text_widget.delete("1.0", tk.END)
-        state.text_widget.insert("1.0", resolved_text)
+    apply_saved_text(state, text, resolved_text, ContentBaseline.of(resolved_text))
 
     set_status(f"Sparad som: {state.file_path.name}")
     state.text_widget.focus_set()
     return True
 
 
-def open_note_file(file_path: Path, state: DocumentState | None = None) -> None:
+def open_note_file(
+    file_path: Path,
+    state: DocumentState | None = None,
+    view: session.TabSession | None = None,
+) -> None:
     if state is None:
         state = current_state()
+    if state.loading is not None:
+        # Opening over a note that is still loading abandons that load.
+        state.loading = None
+        state.text_widget.config(state="normal", undo=True)
 
-    text = file_path.read_text(encoding="utf-8")
-    state.text_widget.delete("1.0", tk.END)
-    state.text_widget.insert("1.0", text.rstrip("\n"))
+    with diagnostics.measure("open_note.read"):
+        text = file_path.read_text(encoding="utf-8").rstrip("\n")
 
     state.file_path = file_path
     try:
         state.created_at = datetime.fromtimestamp(file_path.stat().st_ctime)
     except OSError:
         state.created_at = datetime.now()
-    state.last_saved_text = editor_ops.editor_text(state.text_widget)
-    set_status(f"Öppnad: {file_path.name}")
+
+    if large_file.is_large(len(text)):
+        start_chunked_load(state, text, view)
+        return
+
+    with diagnostics.measure("open_note.insert"):
+        state.text_widget.delete("1.0", tk.END)
+        state.text_widget.insert("1.0", text)
+    state.needs_full_restyle = True
+    finish_opening(state, view)
+
+
+def finish_opening(state: DocumentState, view: session.TabSession | None = None) -> None:
+    with diagnostics.measure("open_note.baseline"):
+        text = editor_ops.editor_text(state.text_widget)
+        state.saved = ContentBaseline.of(text)
+        state.changes.mark_saved(text, state.saved.digest)
+    if view is not None:
+        restore_view(state, view)
+    set_status(f"Öppnad: {state.file_path.name}")
     state.text_widget.focus_set()
 
 
+def start_chunked_load(state: DocumentState, text: str, view: session.TabSession | None = None) -> None:
+    # Undo is off while loading, so the insert is not one huge undo step,
+    # and the widget is read-only so typing cannot land between chunks.
+    load = large_file.ChunkedLoad(text)
+    state.loading = load
+    widget = state.text_widget
+    widget.config(undo=False, state="normal")
+    widget.delete("1.0", tk.END)
+    widget.config(state="disabled")
+    state.search.reset()
+    state.stats.invalidate()
+    state.needs_full_restyle = False
+    state.pending_heading_lines = None
+    set_status(f"Läser in {state.file_path.name}: 0 %")
+    widget.after_idle(lambda: load_next_chunk(state, load, view))
+
+
+def load_next_chunk(
+    state: DocumentState,
+    load: large_file.ChunkedLoad,
+    view: session.TabSession | None = None,
+) -> None:
+    if state.loading is not load or not any(open_state is state for open_state in doc_states.values()):
+        return
+
+    widget = state.text_widget
+    first_line = int(widget.index("end-1c").split(".")[0])
+    with diagnostics.measure("open_note.chunk"):
+        widget.config(state="normal")
+        widget.insert("end-1c", load.next_chunk())
+        widget.config(state="disabled")
+        editor_ops.restyle_heading_lines(widget, first_line, int(widget.index("end-1c").split(".")[0]))
+
+    if not load.done:
+        set_status(f"Läser in {state.file_path.name}: {load.percent} %")
+        widget.after(large_file.LOAD_STEP_MS, lambda: load_next_chunk(state, load, view))
+        return
+
+    state.loading = None
+    widget.config(state="normal", undo=True)
+    widget.edit_reset()
+    state.pending_heading_lines = None
+    state.search.reset()
+    state.stats.invalidate()
+    finish_opening(state, view)
+    request_refresh()
+
+
 def insert_timestamp() -> None:
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
     current_text_area().insert(tk.INSERT, timestamp)
@@ -617,17 +906,21 @@ def create_note_from_template(template_path: Path, state: DocumentState | None =
     if state is None:
         state = current_state()
 
-    template_text = template_path.read_text(encoding="utf-8")
+    template_text = storage.read_template(template_path).text
     state.text_widget.delete("1.0", tk.END)
     state.text_widget.insert("1.0", template_text.rstrip("\n"))
+    state.needs_full_restyle = True
     state.file_path = None
     state.created_at = None
-    state.last_saved_text = ""
+    state.saved = EMPTY_BASELINE
+    state.changes.reset_baseline()
     set_status(f"Ny från mall: {template_path.name}")
     state.text_widget.focus_set()
 
 
 def start_new_note_from_template(window: tk.Tk) -> None:
+    from . import dialogs
+
     if is_dirty():
         save_note(show_empty_warning=False, autosave=True)
 
@@ -640,16 +933,20 @@ def start_new_note_from_template(window: tk.Tk) -> None:
 
 
 def open_notes_dialog(window: tk.Tk) -> None:
+    from . import dialogs
+
     def handle_delete(file_path: Path) -> None:
         for tab_id, state in list(doc_states.items()):
             if state.file_path == file_path:
-                notebook.forget(tab_id)
-                doc_states.pop(tab_id, None)
+                settle_autosave(state)
+                forget_tab(tab_id)
+        for tab_id, tab in list(placeholder_tabs.items()):
+            if tab.path == file_path:
+                forget_tab(tab_id)
 
-        file_path.unlink(missing_ok=True)
+        storage.delete_note_file(file_path)
 
-        if not doc_states:
-            create_tab()
+        ensure_open_tab()
         set_status("Raderade anteckning")
 
     def handle_open(file_path: Path) -> None:
@@ -660,10 +957,118 @@ def open_notes_dialog(window: tk.Tk) -> None:
     dialogs.open_notes_dialog(window, handle_open, handle_delete, apply_theme, attach_tooltip)
 
 
+def open_fulltext_dialog(window: tk.Tk) -> None:
+    from . import dialogs
+
+    def handle_open(file_path: Path) -> None:
+        tab_id = create_tab()
+        state = doc_states[tab_id]
+        open_note_file(file_path, state)
+
+    dialogs.open_fulltext_dialog(window, handle_open, apply_theme, attach_tooltip)
+
+
+def open_batch_export_dialog(window: tk.Tk) -> None:
+    from . import dialogs
+    from . import export_ui
+
+    def handle_export(sources: list[Path], target_dir: Path, file_format: str) -> None:
+        # Exports read from disk, so queued autosaves land first.
+        autosaver.wait()
+        process_autosave_results()
+        export_ui.export_batch_in_background(window, sources, target_dir, file_format, set_status)
+
+    dialogs.open_batch_export_dialog(window, handle_export, apply_theme, attach_tooltip)
+
+
+def set_diagnostics_enabled(enabled: bool) -> None:
+    diagnostics.set_enabled(enabled)
+    user_settings["diagnostics_enabled"] = enabled
+    settings_store.save_user_settings(user_settings)
+
+
+def open_diagnostics_dialog(window: tk.Tk) -> None:
+    from . import dialogs
+
+    dialogs.open_diagnostics_dialog(window, set_diagnostics_enabled, apply_theme, attach_tooltip)
+
+
+def export_current_note(window: tk.Tk, file_format: str) -> None:
+    from . import export_ui
+
+    export_ui.export_note(current_text_area().get("1.0", "end-1c"), set_status, file_format, window)
+
+
+def process_autosave_results() -> None:
+    for result in autosaver.drain():
+        job = result.job
+        if result.error is not None:
+            set_status(f"Autosparning misslyckades: {job.file_path.name} ({result.error})")
+            continue
+
+        state = doc_states.get(job.key)
+        if state is None or state.file_path != job.file_path:
+            continue
+        state.saved = result.saved
+        if state.changes.generation == job.generation and (result.written or result.resolved_text == job.text):
+            apply_saved_text(state, job.text, result.resolved_text, result.saved)
+        if result.written:
+            set_status(f"Autosparad: {job.file_path.name}")
+
+
+def settle_autosave(state: DocumentState) -> None:
+    for tab_id, open_state in doc_states.items():
+        if open_state is state:
+            autosaver.wait(tab_id)
+    process_autosave_results()
+
+
+def poll_autosave_results(window: tk.Tk) -> None:
+    global autosave_poll_scheduled
+    process_autosave_results()
+    autosave_poll_scheduled = autosaver.has_pending()
+    if autosave_poll_scheduled:
+        window.after(autosave.RESULT_POLL_MS, lambda: poll_autosave_results(window))
+
+
+def snapshot_autosave_job(tab_id: str, state: DocumentState) -> autosave.AutosaveJob | None:
+    if autosaver.is_pending(tab_id) or not state.is_dirty():
+        return None
+
+    text = editor_ops.editor_text(state.text_widget)
+    if not text:
+        return None
+
+    if state.created_at is None:
+        state.created_at = datetime.now()
+    if state.file_path is None:
+        state.file_path = storage.next_note_file()
+
+    return autosave.AutosaveJob(
+        key=tab_id,
+        generation=state.changes.generation,
+        text=text,
+        file_path=state.file_path,
+        created_at=state.created_at,
+        updated_at=datetime.now(),
+        saved=state.saved,
+        config_path=TOKENS_CONFIG_PATH,
+        file_prefix=FILE_PREFIX,
+        backup_count=backup_count,
+    )
+
+
 def schedule_autosave(window: tk.Tk) -> None:
     def autosave_all() -> None:
-        for state in doc_states.values():
-            save_note(show_empty_warning=False, autosave=True, state=state)
+        global autosave_poll_scheduled
+        for tab_id, state in doc_states.items():
+            job = snapshot_autosave_job(tab_id, state)
+            if job is not None:
+                autosaver.submit(job)
+        save_session()
+        if autosaver.has_pending() and not autosave_poll_scheduled:
+            autosave_poll_scheduled = True
+            window.after(autosave.RESULT_POLL_MS, lambda: poll_autosave_results(window))
 
     lifecycle.schedule_autosave(window, AUTOSAVE_INTERVAL_MS, autosave_all)
 
@@ -674,40 +1079,173 @@ def handle_save_shortcut():
 
 def confirm_close(window: tk.Tk) -> None:
     def any_dirty() -> bool:
-        return any(editor_ops.is_dirty(state.text_widget, state.last_saved_text) for state in doc_states.values())
+        return any(state.is_dirty() for state in doc_states.values())
 
     def save_all() -> bool:
         success = True
         for state in doc_states.values():
-            if editor_ops.is_dirty(state.text_widget, state.last_saved_text):
+            if state.is_dirty():
                 if not save_note(state=state):
                     success = False
+        # Tabs for notes saved just now belong in the session too.
+        save_session()
         return success
 
+    save_session()
     lifecycle.confirm_close(window, any_dirty, save_all)
 
 
-def main() -> None:
-    window = tk.Tk()
-    window.title("NoteThis")
-    window.geometry("700x450")
-
-    global notebook, document_label, status_label, stats_label, search_entry, divider_widget
-    global native_menubar, menu_widgets, custom_menubar
-    global theme_mode, ui_scale_index
-    user_settings.update(settings_store.load_user_settings())
+def load_user_preferences(settings: dict) -> None:
+    global theme_mode, ui_scale_index, search_regex, search_case_sensitive, backup_count
+    user_settings.clear()
+    user_settings.update(settings)
     theme_mode = str(user_settings.get("theme_mode", "light")).lower()
     if theme_mode not in {"light", "dark", "system"}:
         theme_mode = "light"
-        user_settings["theme_mode"] = theme_mode
-        settings_store.save_user_settings(user_settings)
     saved_scale = user_settings.get("ui_scale_index", 0)
     if isinstance(saved_scale, int) and 0 <= saved_scale < len(UI_SCALE_FACTORS):
         ui_scale_index = saved_scale
     else:
         ui_scale_index = 0
-    tokens.load_token_config(TOKENS_CONFIG_PATH)
-    settings_store.load_tooltips_config()
+    search_regex = user_settings.get("search_regex") is True
+    search_case_sensitive = user_settings.get("search_case_sensitive") is True
+    diagnostics.set_enabled(user_settings.get("diagnostics_enabled") is True or diagnostics.ENV_FLAG_SET)
+    saved_backup_count = user_settings.get("backup_count", BACKUP_COUNT)
+    if isinstance(saved_backup_count, int) and not isinstance(saved_backup_count, bool) and saved_backup_count >= 0:
+        backup_count = saved_backup_count
+    else:
+        backup_count = BACKUP_COUNT
+
+
+def rebuild_token_menus(insert_menu: tk.Menu, token_config: dict) -> None:
+    insert_menu.delete(TOKEN_MENU_START, "end")
+    for menu in token_submenus:
+        if menu in menu_widgets:
+            menu_widgets.remove(menu)
+        menu.destroy()
+    token_submenus.clear()
+
+    globals_config = token_config.get("globals", {})
+    if isinstance(globals_config, dict) and globals_config:
+        globals_menu = tk.Menu(insert_menu, tearoff=0)
+        token_submenus.append(globals_menu)
+        for token_name in sorted(globals_config.keys()):
+            globals_menu.add_command(
+                label=token_name,
+                command=lambda name=token_name: insert_token_placeholder(name),
+            )
+        insert_menu.add_cascade(label="Globala", menu=globals_menu)
+
+    tokens_config_local = token_config.get("tokens", {})
+    if isinstance(tokens_config_local, dict):
+        for group_name, token_group in tokens_config_local.items():
+            if not isinstance(token_group, dict) or not token_group:
+                continue
+            group_menu = tk.Menu(insert_menu, tearoff=0)
+            token_submenus.append(group_menu)
+            for token_name in sorted(token_group.keys()):
+                group_menu.add_command(
+                    label=token_name,
+                    command=lambda name=token_name: insert_token_placeholder(name),
+                )
+            insert_menu.add_cascade(label=group_name.title(), menu=group_menu)
+    menu_widgets.extend(token_submenus)
+
+
+def poll_config_changes(window: tk.Tk) -> None:
+    changed = config_cache.poll()
+    if changed:
+        set_status("Inställningar inlästa: " + ", ".join(path.name for path in changed))
+    window.after(config_cache.POLL_INTERVAL_MS, lambda: poll_config_changes(window))
+
+
+def start_notes_watcher(window: tk.Tk) -> None:
+    global notes_watcher
+    storage.NOTES_DIR.mkdir(parents=True, exist_ok=True)
+    storage.sweep_staged_backups()
+    notes_watcher = fs_watcher.create_watcher(storage.NOTES_DIR, storage.note_pattern())
+    storage.set_live_notes_dir(storage.NOTES_DIR)
+    window.after(notes_watcher.poll_interval_ms, lambda: poll_note_changes(window))
+
+
+def stop_notes_watcher() -> None:
+    global notes_watcher
+    if notes_watcher is not None:
+        storage.set_live_notes_dir(None)
+        notes_watcher.close()
+        notes_watcher = None
+
+
+def poll_note_changes(window: tk.Tk) -> None:
+    if notes_watcher is None:
+        return
+    events = notes_watcher.poll()
+    if events:
+        for event in storage.apply_note_changes(events):
+            handle_external_note_change(window, event)
+    # Rescheduled only once handled, so a prompt below cannot stack up more.
+    window.after(notes_watcher.poll_interval_ms, lambda: poll_note_changes(window))
+
+
+def handle_external_note_change(window: tk.Tk, event: fs_watcher.ChangeEvent) -> None:
+    for tab_id, state in list(doc_states.items()):
+        if state.file_path != event.path:
+            continue
+        # An autosave may have replaced the file before recording it as ours.
+        settle_autosave(state)
+        try:
+            stat = event.path.stat()
+        except OSError:
+            stat = None
+        if storage.is_own_write(event.path, stat):
+            continue
+
+        name = event.path.name
+        notebook.select(tab_id)
+        if stat is None:
+            set_status(f"Borttagen utanför NoteThis: {name}")
+            keep = messagebox.askyesno(
+                "Anteckningen togs bort",
+                f"{name} har tagits bort utanför NoteThis.\n\nVill du behålla den? Den sparas igen vid nästa sparning.",
+                parent=window,
+            )
+            if keep:
+                state.saved = EMPTY_BASELINE
+                state.changes.reset_baseline()
+            else:
+                forget_tab(tab_id)
+                ensure_open_tab()
+        else:
+            set_status(f"Ändrad utanför NoteThis: {name}")
+            warning = " Osparade ändringar i fliken går förlorade." if state.is_dirty() else ""
+            reload = messagebox.askyesno(
+                "Anteckningen har ändrats",
+                f"{name} har ändrats utanför NoteThis.\n\nVill du läsa in den nya versionen?{warning}",
+                parent=window,
+            )
+            if reload:
+                open_note_file(event.path, state)
+            else:
+                # Keeping the editor's version means the next save writes it back.
+                state.saved = EMPTY_BASELINE
+                state.changes.reset_baseline()
+        refresh_editor_state()
+
+
+def main(startup_report: bool = False, startup_budget_ms: float = startup_timing.FIRST_PAINT_BUDGET_MS) -> None:
+    timer = startup_timing.timer
+    timer.mark("imports")
+    window = tk.Tk()
+    window.title("NoteThis")
+    window.geometry("700x450")
+    timer.mark("tk_root")
+
+    global notebook, document_label, status_label, stats_label, search_entry, divider_widget
+    global native_menubar, menu_widgets, custom_menubar, editor_refresh
+    load_user_preferences(settings_store.load_user_settings())
+    if str(user_settings.get("theme_mode", "light")).lower() not in {"light", "dark", "system"}:
+        user_settings["theme_mode"] = theme_mode
+        settings_store.save_user_settings(user_settings)
     init_ui_scale()
     configure_heading_fonts()
 
@@ -723,6 +1261,7 @@ def main() -> None:
     file_menu.add_command(label="Stäng flik", command=close_current_tab)
     file_menu.add_command(label="Ny anteckning", command=lambda: start_new_note_from_template(window))
     file_menu.add_command(label="Hantera anteckningar", command=lambda: open_notes_dialog(window))
+    file_menu.add_command(label="Sök i alla anteckningar", command=lambda: open_fulltext_dialog(window))
     file_menu.add_separator()
     file_menu.add_command(label="Spara", command=save_note, accelerator="Ctrl+S")
     file_menu.add_command(label="Spara som..", command=save_note_as_copy)
@@ -730,15 +1269,20 @@ def main() -> None:
     menu_widgets.append(export_menu)
     export_menu.add_command(
         label="Markdown (.md)",
-        command=lambda: exporting.export_note(current_text_area().get("1.0", "end-1c"), set_status, "md"),
+        command=lambda: export_current_note(window, "md"),
     )
     export_menu.add_command(
         label="Text (.txt)",
-        command=lambda: exporting.export_note(current_text_area().get("1.0", "end-1c"), set_status, "txt"),
+        command=lambda: export_current_note(window, "txt"),
     )
     export_menu.add_command(
         label="PDF (.pdf)",
-        command=lambda: exporting.export_note(current_text_area().get("1.0", "end-1c"), set_status, "pdf"),
+        command=lambda: export_current_note(window, "pdf"),
+    )
+    export_menu.add_separator()
+    export_menu.add_command(
+        label="Flera anteckningar..",
+        command=lambda: open_batch_export_dialog(window),
     )
     file_menu.add_cascade(label="Exportera", menu=export_menu)
     file_menu.add_separator()
@@ -748,6 +1292,19 @@ def main() -> None:
     menu_widgets.append(edit_menu)
     menubar.add_cascade(label="Redigera", menu=edit_menu)
     edit_menu.add_command(label="Ångra", command=undo_last_change, accelerator="Ctrl+Z")
+    edit_menu.add_separator()
+    case_var = tk.BooleanVar(value=search_case_sensitive)
+    edit_menu.add_checkbutton(
+        label="Sök: skiftlägeskänslig",
+        variable=case_var,
+        command=lambda: set_search_option("search_case_sensitive", case_var.get()),
+    )
+    regex_var = tk.BooleanVar(value=search_regex)
+    edit_menu.add_checkbutton(
+        label="Sök: reguljära uttryck",
+        variable=regex_var,
+        command=lambda: set_search_option("search_regex", regex_var.get()),
+    )
 
     insert_menu = tk.Menu(menubar, tearoff=0)
     menu_widgets.append(insert_menu)
@@ -756,32 +1313,6 @@ def main() -> None:
     insert_menu.add_command(label="Deltagarlista", command=insert_participant_list)
     insert_menu.add_separator()
 
-    token_config_local = tokens.load_token_config(TOKENS_CONFIG_PATH)
-    globals_config = token_config_local.get("globals", {})
-    if isinstance(globals_config, dict) and globals_config:
-        globals_menu = tk.Menu(insert_menu, tearoff=0)
-        menu_widgets.append(globals_menu)
-        for token_name in sorted(globals_config.keys()):
-            globals_menu.add_command(
-                label=token_name,
-                command=lambda name=token_name: insert_token_placeholder(name),
-            )
-        insert_menu.add_cascade(label="Globala", menu=globals_menu)
-
-    tokens_config_local = token_config_local.get("tokens", {})
-    if isinstance(tokens_config_local, dict):
-        for group_name, token_group in tokens_config_local.items():
-            if not isinstance(token_group, dict) or not token_group:
-                continue
-            group_menu = tk.Menu(insert_menu, tearoff=0)
-            menu_widgets.append(group_menu)
-            for token_name in sorted(token_group.keys()):
-                group_menu.add_command(
-                    label=token_name,
-                    command=lambda name=token_name: insert_token_placeholder(name),
-                )
-            insert_menu.add_cascade(label=group_name.title(), menu=group_menu)
-
     settings_menu = tk.Menu(menubar, tearoff=0)
     menu_widgets.append(settings_menu)
     menubar.add_cascade(label="Inställningar", menu=settings_menu)
@@ -835,6 +1366,7 @@ def main() -> None:
     help_menu = tk.Menu(menubar, tearoff=0)
     menu_widgets.append(help_menu)
     menubar.add_cascade(label="Hjälp", menu=help_menu)
+    help_menu.add_command(label="Diagnostik..", command=lambda: open_diagnostics_dialog(window))
     help_menu.add_command(label="Om NoteThis", command=lambda: open_about_dialog(window))
 
     custom_menubar = tk.Frame(window)
@@ -897,24 +1429,82 @@ def main() -> None:
     stats_label = tk.Label(info_bar, text="Ord: 0  Tecken: 0", anchor="e")
     stats_label.pack(side="right")
 
+    editor_refresh = refresh_scheduler.RefreshScheduler(
+        window,
+        [
+            ("headings", lambda: run_document_stage(apply_markdown_heading_styles)),
+            ("label", lambda: run_document_stage(update_document_label)),
+            ("stats", lambda: run_document_stage(update_document_stats)),
+            ("search", lambda: run_document_stage(update_search_matches)),
+            ("status", render_status_stage),
+        ],
+    )
+
     notebook = ttk.Notebook(window)
     notebook.pack(fill="both", expand=True, padx=12, pady=(0, 12))
-    create_tab()
+    restore_session()
 
     configure_heading_fonts()
 
     save_shortcut = handle_save_shortcut()
     window.bind("<Control-s>", save_shortcut)
     window.bind("<Control-S>", save_shortcut)
-    search_entry.bind("<KeyRelease>", lambda _event: refresh_editor_state())
+    search_entry.bind("<KeyRelease>", lambda _event: request_refresh("search", "status", debounce=True))
     notebook.bind("<<NotebookTabChanged>>", handle_tab_changed)
     apply_theme_mode(window)
     set_ui_scale(ui_scale_index)
     set_status(f"Autosparning: var {AUTOSAVE_INTERVAL_MINUTES} min")
 
-    window.after(AUTOSAVE_INTERVAL_MS, lambda: schedule_autosave(window))
+    timer.mark("widgets")
+
+    def handle_token_config_changed(token_config: dict) -> None:
+        rebuild_token_menus(insert_menu, token_config)
+        apply_theme(window)
+
+    def handle_user_settings_changed(settings: dict) -> None:
+        load_user_preferences(settings)
+        theme_var.set(theme_mode)
+        zoom_var.set(ui_scale_index)
+        case_var.set(search_case_sensitive)
+        regex_var.set(search_regex)
+        apply_theme_mode(window)
+        set_ui_scale(ui_scale_index)
+        request_refresh("search", "status")
+
+    startup_finished = False
+
+    def finish_startup() -> None:
+        # Nothing here is needed to draw the first window: the token menus,
+        # config watching and autosave timer are set up once it is visible.
+        nonlocal startup_finished
+        if startup_finished:
+            return
+        startup_finished = True
+        handle_token_config_changed(tokens.load_token_config(TOKENS_CONFIG_PATH))
+        config_cache.subscribe(TOKENS_CONFIG_PATH, handle_token_config_changed)
+        config_cache.subscribe(TOOLTIPS_CONFIG_PATH, lambda _config: ui_tooltips.refresh_tooltips(tooltip_objects))
+        config_cache.subscribe(USER_SETTINGS_PATH, handle_user_settings_changed)
+        window.after(config_cache.POLL_INTERVAL_MS, lambda: poll_config_changes(window))
+        window.after(AUTOSAVE_INTERVAL_MS, lambda: schedule_autosave(window))
+        start_notes_watcher(window)
+        timer.mark("ready")
+        if startup_report:
+            print(timer.report(startup_budget_ms), file=sys.stderr)
+            window.destroy()
+
+    def handle_first_paint(_event=None) -> None:
+        window.unbind("<Expose>", first_paint_binding)
+        timer.mark(startup_timing.FIRST_PAINT)
+        window.after_idle(finish_startup)
+
+    first_paint_binding = window.bind("<Expose>", handle_first_paint, add="+")
+    # A window that starts minimized is never exposed; finish anyway.
+    window.after(STARTUP_FALLBACK_MS, finish_startup)
     window.protocol("WM_DELETE_WINDOW", lambda: confirm_close(window))
     window.mainloop()
+    stop_notes_watcher()
+    autosaver.shutdown()
+    storage.flush_backups()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+import queue
+import threading
+
+from . import storage
+from . import tokens
+from .text_tools import ContentBaseline
+
+MAX_AUTOSAVE_WORKERS = 4
+RESULT_POLL_MS = 100
+
+
+@dataclass(frozen=True)
+class AutosaveJob:
+    key: str
+    generation: int
+    text: str
+    file_path: Path
+    created_at: datetime
+    updated_at: datetime
+    saved: ContentBaseline | None
+    config_path: Path
+    file_prefix: str
+    backup_count: int = storage.BACKUP_COUNT
+
+
+@dataclass(frozen=True)
+class AutosaveResult:
+    job: AutosaveJob
+    resolved_text: str | None = None
+    # Baseline of resolved_text, hashed here rather than on the Tk thread.
+    saved: ContentBaseline | None = None
+    written: bool = False
+    error: Exception | None = None
+
+
+def run_autosave_job(job: AutosaveJob) -> AutosaveResult:
+    try:
+        resolved_text = tokens.apply_tokens(
+            text=job.text,
+            config_path=job.config_path,
+            file_path=job.file_path,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+            file_prefix=job.file_prefix,
+        )
+        if job.saved is not None and job.saved.matches(resolved_text):
+            return AutosaveResult(job, resolved_text=resolved_text, saved=job.saved)
+
+        saved = ContentBaseline.of(resolved_text)
+        storage.write_note_file(job.file_path, resolved_text, create_backup=True, backup_count=job.backup_count)
+        return AutosaveResult(job, resolved_text=resolved_text, saved=saved, written=True)
+    except Exception as exc:
+        return AutosaveResult(job, error=exc)
+
+
+class AutosaveWorker:
+    def __init__(self, max_workers: int = MAX_AUTOSAVE_WORKERS) -> None:
+        self.max_workers = max_workers
+        self.results: queue.SimpleQueue[AutosaveResult] = queue.SimpleQueue()
+        self.in_flight: dict[str, Future] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def is_pending(self, key: str) -> bool:
+        with self._lock:
+            return key in self.in_flight
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return bool(self.in_flight)
+
+    def submit(self, job: AutosaveJob) -> bool:
+        with self._lock:
+            if job.key in self.in_flight:
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="notethis-autosave")
+            self.in_flight[job.key] = self._executor.submit(self._run, job)
+        return True
+
+    def _run(self, job: AutosaveJob) -> None:
+        result = run_autosave_job(job)
+        self.results.put(result)
+        with self._lock:
+            self.in_flight.pop(job.key, None)
+
+    def wait(self, key: str | None = None) -> None:
+        with self._lock:
+            if key is None:
+                futures = list(self.in_flight.values())
+            else:
+                futures = [self.in_flight[key]] if key in self.in_flight else []
+        for future in futures:
+            future.result()
+
+    def drain(self) -> list[AutosaveResult]:
+        drained = []
+        while True:
+            try:
+                drained.append(self.results.get_nowait())
+            except queue.Empty:
+                return drained
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
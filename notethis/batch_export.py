@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+import importlib.util
+import os
+import time
+
+from . import exporting
+from . import fileio
+from . import pdf_export
+
+BATCH_FORMATS = exporting.EXPORT_FORMATS
+MAX_TEXT_WORKERS = 8
+MAX_FAILURES_IN_SUMMARY = 10
+
+STATUS_EXPORTED = "exported"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class ExportTask:
+    source: Path
+    target: Path
+    file_format: str
+
+
+@dataclass(frozen=True)
+class ExportOutcome:
+    task: ExportTask
+    status: str
+    error: str = ""
+
+
+@dataclass(frozen=True)
+class BatchSummary:
+    outcomes: tuple[ExportOutcome, ...]
+    elapsed: float
+
+    def count(self, status: str) -> int:
+        return sum(1 for outcome in self.outcomes if outcome.status == status)
+
+    @property
+    def exported(self) -> int:
+        return self.count(STATUS_EXPORTED)
+
+    @property
+    def skipped(self) -> int:
+        return self.count(STATUS_SKIPPED)
+
+    @property
+    def failures(self) -> list[ExportOutcome]:
+        return [outcome for outcome in self.outcomes if outcome.status == STATUS_FAILED]
+
+    @property
+    def notes_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return self.exported / self.elapsed
+
+    def format_summary(self) -> str:
+        lines = [
+            f"Exporterade: {self.exported}",
+            f"Redan aktuella: {self.skipped}",
+            f"Misslyckades: {len(self.failures)}",
+            f"Tid: {self.elapsed:.1f} s ({self.notes_per_second:.1f} anteckningar/s)",
+        ]
+        failures = self.failures
+        if failures:
+            lines.append("")
+            for outcome in failures[:MAX_FAILURES_IN_SUMMARY]:
+                lines.append(f"{outcome.task.source.name}: {outcome.error}")
+            if len(failures) > MAX_FAILURES_IN_SUMMARY:
+                lines.append(f"... och {len(failures) - MAX_FAILURES_IN_SUMMARY} till")
+        return "\n".join(lines)
+
+
+def target_path(source: Path, target_dir: Path, file_format: str) -> Path:
+    return target_dir / f"{source.stem}.{file_format}"
+
+
+def is_up_to_date(source: Path, target: Path) -> bool:
+    try:
+        return target.stat().st_mtime_ns >= source.stat().st_mtime_ns
+    except OSError:
+        return False
+
+
+def plan_exports(sources: Iterable[Path], target_dir: Path, file_format: str) -> list[ExportTask]:
+    if file_format not in BATCH_FORMATS:
+        raise ValueError(f"Okänt exportformat: {file_format}")
+    return [ExportTask(source, target_path(source, target_dir, file_format), file_format) for source in sources]
+
+
+def export_one(task: ExportTask) -> ExportOutcome:
+    """Export a single note; runs in a worker thread or process."""
+    if is_up_to_date(task.source, task.target):
+        return ExportOutcome(task, STATUS_SKIPPED)
+    try:
+        text = task.source.read_text(encoding="utf-8")
+        # Notes end with a single newline, which write_export adds back.
+        exporting.write_export(text.removesuffix("\n"), task.target, task.file_format)
+    except Exception as exc:
+        return ExportOutcome(task, STATUS_FAILED, error=str(exc) or type(exc).__name__)
+    return ExportOutcome(task, STATUS_EXPORTED)
+
+
+def _make_executor(file_format: str, task_count: int, max_workers: int | None) -> Executor:
+    if file_format == "pdf":
+        # multiprocessing is only loaded when PDFs are rendered; it is a large
+        # share of the command line's startup time otherwise.
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        workers = min(max_workers or os.cpu_count() or 1, task_count)
+        # Spawned workers start from a fresh interpreter and import this module
+        # and reportlab; both entry points keep the Tk application out of it.
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    workers = min(max_workers or MAX_TEXT_WORKERS, task_count)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="notethis-export")
+
+
+def run_batch_export(
+    sources: Iterable[Path],
+    target_dir: Path,
+    file_format: str,
+    max_workers: int | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> BatchSummary:
+    tasks = plan_exports(sources, target_dir, file_format)
+    if file_format == "pdf" and importlib.util.find_spec("reportlab") is None:
+        raise pdf_export.PdfUnavailableError(
+            "PDF-export kräver paketet reportlab. Installera med: pip install reportlab"
+        )
+
+    started = time.perf_counter()
+    target_dir.mkdir(parents=True, exist_ok=True)
+    pending: list[ExportTask] = []
+    outcomes: list[ExportOutcome] = []
+    for task in tasks:
+        if is_up_to_date(task.source, task.target):
+            outcomes.append(ExportOutcome(task, STATUS_SKIPPED))
+        else:
+            pending.append(task)
+    if progress is not None:
+        progress(len(outcomes), len(tasks))
+
+    if pending:
+        with _make_executor(file_format, len(pending), max_workers) as executor:
+            futures = {executor.submit(export_one, task): task for task in pending}
+            for future in as_completed(futures):
+                try:
+                    outcome = future.result()
+                except Exception as exc:
+                    outcome = ExportOutcome(futures[future], STATUS_FAILED, error=str(exc) or type(exc).__name__)
+                outcomes.append(outcome)
+                if progress is not None:
+                    progress(len(outcomes), len(tasks))
+        fileio.fsync_directory(target_dir)
+
+    order = {task: index for index, task in enumerate(tasks)}
+    outcomes.sort(key=lambda outcome: order[outcome.task])
+    return BatchSummary(outcomes=tuple(outcomes), elapsed=time.perf_counter() - started)
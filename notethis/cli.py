@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Sequence
+import argparse
+import json
+import sys
+
+from . import batch_export
+from . import exporting
+from . import pdf_export
+from . import startup_timing
+from . import storage
+from . import template_catalog
+from . import tokens
+from .paths import FILE_PREFIX, TOKENS_CONFIG_PATH
+
+# Nothing in this module may import tkinter; the GUI is only loaded when no
+# subcommand is given.
+
+
+def _print_json(payload: object) -> None:
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    metas = storage.list_note_metas()
+    if args.json:
+        _print_json(
+            [
+                {
+                    "name": meta.name,
+                    "title": meta.title,
+                    "created": datetime.fromtimestamp(meta.created).isoformat(timespec="seconds"),
+                    "updated": datetime.fromtimestamp(meta.updated).isoformat(timespec="seconds"),
+                }
+                for meta in metas
+            ]
+        )
+        return 0
+    for meta in metas:
+        updated = datetime.fromtimestamp(meta.updated).strftime("%Y-%m-%d %H:%M")
+        print(f"{meta.name}\t{updated}\t{meta.title}")
+    return 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    storage.sync_fulltext_index()
+    hits = storage.search_notes(args.query, limit=args.limit)
+    if args.json:
+        _print_json([{"name": hit.name, "title": hit.title, "score": hit.score, "snippet": hit.snippet} for hit in hits])
+    else:
+        for hit in hits:
+            print(f"{hit.name}\t{hit.title}\t{hit.snippet}")
+    # Like grep: 1 means the search ran but found nothing, in both output modes.
+    return 0 if hits else 1
+
+
+def find_template(name: str) -> template_catalog.Template | None:
+    wanted = name.lower()
+    for template in storage.list_templates():
+        if wanted in {template.path.name.lower(), template.path.stem.lower(), template.label.lower()}:
+            return template
+    return None
+
+
+def cmd_new_from_template(args: argparse.Namespace) -> int:
+    template = find_template(args.template)
+    if template is None:
+        print(f"Hittade ingen mall som heter {args.template}.", file=sys.stderr)
+        return 1
+
+    text = template.text.rstrip()
+    if not text:
+        print(f"Mallen {template.path.name} är tom.", file=sys.stderr)
+        return 1
+
+    file_path = storage.next_note_file()
+    now = datetime.now()
+    resolved_text = tokens.apply_tokens(
+        text=text,
+        config_path=TOKENS_CONFIG_PATH,
+        file_path=file_path,
+        created_at=now,
+        updated_at=now,
+        file_prefix=FILE_PREFIX,
+    )
+    storage.write_note_file(file_path, resolved_text)
+    print(file_path)
+    return 0
+
+
+def _note_path(name: str) -> Path:
+    path = Path(name)
+    if path.exists() or path.parent != Path("."):
+        return path
+    return storage.NOTES_DIR / name
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    if args.all:
+        sources = storage.list_note_files()
+    elif args.notes:
+        sources = [_note_path(name) for name in args.notes]
+    else:
+        print("Ange anteckningar att exportera eller --all.", file=sys.stderr)
+        return 2
+
+    try:
+        summary = batch_export.run_batch_export(sources, Path(args.output), args.format, max_workers=args.workers)
+    except pdf_export.PdfUnavailableError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(summary.format_summary())
+    return 1 if summary.failures else 0
+
+
+def cmd_reindex(args: argparse.Namespace) -> int:
+    note_count, changed = storage.reindex_notes(full=args.full)
+    print(f"{note_count} anteckningar indexerade, {changed} uppdaterade")
+    return 0
+
+
+def run_gui(startup_report: bool = False, budget_ms: float = startup_timing.FIRST_PAINT_BUDGET_MS) -> int:
+    from .app import main as run_app
+
+    run_app(startup_report=startup_report, startup_budget_ms=budget_ms)
+    if startup_report and startup_timing.timer.over_budget(budget_ms):
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="notethis",
+        description="Utan kommando startar appen; med kommando körs NoteThis utan grafiskt gränssnitt.",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="starta appen, skriv ut starttider och avsluta när fönstret är klart",
+    )
+    parser.add_argument(
+        "--startup-budget-ms",
+        type=float,
+        default=startup_timing.FIRST_PAINT_BUDGET_MS,
+        help="tid till första ritning som räknas som godkänd (standard %(default).0f ms)",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="kommando")
+
+    list_parser = commands.add_parser("list", help="lista sparade anteckningar")
+    list_parser.add_argument("--json", action="store_true", help="skriv ut som JSON")
+    list_parser.set_defaults(handler=cmd_list)
+
+    search_parser = commands.add_parser(
+        "search",
+        help="sök i alla anteckningar",
+        description="Sök i alla anteckningar. Returnerar felkod 1 om inget hittades, även med --json.",
+    )
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=50)
+    search_parser.add_argument("--json", action="store_true", help="skriv ut som JSON")
+    search_parser.set_defaults(handler=cmd_search)
+
+    template_parser = commands.add_parser("new-from-template", help="skapa en anteckning från en mall")
+    template_parser.add_argument("template", help="mallens namn, filnamn eller etikett")
+    template_parser.set_defaults(handler=cmd_new_from_template)
+
+    export_parser = commands.add_parser("export", help="exportera anteckningar till en mapp")
+    export_parser.add_argument("notes", nargs="*", help="filnamn i notes/ eller sökvägar")
+    export_parser.add_argument("--all", action="store_true", help="exportera alla anteckningar")
+    export_parser.add_argument("--format", choices=exporting.EXPORT_FORMATS, default="md")
+    export_parser.add_argument("--output", required=True, help="målmapp")
+    export_parser.add_argument("--workers", type=int, default=None)
+    export_parser.set_defaults(handler=cmd_export)
+
+    reindex_parser = commands.add_parser("reindex", help="uppdatera sökindex och anteckningslista")
+    reindex_parser.add_argument("--full", action="store_true", help="bygg om indexen från grunden")
+    reindex_parser.set_defaults(handler=cmd_reindex)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return run_gui(args.startup_report, args.startup_budget_ms)
+    return args.handler(args)
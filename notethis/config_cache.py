@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+import json
+import os
+import threading
+
+POLL_INTERVAL_MS = 2000
+
+
+@dataclass
+class CacheEntry:
+    signature: tuple[int, int, int] | None
+    value: Any
+    default: Any
+    version: int = 0
+    notified_version: int = 0
+
+
+def file_signature(path: Path) -> tuple[int, int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ConfigCache:
+    def __init__(self) -> None:
+        self.entries: dict[Path, CacheEntry] = {}
+        self.subscribers: dict[Path, list[Callable[[Any], None]]] = {}
+        self._lock = threading.RLock()
+
+    def _parse(self, path: Path, entry: CacheEntry | None, default: Any) -> Any:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return default
+        except (OSError, json.JSONDecodeError):
+            # A half-written file keeps the last good value until it changes again.
+            return entry.value if entry is not None else default
+
+    def _refresh(self, path: Path, default: Any) -> CacheEntry:
+        signature = file_signature(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry.signature == signature:
+            return entry
+
+        value = self._parse(path, entry, default)
+        if entry is None:
+            entry = CacheEntry(signature=signature, value=value, default=default)
+            self.entries[path] = entry
+        else:
+            entry.signature = signature
+            entry.value = value
+            entry.version += 1
+        return entry
+
+    def load_json(self, path: Path, default: Any) -> Any:
+        with self._lock:
+            return self._refresh(path, default).value
+
+    def store(self, path: Path, value: Any) -> None:
+        with self._lock:
+            entry = self.entries.get(path)
+            signature = file_signature(path)
+            if entry is None:
+                self.entries[path] = CacheEntry(signature=signature, value=value, default=value)
+            else:
+                entry.signature = signature
+                entry.value = value
+
+    def subscribe(self, path: Path, callback: Callable[[Any], None]) -> None:
+        with self._lock:
+            self.subscribers.setdefault(path, []).append(callback)
+
+    def poll(self) -> list[Path]:
+        with self._lock:
+            changed = []
+            for path, entry in list(self.entries.items()):
+                self._refresh(path, entry.default)
+                if entry.version != entry.notified_version:
+                    entry.notified_version = entry.version
+                    changed.append((path, entry.value, list(self.subscribers.get(path, ()))))
+
+        for _path, value, callbacks in changed:
+            for callback in callbacks:
+                callback(value)
+        return [path for path, _value, _callbacks in changed]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+
+_cache = ConfigCache()
+
+
+def load_json(path: Path, default: Any) -> Any:
+    return _cache.load_json(path, default)
+
+
+def store(path: Path, value: Any) -> None:
+    _cache.store(path, value)
+
+
+def subscribe(path: Path, callback: Callable[[Any], None]) -> None:
+    _cache.subscribe(path, callback)
+
+
+def poll() -> list[Path]:
+    return _cache.poll()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+import json
+import math
+import os
+import threading
+import time
+
+from . import fileio
+
+RING_SIZE = 512
+PERCENTILES = (50, 95, 99)
+ENV_FLAG_SET = os.environ.get("NOTETHIS_DIAGNOSTICS", "") not in {"", "0"}
+
+
+def nearest_rank(ordered: list[float], percent: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StageTimings:
+    def __init__(self, ring_size: int = RING_SIZE) -> None:
+        self.samples: deque[float] = deque(maxlen=ring_size)
+        self.count = 0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float) -> None:
+        self.samples.append(elapsed_ms)
+        self.count += 1
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def percentile(self, percent: float) -> float:
+        return nearest_rank(sorted(self.samples), percent)
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+        result: dict[str, float] = {"count": self.count, "max": self.max_ms}
+        for percent in PERCENTILES:
+            result[f"p{percent}"] = nearest_rank(ordered, percent)
+        return result
+
+
+class _Measurement:
+    __slots__ = ("recorder", "stage", "started")
+
+    def __init__(self, recorder: Diagnostics, stage: str) -> None:
+        self.recorder = recorder
+        self.stage = stage
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *_exc) -> None:
+        self.recorder.record(self.stage, (time.perf_counter() - self.started) * 1000)
+
+
+class _NoMeasurement:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *_exc) -> None:
+        return None
+
+
+_NO_MEASUREMENT = _NoMeasurement()
+
+
+class Diagnostics:
+    def __init__(self, ring_size: int = RING_SIZE) -> None:
+        self.enabled = False
+        self.ring_size = ring_size
+        self.stages: dict[str, StageTimings] = {}
+        self._lock = threading.Lock()
+
+    def measure(self, stage: str) -> _Measurement | _NoMeasurement:
+        # With instrumentation off this hands back a shared no-op, so the
+        # only cost on the hot path is this attribute check.
+        if not self.enabled:
+            return _NO_MEASUREMENT
+        return _Measurement(self, stage)
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        with self._lock:
+            timings = self.stages.get(stage)
+            if timings is None:
+                timings = StageTimings(self.ring_size)
+                self.stages[stage] = timings
+            timings.record(elapsed_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {stage: self.stages[stage].summary() for stage in sorted(self.stages)}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {
+                stage: dict(timings.summary(), samples=list(timings.samples))
+                for stage, timings in sorted(self.stages.items())
+            }
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "ring_size": self.ring_size,
+            "stages": stages,
+        }
+
+    def dump(self, path: Path) -> None:
+        fileio.atomic_write_text(path, json.dumps(self.snapshot(), ensure_ascii=False, indent=2), durable=False)
+
+
+_diagnostics = Diagnostics()
+
+
+def is_enabled() -> bool:
+    return _diagnostics.enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    _diagnostics.enabled = enabled
+
+
+def measure(stage: str) -> _Measurement | _NoMeasurement:
+    return _diagnostics.measure(stage)
+
+
+def record(stage: str, elapsed_ms: float) -> None:
+    _diagnostics.record(stage, elapsed_ms)
+
+
+def reset() -> None:
+    _diagnostics.reset()
+
+
+def summary() -> dict[str, dict[str, float]]:
+    return _diagnostics.summary()
+
+
+def dump(path: Path) -> None:
+    _diagnostics.dump(path)
@@ -4,11 +4,16 @@ from datetime import datetime
 from pathlib import Path
 import tkinter as tk
 import tkinter.font as tkfont
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 
+from . import batch_export
+from . import diagnostics
 from . import markdown
+from . import notes_list
 from . import storage
-from .paths import ABOUT_MARKDOWN_PATH
+from . import tokens
+from . import ui_virtual_list
+from .paths import ABOUT_MARKDOWN_PATH, FILE_PREFIX, TOKENS_CONFIG_PATH
 
 
 def open_about_dialog(
@@ -63,32 +68,82 @@ def open_template_dialog(
     apply_theme,
     attach_tooltip,
 ) -> None:
-    template_files = storage.list_template_files()
-    if not template_files:
+    templates = storage.list_templates()
+    if not templates:
         messagebox.showinfo("Inga mallar", "Hittade inga mallar i mappen templates.")
         return
 
     dialog = tk.Toplevel(window)
     dialog.title("Välj mall")
-    dialog.geometry("420x340")
+    dialog.geometry("720x400")
     dialog.transient(window)
     dialog.grab_set()
 
-    list_frame = tk.Frame(dialog)
-    list_frame.pack(fill="both", expand=True, padx=12, pady=(12, 8))
+    content_frame = tk.Frame(dialog)
+    content_frame.pack(fill="both", expand=True, padx=12, pady=(12, 8))
+
+    list_frame = tk.Frame(content_frame)
+    list_frame.pack(side="left", fill="y")
 
     scrollbar = tk.Scrollbar(list_frame)
     scrollbar.pack(side="right", fill="y")
 
-    listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set)
+    listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set, exportselection=False, width=28)
     listbox.pack(side="left", fill="both", expand=True)
     scrollbar.config(command=listbox.yview)
 
-    for file_path in template_files:
-        listbox.insert(tk.END, storage.template_list_label(file_path))
+    for template in templates:
+        listbox.insert(tk.END, template.label)
+
+    preview_frame = tk.Frame(content_frame)
+    preview_frame.pack(side="left", fill="both", expand=True, padx=(8, 0))
+
+    info_label = tk.Label(preview_frame, text="", anchor="w", justify="left")
+    info_label.pack(fill="x")
+
+    preview_scrollbar = tk.Scrollbar(preview_frame)
+    preview_scrollbar.pack(side="right", fill="y")
+
+    preview = tk.Text(preview_frame, wrap="word", yscrollcommand=preview_scrollbar.set, state="disabled")
+    preview.pack(side="left", fill="both", expand=True)
+    preview_scrollbar.config(command=preview.yview)
 
     buttons = tk.Frame(dialog)
     buttons.pack(fill="x", padx=12, pady=(0, 12))
+    rendered: dict[Path, str] = {}
+
+    def render_preview(template) -> str:
+        # Rendered from the cached template text the same way the note will be
+        # when it is saved, once per template while the dialog is open.
+        if template.path not in rendered:
+            now = datetime.now()
+            rendered[template.path] = tokens.apply_tokens(
+                text=template.text.rstrip(),
+                config_path=TOKENS_CONFIG_PATH,
+                file_path=None,
+                created_at=now,
+                updated_at=now,
+                file_prefix=FILE_PREFIX,
+            )
+        return rendered[template.path]
+
+    def show_preview(_event=None) -> None:
+        selection = listbox.curselection()
+        if not selection or selection[0] >= len(templates):
+            return
+        template = templates[selection[0]]
+        details = []
+        if template.variables:
+            details.append("Variabler: " + ", ".join(template.variables))
+        if template.tokens:
+            details.append("Tokens: " + ", ".join(template.tokens))
+        info_label.config(text="\n".join(details) or "Inga variabler eller tokens.")
+
+        # Nothing is read from disk while moving through the list.
+        preview.config(state="normal")
+        preview.delete("1.0", tk.END)
+        preview.insert("1.0", render_preview(template))
+        preview.config(state="disabled")
 
     def selected_template() -> Path | None:
         selection = listbox.curselection()
@@ -97,9 +152,9 @@ def open_template_dialog(
             return None
 
         idx = selection[0]
-        if idx >= len(template_files):
+        if idx >= len(templates):
             return None
-        return template_files[idx]
+        return templates[idx].path
 
     def create_selected() -> None:
         file_path = selected_template()
@@ -117,6 +172,9 @@ def open_template_dialog(
     attach_tooltip(close_button, "template.close", "Temporär tooltip: Stäng mallfönstret utan att skapa.")
 
     listbox.bind("<Double-Button-1>", lambda _event: create_selected())
+    listbox.bind("<<ListboxSelect>>", show_preview)
+    listbox.selection_set(0)
+    show_preview()
     apply_theme(dialog)
 
 
@@ -141,87 +199,42 @@ def open_notes_dialog(
     filter_entry.pack(side="left", fill="x", expand=True)
     attach_tooltip(filter_entry, "notes.filter", "Filtrera anteckningar efter titel eller text.")
 
-    sort_var = tk.StringVar(value="Senast ändrad")
-    sort_menu = tk.OptionMenu(control_bar, sort_var, "Senast ändrad", "Skapad", "Titel", "Filnamn")
+    sort_var = tk.StringVar(value=notes_list.SORT_UPDATED)
+    sort_menu = tk.OptionMenu(control_bar, sort_var, *notes_list.SORT_OPTIONS)
     sort_menu.pack(side="right", padx=(8, 0))
 
-    list_frame = tk.Frame(dialog)
-    list_frame.pack(fill="both", expand=True, padx=12, pady=(0, 8))
-
-    scrollbar = tk.Scrollbar(list_frame)
-    scrollbar.pack(side="right", fill="y")
-
-    listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set)
-    listbox.pack(side="left", fill="both", expand=True)
-    scrollbar.config(command=listbox.yview)
+    model = notes_list.NotesListModel()
+    view = ui_virtual_list.VirtualListView(dialog, model, on_activate=lambda: open_selected())
+    view.pack(fill="both", expand=True, padx=12, pady=(0, 8))
 
     buttons = tk.Frame(dialog)
     buttons.pack(fill="x", padx=12, pady=(0, 12))
 
-    note_files: list[Path] = []
-
-    def build_note_meta(file_path: Path) -> dict[str, object]:
-        text = file_path.read_text(encoding="utf-8").strip()
-        title = storage.extract_note_title(text) or file_path.stem
-        compact_text = " ".join(text.split())
-        preview = compact_text[:60].rstrip() + "..." if len(compact_text) > 60 else compact_text
-        if not preview:
-            preview = "(tom anteckning)"
-        label = f"{title} ({file_path.name}) - {preview}"
-        try:
-            stat = file_path.stat()
-            created = stat.st_ctime
-            updated = stat.st_mtime
-        except OSError:
-            created = 0
-            updated = 0
-        return {
-            "path": file_path,
-            "title": title.lower(),
-            "name": file_path.name.lower(),
-            "preview": preview.lower(),
-            "created": created,
-            "updated": updated,
-            "label": label,
-        }
-
-    def refresh_list() -> None:
-        nonlocal note_files
-        note_files = storage.list_note_files()
-        listbox.delete(0, tk.END)
-        query = filter_var.get().strip().lower()
-        metas = [build_note_meta(file_path) for file_path in note_files]
-        if query:
-            metas = [
-                meta
-                for meta in metas
-                if query in meta["title"] or query in meta["name"] or query in meta["preview"]
+    def load_notes() -> None:
+        model.set_rows(
+            [
+                notes_list.row_from_meta(
+                    meta,
+                    storage.NOTES_DIR,
+                    storage.format_note_label(meta.title, meta.name, meta.preview, notes_list.PREVIEW_CHARS),
+                )
+                for meta in storage.list_note_metas()
             ]
+        )
 
-        sort_key = sort_var.get()
-        if sort_key == "Skapad":
-            metas.sort(key=lambda meta: meta["created"], reverse=True)
-        elif sort_key == "Titel":
-            metas.sort(key=lambda meta: meta["title"])
-        elif sort_key == "Filnamn":
-            metas.sort(key=lambda meta: meta["name"])
-        else:
-            metas.sort(key=lambda meta: meta["updated"], reverse=True)
-
-        note_files = [meta["path"] for meta in metas]
-        for meta in metas:
-            listbox.insert(tk.END, meta["label"])
+    def refresh_list(update_model) -> None:
+        # Only the rows in view are redrawn, so this stays cheap however
+        # many notes the model holds.
+        with diagnostics.measure("notes_dialog.refresh_list"):
+            update_model()
+            view.refresh()
 
     def selected_file() -> Path | None:
-        selection = listbox.curselection()
-        if not selection:
+        row = model.selected_row()
+        if row is None:
             messagebox.showinfo("Ingen vald", "Välj en anteckning i listan.", parent=dialog)
             return None
-
-        idx = selection[0]
-        if idx >= len(note_files):
-            return None
-        return note_files[idx]
+        return row.path
 
     def open_selected() -> None:
         file_path = selected_file()
@@ -244,7 +257,7 @@ def open_notes_dialog(
             return
 
         on_delete(file_path)
-        refresh_list()
+        refresh_list(load_notes)
 
     open_button = tk.Button(buttons, text="Öppna", command=open_selected, width=10)
     open_button.pack(side="left")
@@ -258,9 +271,272 @@ def open_notes_dialog(
     close_button.pack(side="right")
     attach_tooltip(close_button, "notes.close", "Temporär tooltip: Stäng anteckningslistan.")
 
+    refresh_list(load_notes)
+    filter_entry.bind("<KeyRelease>", lambda _event: refresh_list(lambda: model.set_query(filter_var.get())))
+    # Arrow keys move the selection while the filter keeps focus.
+    filter_entry.bind("<Up>", lambda _event: view.move_selection(-1))
+    filter_entry.bind("<Down>", lambda _event: view.move_selection(1))
+    sort_var.trace_add("write", lambda *_args: refresh_list(lambda: model.set_sort(sort_var.get())))
+    apply_theme(dialog)
+
+
+def open_fulltext_dialog(
+    window: tk.Tk,
+    on_open,
+    apply_theme,
+    attach_tooltip,
+) -> None:
+    storage.sync_fulltext_index()
+
+    dialog = tk.Toplevel(window)
+    dialog.title("Sök i alla anteckningar")
+    dialog.geometry("560x380")
+    dialog.transient(window)
+    dialog.grab_set()
+
+    query_var = tk.StringVar()
+    query_entry = tk.Entry(dialog, textvariable=query_var)
+    query_entry.pack(fill="x", padx=12, pady=(12, 4))
+    attach_tooltip(query_entry, "fulltext.query", "Sök efter ord i alla sparade anteckningar.")
+
+    list_frame = tk.Frame(dialog)
+    list_frame.pack(fill="both", expand=True, padx=12, pady=(0, 8))
+
+    scrollbar = tk.Scrollbar(list_frame)
+    scrollbar.pack(side="right", fill="y")
+
+    listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set)
+    listbox.pack(side="left", fill="both", expand=True)
+    scrollbar.config(command=listbox.yview)
+
+    result_label = tk.Label(dialog, text="", anchor="w")
+    result_label.pack(fill="x", padx=12)
+
+    buttons = tk.Frame(dialog)
+    buttons.pack(fill="x", padx=12, pady=(4, 12))
+
+    hit_files: list[Path] = []
+
+    def refresh_results() -> None:
+        nonlocal hit_files
+        listbox.delete(0, tk.END)
+        query = query_var.get().strip()
+        hits = storage.search_notes(query) if query else []
+        hit_files = [storage.NOTES_DIR / hit.name for hit in hits]
+        for hit in hits:
+            listbox.insert(tk.END, f"{hit.title} ({hit.name}) - {hit.snippet}")
+        if not query:
+            result_label.config(text="")
+        elif len(hits) == 1:
+            result_label.config(text="1 träff")
+        else:
+            result_label.config(text=f"{len(hits)} träffar")
+
+    def open_selected() -> None:
+        selection = listbox.curselection()
+        if not selection:
+            messagebox.showinfo("Ingen vald", "Välj en anteckning i listan.", parent=dialog)
+            return
+        idx = selection[0]
+        if idx >= len(hit_files):
+            return
+        on_open(hit_files[idx])
+        dialog.destroy()
+
+    open_button = tk.Button(buttons, text="Öppna", command=open_selected, width=10)
+    open_button.pack(side="left")
+    attach_tooltip(open_button, "fulltext.open", "Öppna vald anteckning.")
+
+    close_button = tk.Button(buttons, text="Stäng", command=dialog.destroy, width=10)
+    close_button.pack(side="right")
+    attach_tooltip(close_button, "fulltext.close", "Stäng sökfönstret.")
+
     listbox.bind("<Double-Button-1>", lambda _event: open_selected())
+    query_entry.bind("<KeyRelease>", lambda _event: refresh_results())
+    query_entry.bind("<Return>", lambda _event: open_selected())
+    query_entry.focus_set()
+    apply_theme(dialog)
+
+
+def open_batch_export_dialog(
+    window: tk.Tk,
+    on_export,
+    apply_theme,
+    attach_tooltip,
+) -> None:
+    metas = storage.list_note_metas()
+    if not metas:
+        messagebox.showinfo("Inga anteckningar", "Det finns inga sparade anteckningar att exportera.")
+        return
+
+    dialog = tk.Toplevel(window)
+    dialog.title("Exportera flera anteckningar")
+    dialog.geometry("480x420")
+    dialog.transient(window)
+    dialog.grab_set()
+
+    list_frame = tk.Frame(dialog)
+    list_frame.pack(fill="both", expand=True, padx=12, pady=(12, 8))
+
+    scrollbar = tk.Scrollbar(list_frame)
+    scrollbar.pack(side="right", fill="y")
+
+    listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set, selectmode="extended", exportselection=False)
+    listbox.pack(side="left", fill="both", expand=True)
+    scrollbar.config(command=listbox.yview)
+
+    note_files = [storage.NOTES_DIR / meta.name for meta in metas]
+    for meta in metas:
+        listbox.insert(tk.END, storage.format_note_label(meta.title, meta.name, meta.preview, 60))
+
+    options = tk.Frame(dialog)
+    options.pack(fill="x", padx=12, pady=(0, 8))
+
+    all_var = tk.BooleanVar(value=True)
+    all_check = tk.Checkbutton(options, text="Alla anteckningar", variable=all_var)
+    all_check.pack(side="left")
+    attach_tooltip(all_check, "batch_export.all", "Exportera alla anteckningar i stället för markeringen.")
+
+    format_var = tk.StringVar(value=batch_export.BATCH_FORMATS[0])
+    format_menu = tk.OptionMenu(options, format_var, *batch_export.BATCH_FORMATS)
+    format_menu.pack(side="right")
+
+    target_var = tk.StringVar()
+    target_frame = tk.Frame(dialog)
+    target_frame.pack(fill="x", padx=12, pady=(0, 8))
+
+    target_entry = tk.Entry(target_frame, textvariable=target_var)
+    target_entry.pack(side="left", fill="x", expand=True)
+
+    def choose_target() -> None:
+        chosen = filedialog.askdirectory(title="Välj målmapp", parent=dialog)
+        if chosen:
+            target_var.set(chosen)
+
+    browse_button = tk.Button(target_frame, text="Välj mapp..", command=choose_target)
+    browse_button.pack(side="right", padx=(8, 0))
+    attach_tooltip(browse_button, "batch_export.target", "Välj mappen som exporterna skrivs till.")
+
+    listbox.bind("<<ListboxSelect>>", lambda _event: all_var.set(not listbox.curselection()))
+
+    buttons = tk.Frame(dialog)
+    buttons.pack(fill="x", padx=12, pady=(0, 12))
+
+    def export_selected() -> None:
+        target = target_var.get().strip()
+        if not target:
+            messagebox.showinfo("Ingen målmapp", "Välj en mapp att exportera till.", parent=dialog)
+            return
+        if all_var.get():
+            sources = list(note_files)
+        else:
+            sources = [note_files[idx] for idx in listbox.curselection() if idx < len(note_files)]
+        if not sources:
+            messagebox.showinfo("Ingen vald", "Välj minst en anteckning i listan.", parent=dialog)
+            return
+        on_export(sources, Path(target), format_var.get())
+        dialog.destroy()
+
+    export_button = tk.Button(buttons, text="Exportera", command=export_selected, width=10)
+    export_button.pack(side="left")
+    attach_tooltip(export_button, "batch_export.start", "Exportera anteckningarna till vald mapp.")
+
+    close_button = tk.Button(buttons, text="Stäng", command=dialog.destroy, width=10)
+    close_button.pack(side="right")
+    attach_tooltip(close_button, "batch_export.close", "Stäng exportfönstret.")
+
+    apply_theme(dialog)
+
+
+def open_diagnostics_dialog(
+    window: tk.Tk,
+    set_enabled,
+    apply_theme,
+    attach_tooltip,
+) -> None:
+    dialog = tk.Toplevel(window)
+    dialog.title("Diagnostik")
+    dialog.geometry("620x380")
+    dialog.transient(window)
+
+    enabled_var = tk.BooleanVar(value=diagnostics.is_enabled())
+    enabled_check = tk.Checkbutton(
+        dialog,
+        text="Mät tider för uppdatering, sparning och öppning",
+        variable=enabled_var,
+        anchor="w",
+    )
+    enabled_check.pack(fill="x", padx=12, pady=(12, 4))
+    attach_tooltip(enabled_check, "diagnostics.enabled", "Slå på mätningen. Avstängd kostar den ingenting.")
+
+    table_frame = tk.Frame(dialog)
+    table_frame.pack(fill="both", expand=True, padx=12, pady=(0, 8))
+
+    scrollbar = tk.Scrollbar(table_frame)
+    scrollbar.pack(side="right", fill="y")
+
+    table = tk.Text(table_frame, wrap="none", yscrollcommand=scrollbar.set, font="TkFixedFont", state="disabled")
+    table.pack(side="left", fill="both", expand=True)
+    scrollbar.config(command=table.yview)
+
+    buttons = tk.Frame(dialog)
+    buttons.pack(fill="x", padx=12, pady=(0, 12))
+
+    def refresh_table() -> None:
+        lines = [f"{'Steg':<30}{'antal':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for stage, values in diagnostics.summary().items():
+            lines.append(
+                f"{stage:<30}{int(values['count']):>7}"
+                f"{values['p50']:>9.2f}{values['p95']:>9.2f}{values['p99']:>9.2f}{values['max']:>9.2f}"
+            )
+        if len(lines) == 1:
+            lines.append("Inga mätningar ännu." if diagnostics.is_enabled() else "Mätningen är avstängd.")
+        else:
+            lines.append("")
+            lines.append("Tider i millisekunder.")
+        table.config(state="normal")
+        table.delete("1.0", tk.END)
+        table.insert("1.0", "\n".join(lines))
+        table.config(state="disabled")
+
+    def reset_table() -> None:
+        diagnostics.reset()
+        refresh_table()
+
+    def save_json() -> None:
+        path = filedialog.asksaveasfilename(
+            title="Spara diagnostik",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            parent=dialog,
+        )
+        if not path:
+            return
+        try:
+            diagnostics.dump(Path(path))
+        except OSError as exc:
+            messagebox.showerror("Kunde inte spara", str(exc), parent=dialog)
+
+    refresh_button = tk.Button(buttons, text="Uppdatera", command=refresh_table, width=10)
+    refresh_button.pack(side="left")
+    attach_tooltip(refresh_button, "diagnostics.refresh", "Läs in de senaste mätningarna.")
+
+    reset_button = tk.Button(buttons, text="Nollställ", command=reset_table, width=10)
+    reset_button.pack(side="left", padx=(8, 0))
+    attach_tooltip(reset_button, "diagnostics.reset", "Töm alla mätningar.")
+
+    save_button = tk.Button(buttons, text="Spara JSON..", command=save_json, width=12)
+    save_button.pack(side="left", padx=(8, 0))
+    attach_tooltip(save_button, "diagnostics.save", "Spara mätningarna med alla värden som JSON.")
+
+    close_button = tk.Button(buttons, text="Stäng", command=dialog.destroy, width=10)
+    close_button.pack(side="right")
+    attach_tooltip(close_button, "diagnostics.close", "Stäng diagnostikfönstret.")
+
+    def toggle_enabled() -> None:
+        set_enabled(enabled_var.get())
+        refresh_table()
 
-    refresh_list()
-    filter_entry.bind("<KeyRelease>", lambda _event: refresh_list())
-    sort_var.trace_add("write", lambda *_args: refresh_list())
+    enabled_check.config(command=toggle_enabled)
+    refresh_table()
     apply_theme(dialog)
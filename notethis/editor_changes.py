@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+import tkinter as tk
+
+from .text_tools import text_digest
+
+# How much of the buffer's end is inspected to discount trailing whitespace,
+# which saved text does not keep.
+TAIL_CHARS = 256
+
+# Text widgets are wrapped by renaming the real widget command and putting a
+# Tcl proc in its place. Every insert/delete/replace, including the ones run
+# by Tk's own bindings and by undo/redo, passes through the proc, which reports
+# the affected line range before and after the edit.
+_PROXY_SCRIPT = r"""
+proc ::notethis_text_proxy {orig callback op args} {
+    if {$op ni {insert delete replace} || [llength $args] == 0} {
+        return [$orig $op {*}$args]
+    }
+    switch -- $op {
+        insert {set marks [lrange $args 0 0]}
+        replace {set marks [lrange $args 0 1]}
+        default {set marks $args}
+    }
+    set end_line [lindex [split [$orig index end-1c] .] 0]
+    set first $end_line
+    set last 1
+    foreach mark $marks {
+        set line [lindex [split [$orig index $mark] .] 0]
+        if {$line > $end_line} {set line $end_line}
+        if {$line < $first} {set first $line}
+        if {$line > $last} {set last $line}
+    }
+    if {$op eq "delete" && [llength $marks] % 2 == 1} {
+        set line [lindex [split [$orig index "[lindex $marks end] +1c"] .] 0]
+        if {$line > $end_line} {set line $end_line}
+        if {$line > $last} {set last $line}
+    }
+    set old_text [$orig get $first.0 "$last.0 lineend"]
+    set result [$orig $op {*}$args]
+    set new_last [expr {$last + [lindex [split [$orig index end-1c] .] 0] - $end_line}]
+    if {$new_last < $first} {set new_last $first}
+    $callback $first $last $new_last $old_text [$orig get $first.0 "$new_last.0 lineend"]
+    return $result
+}
+"""
+
+
+@dataclass
+class EditEvent:
+    first_line: int
+    old_last_line: int
+    new_last_line: int
+    old_text: str
+    new_text: str
+
+    @property
+    def line_delta(self) -> int:
+        return self.new_last_line - self.old_last_line
+
+    @property
+    def char_delta(self) -> int:
+        return len(self.new_text) - len(self.old_text)
+
+
+def merge_pending_lines(pending: tuple[int, int] | None, event: EditEvent) -> tuple[int, int]:
+    if pending is None:
+        return event.first_line, event.new_last_line
+
+    first_line, last_line = pending
+    if first_line > event.old_last_line:
+        first_line += event.line_delta
+    if last_line > event.old_last_line:
+        last_line += event.line_delta
+    return min(first_line, event.first_line), max(last_line, event.new_last_line)
+
+
+class ChangeTracker:
+    def __init__(self) -> None:
+        self.text_widget: tk.Text | None = None
+        self.generation = 0
+        self.length = 0
+        self.saved_generation = 0
+        self.saved_length = 0
+        self.saved_digest = text_digest("")
+        self.listeners: list[Callable[[EditEvent], None]] = []
+        self._dirty_cache: tuple[int, bool] | None = None
+        self._callback_name: str | None = None
+
+    def attach(self, text_widget: tk.Text) -> None:
+        self.text_widget = text_widget
+        self.length = len(text_widget.get("1.0", "end-1c"))
+        widget_name = str(text_widget)
+        original_name = f"{widget_name}_notethis_orig"
+        text_widget.tk.eval(_PROXY_SCRIPT)
+        text_widget.tk.call("rename", widget_name, original_name)
+        callback_name = text_widget._register(self._handle_edit)
+        text_widget.tk.call(
+            "interp", "alias", "", widget_name, "", "::notethis_text_proxy", original_name, callback_name
+        )
+        self._callback_name = callback_name
+
+    def detach(self) -> None:
+        """Undo attach: drop the proxy alias and the registered callback."""
+        text_widget = self.text_widget
+        if text_widget is None or self._callback_name is None:
+            return
+        widget_name = str(text_widget)
+        try:
+            text_widget.tk.call("interp", "alias", "", widget_name, "")
+            text_widget.tk.call("rename", f"{widget_name}_notethis_orig", widget_name)
+        except tk.TclError:
+            # The widget was already destroyed along with its command.
+            pass
+        text_widget.deletecommand(self._callback_name)
+        self._callback_name = None
+        self.text_widget = None
+        self.listeners.clear()
+
+    def add_listener(self, listener: Callable[[EditEvent], None]) -> None:
+        self.listeners.append(listener)
+
+    def _handle_edit(self, first_line: str, old_last_line: str, new_last_line: str, old_text: str, new_text: str) -> None:
+        event = EditEvent(int(first_line), int(old_last_line), int(new_last_line), str(old_text), str(new_text))
+        self.generation += 1
+        self.length += event.char_delta
+        for listener in self.listeners:
+            listener(event)
+
+    def mark_saved(self, text: str, digest: str | None = None) -> None:
+        # Callers that already hold the saved text's digest pass it to skip a rehash.
+        self.saved_generation = self.generation
+        self.saved_length = len(text)
+        self.saved_digest = digest if digest is not None else text_digest(text)
+        self._dirty_cache = None
+
+    def reset_baseline(self) -> None:
+        self.saved_generation = -1
+        self.saved_length = 0
+        self.saved_digest = text_digest("")
+        self._dirty_cache = None
+
+    def _content_length(self) -> int | None:
+        """Length of the buffer without trailing whitespace, or None if it is not known cheaply."""
+        if self.text_widget is None:
+            return self.length
+        tail = self.text_widget.get(f"end-1c -{TAIL_CHARS}c", "end-1c")
+        stripped = tail.rstrip()
+        if not stripped and len(tail) < self.length:
+            # The whitespace runs on past the inspected tail.
+            return None
+        return self.length - (len(tail) - len(stripped))
+
+    def is_dirty(self) -> bool:
+        if self.generation == self.saved_generation:
+            return False
+        content_length = self._content_length()
+        if content_length is not None and content_length != self.saved_length:
+            return True
+        if self._dirty_cache is not None and self._dirty_cache[0] == self.generation:
+            return self._dirty_cache[1]
+
+        current = self.text_widget.get("1.0", tk.END).rstrip() if self.text_widget is not None else ""
+        dirty = text_digest(current) != self.saved_digest
+        if not dirty:
+            self.saved_generation = self.generation
+        self._dirty_cache = (self.generation, dirty)
+        return dirty
@@ -3,56 +3,110 @@ from __future__ import annotations
 import re
 import tkinter as tk
 
+from . import editor_stats
+from . import search_engine
+
+HEADING_TAGS = ("md_h1", "md_h2", "md_h3", "md_h4")
+HEADING_PATTERN = re.compile(r"^(#{1,4})\s+")
+SEARCH_TAG_BATCH = 2000
+
 
 def editor_text(text_widget: tk.Text) -> str:
     return text_widget.get("1.0", tk.END).rstrip()
 
 
-def is_dirty(text_widget: tk.Text, last_saved_text: str) -> bool:
-    return editor_text(text_widget) != last_saved_text
+def editor_raw_text(text_widget: tk.Text) -> str:
+    return text_widget.get("1.0", "end-1c")
 
 
-def update_document_stats(text_widget: tk.Text) -> tuple[int, int]:
-    raw_text = text_widget.get("1.0", "end-1c")
-    words = len(raw_text.split())
-    characters = len(raw_text)
-    return words, characters
+def selection_stats(text_widget: tk.Text) -> tuple[int, int] | None:
+    ranges = text_widget.tag_ranges("sel")
+    if not ranges:
+        return None
+    return editor_stats.text_stats(text_widget.get(ranges[0], ranges[1]))
 
 
-def apply_markdown_heading_styles(text_widget: tk.Text) -> None:
-    for tag_name in ("md_h1", "md_h2", "md_h3", "md_h4"):
-        text_widget.tag_remove(tag_name, "1.0", tk.END)
+def visible_line_range(text_widget: tk.Text) -> tuple[int, int]:
+    first_line = int(text_widget.index("@0,0").split(".")[0])
+    last_line = int(text_widget.index(f"@0,{text_widget.winfo_height()}").split(".")[0])
+    return first_line, last_line
 
+
+def apply_markdown_heading_styles(text_widget: tk.Text) -> None:
     end_line = int(text_widget.index("end-1c").split(".")[0])
-    for line_number in range(1, end_line + 1):
-        line_start = f"{line_number}.0"
-        line_end = f"{line_number}.end"
-        line_text = text_widget.get(line_start, line_end)
+    restyle_heading_lines(text_widget, 1, end_line)
+
 
-        match = re.match(r"^(#{1,4})\s+", line_text)
+def restyle_heading_lines(text_widget: tk.Text, first_line: int, last_line: int) -> None:
+    end_line = int(text_widget.index("end-1c").split(".")[0])
+    first_line = max(1, min(first_line, end_line))
+    last_line = max(first_line, min(last_line, end_line))
+    range_start = f"{first_line}.0"
+    range_end = f"{last_line}.end"
+    for tag_name in HEADING_TAGS:
+        text_widget.tag_remove(tag_name, range_start, range_end)
+
+    lines = text_widget.get(range_start, range_end).split("\n")
+    for offset, line_text in enumerate(lines):
+        match = HEADING_PATTERN.match(line_text)
         if not match:
             continue
 
+        line_number = first_line + offset
         level = len(match.group(1))
-        text_widget.tag_add(f"md_h{level}", line_start, line_end)
-
+        text_widget.tag_add(f"md_h{level}", f"{line_number}.0", f"{line_number}.end")
+
+
+def update_search_matches(
+    text_widget: tk.Text,
+    cache: search_engine.SearchCache,
+    query: search_engine.SearchQuery,
+    tag: str = "search_match",
+) -> int:
+    if not query.text:
+        if cache.query is not None:
+            text_widget.tag_remove(tag, "1.0", tk.END)
+            cache.reset()
+        return 0
 
-def update_search_matches(text_widget: tk.Text, query: str, tag: str = "search_match") -> int:
+    end_line = int(text_widget.index("end-1c").split(".")[0])
+    try:
+        changed = cache.update(
+            query,
+            lambda first_line, last_line: text_widget.get(f"{first_line}.0", f"{last_line}.end"),
+            end_line,
+        )
+    except re.error:
+        text_widget.tag_remove(tag, "1.0", tk.END)
+        cache.reset()
+        raise
+
+    if changed is not None:
+        first_line, last_line = changed
+        text_widget.tag_remove(tag, f"{first_line}.0", f"{last_line}.end")
+        indices: list[str] = []
+        for line_number, spans in cache.spans_in_range(first_line, last_line):
+            for start, end in spans:
+                indices.extend((f"{line_number}.{start}", f"{line_number}.{end}"))
+        for offset in range(0, len(indices), SEARCH_TAG_BATCH):
+            text_widget.tag_add(tag, *indices[offset:offset + SEARCH_TAG_BATCH])
+
+    return cache.count
+
+
+def tag_visible_search_matches(text_widget: tk.Text, query: search_engine.SearchQuery, tag: str = "search_match") -> int:
+    """Tag matches on the lines in view only, without touching a SearchCache."""
     text_widget.tag_remove(tag, "1.0", tk.END)
-    query = query.strip()
-    if not query:
+    if not query.text:
         return 0
 
-    start_index = "1.0"
-    matches = 0
-    while True:
-        match_index = text_widget.search(query, start_index, stopindex=tk.END, nocase=True)
-        if not match_index:
-            break
-
-        match_end = f"{match_index}+{len(query)}c"
-        text_widget.tag_add(tag, match_index, match_end)
-        start_index = match_end
-        matches += 1
-
-    return matches
+    first_line, last_line = visible_line_range(text_widget)
+    pattern = search_engine.compile_query(query)
+    text = text_widget.get(f"{first_line}.0", f"{last_line}.end")
+    count = 0
+    for offset, spans in search_engine.find_text_matches(pattern, query, text).items():
+        line_number = first_line + offset - 1
+        for start, end in spans:
+            text_widget.tag_add(tag, f"{line_number}.{start}", f"{line_number}.{end}")
+        count += len(spans)
+    return count
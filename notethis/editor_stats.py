@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from .editor_changes import EditEvent
+
+# Edits larger than this only mark the counts stale; the next read recounts
+# the whole buffer once instead of splitting every large paste twice.
+FULL_RECOUNT_CHARS = 20_000
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def text_stats(text: str) -> tuple[int, int]:
+    return count_words(text), len(text)
+
+
+class DocumentStats:
+    def __init__(self) -> None:
+        self.words = 0
+        self.characters = 0
+        self.stale = True
+
+    def invalidate(self) -> None:
+        self.stale = True
+
+    def recount(self, text: str) -> None:
+        self.words, self.characters = text_stats(text)
+        self.stale = False
+
+    def note_edit(self, event: EditEvent) -> None:
+        if self.stale:
+            return
+        if len(event.old_text) + len(event.new_text) > FULL_RECOUNT_CHARS:
+            self.stale = True
+            return
+        # Events carry whole lines and words never span a newline, so the
+        # difference between the old and new lines is exact.
+        self.words += count_words(event.new_text) - count_words(event.old_text)
+        self.characters += event.char_delta
+
+    def counts(self, read_text: Callable[[], str]) -> tuple[int, int]:
+        if self.stale:
+            self.recount(read_text())
+        return self.words, self.characters
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+import queue
+import threading
+import tkinter as tk
+from tkinter import messagebox, filedialog
+
+from . import batch_export
+from . import exporting
+from . import pdf_export
+
+PROGRESS_POLL_MS = 100
+
+
+def export_note(
+    text: str,
+    set_status: Callable[[str], None],
+    preferred_format: str | None = None,
+    window: tk.Misc | None = None,
+) -> None:
+    if not text.strip():
+        messagebox.showinfo("Ingen text", "Det finns ingen text att exportera.")
+        return
+
+    path, file_format = _ask_export_path(preferred_format)
+    if not path or not file_format:
+        return
+
+    if file_format in exporting.TEXT_FORMATS:
+        try:
+            exporting.write_export(text, Path(path), file_format)
+        except OSError as exc:
+            messagebox.showerror("Export misslyckades", f"Kunde inte skriva {Path(path).name}: {exc}")
+            return
+        set_status(f"Exporterad: {Path(path).name}")
+        return
+
+    if file_format == "pdf":
+        if window is None:
+            export_to_pdf(text, Path(path), set_status=set_status)
+        else:
+            export_to_pdf_in_background(window, text, Path(path), set_status=set_status)
+
+
+def _ask_export_path(preferred_format: str | None) -> tuple[str, str]:
+    order = list(exporting.EXPORT_FORMATS)
+    if preferred_format in order:
+        order.remove(preferred_format)
+        order.insert(0, preferred_format)
+
+    filetypes = [(exporting.FORMAT_LABELS[ext], f"*.{ext}") for ext in order]
+    default_ext = f".{order[0]}"
+    path = filedialog.asksaveasfilename(
+        title="Exportera anteckning",
+        defaultextension=default_ext,
+        filetypes=filetypes,
+    )
+    if not path:
+        return "", ""
+
+    ext = exporting.export_format_for(Path(path))
+    if ext is None:
+        messagebox.showerror("Okänt format", "Kan inte exportera till valt format.")
+        return "", ""
+    return path, ext
+
+
+def export_to_pdf(text: str, path: Path, set_status: Callable[[str], None]) -> None:
+    try:
+        pdf_export.export_pdf(text, path)
+    except pdf_export.PdfUnavailableError as exc:
+        messagebox.showwarning("PDF-stöd saknas", str(exc))
+        return
+    except OSError as exc:
+        messagebox.showerror("Export misslyckades", f"Kunde inte skriva {path.name}: {exc}")
+        return
+    set_status(f"Exporterad: {path.name}")
+
+
+def export_to_pdf_in_background(
+    window: tk.Misc,
+    text: str,
+    path: Path,
+    set_status: Callable[[str], None],
+) -> None:
+    # The worker only posts messages; dialogs and status updates stay on the
+    # Tk thread, which drains the queue with after().
+    messages: queue.SimpleQueue[tuple[str, object]] = queue.SimpleQueue()
+
+    def report_progress(done: int, total: int) -> None:
+        messages.put(("progress", done * 100 // total))
+
+    def run() -> None:
+        try:
+            result = pdf_export.export_pdf(text, path, progress=report_progress)
+        except Exception as exc:
+            messages.put(("error", exc))
+        else:
+            messages.put(("done", result))
+
+    def poll() -> None:
+        while True:
+            try:
+                kind, payload = messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                set_status(f"Exporterar {path.name}: {payload}%")
+            elif kind == "error":
+                if isinstance(payload, pdf_export.PdfUnavailableError):
+                    messagebox.showwarning("PDF-stöd saknas", str(payload))
+                else:
+                    messagebox.showerror("Export misslyckades", f"Kunde inte skriva {path.name}: {payload}")
+                return
+            else:
+                set_status(f"Exporterad: {path.name} ({payload.pages} sidor)")
+                return
+        window.after(PROGRESS_POLL_MS, poll)
+
+    set_status(f"Exporterar {path.name}...")
+    threading.Thread(target=run, name="notethis-pdf-export", daemon=True).start()
+    window.after(PROGRESS_POLL_MS, poll)
+
+
+def export_batch_in_background(
+    window: tk.Misc,
+    sources: list[Path],
+    target_dir: Path,
+    file_format: str,
+    set_status: Callable[[str], None],
+) -> None:
+    messages: queue.SimpleQueue[tuple[str, object]] = queue.SimpleQueue()
+
+    def report_progress(done: int, total: int) -> None:
+        messages.put(("progress", (done, total)))
+
+    def run() -> None:
+        try:
+            summary = batch_export.run_batch_export(sources, target_dir, file_format, progress=report_progress)
+        except Exception as exc:
+            messages.put(("error", exc))
+        else:
+            messages.put(("done", summary))
+
+    def poll() -> None:
+        while True:
+            try:
+                kind, payload = messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                done, total = payload
+                set_status(f"Exporterar anteckningar: {done}/{total}")
+            elif kind == "error":
+                if isinstance(payload, pdf_export.PdfUnavailableError):
+                    messagebox.showwarning("PDF-stöd saknas", str(payload))
+                else:
+                    messagebox.showerror("Export misslyckades", str(payload))
+                set_status("Export avbruten")
+                return
+            else:
+                set_status(f"Exporterade {payload.exported} av {len(payload.outcomes)} anteckningar")
+                messagebox.showinfo("Export klar", payload.format_summary())
+                return
+        window.after(PROGRESS_POLL_MS, poll)
+
+    set_status(f"Exporterar {len(sources)} anteckningar...")
+    threading.Thread(target=run, name="notethis-batch-export", daemon=True).start()
+    window.after(PROGRESS_POLL_MS, poll)
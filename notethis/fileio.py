@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+import os
+import stat
+import tempfile
+import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+DEFAULT_FILE_MODE = 0o644
+
+
+def fsync_directory(directory: Path) -> None:
+    if os.name == "nt":
+        return
+    try:
+        directory_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directory_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_fd)
+
+
+def atomic_write_bytes(path: Path, data: bytes, durable: bool = True) -> None:
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except OSError:
+        mode = DEFAULT_FILE_MODE
+
+    temp_fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(temp_fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            if durable:
+                os.fsync(handle.fileno())
+        os.chmod(temp_name, mode)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+    if durable:
+        fsync_directory(path.parent)
+
+
+def atomic_write_text(path: Path, text: str, durable: bool = True) -> None:
+    atomic_write_bytes(path, text.encode("utf-8"), durable=durable)
+
+
+def _try_lock_file(lock_fd: int) -> bool:
+    try:
+        if os.name == "nt":
+            os.lseek(lock_fd, 0, os.SEEK_SET)
+            msvcrt.locking(lock_fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock_file(lock_fd: int) -> None:
+    if os.name == "nt":
+        os.lseek(lock_fd, 0, os.SEEK_SET)
+        msvcrt.locking(lock_fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(lock_fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout: float):
+    """Hold an exclusive lock shared with other processes.
+
+    The lock file is never removed: the OS releases the lock when the holder
+    exits or crashes, so there is no stale lock to break and no way for a
+    slow holder to be overtaken by a second writer. The lock is per open
+    file, so callers serialize their own threads before taking it.
+    """
+    deadline = time.monotonic() + timeout
+    lock_fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, DEFAULT_FILE_MODE)
+    try:
+        while not _try_lock_file(lock_fd):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{lock_path} hålls av en annan process")
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            _unlock_file(lock_fd)
+    finally:
+        os.close(lock_fd)
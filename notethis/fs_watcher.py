@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+import os
+import struct
+import sys
+
+CHANGED = "changed"
+DELETED = "deleted"
+# The watcher lost track of the directory (queue overflow, directory
+# recreated); consumers should reconcile with a stat walk.
+RESCAN = "rescan"
+
+INOTIFY_POLL_MS = 500
+STAT_POLL_MS = 2000
+READ_BUFFER_SIZE = 64 * 1024
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    kind: str
+    path: Path
+
+
+def coalesce(events: list[ChangeEvent]) -> list[ChangeEvent]:
+    """Keep the last event per path, so a burst of writes costs one update."""
+    latest: dict[Path, ChangeEvent] = {}
+    for event in events:
+        if event.kind == RESCAN:
+            return [event]
+        latest.pop(event.path, None)
+        latest[event.path] = event
+    return list(latest.values())
+
+
+class PollingWatcher:
+    """Diff (mtime, size) snapshots of a directory; works everywhere."""
+
+    poll_interval_ms = STAT_POLL_MS
+
+    def __init__(self, directory: Path, pattern: str) -> None:
+        self.directory = directory
+        self.pattern = pattern
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot: dict[str, tuple[int, int]] = {}
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if not fnmatch(entry.name, self.pattern):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def poll(self) -> list[ChangeEvent]:
+        current = self._scan()
+        events = [
+            ChangeEvent(CHANGED, self.directory / name)
+            for name, signature in current.items()
+            if self.snapshot.get(name) != signature
+        ]
+        events += [ChangeEvent(DELETED, self.directory / name) for name in self.snapshot.keys() - current.keys()]
+        self.snapshot = current
+        return events
+
+    def close(self) -> None:
+        self.snapshot = {}
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    # ctypes costs ~10 ms to import; only the Linux watcher needs it.
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class InotifyWatcher:
+    """Read inotify events for one directory without blocking the caller."""
+
+    poll_interval_ms = INOTIFY_POLL_MS
+
+    def __init__(self, directory: Path, pattern: str, libc) -> None:
+        import ctypes
+
+        self.directory = directory
+        self.pattern = pattern
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watching = False
+        if not self._add_watch():
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def _add_watch(self) -> bool:
+        self.watching = self.libc.inotify_add_watch(self.fd, os.fsencode(self.directory), WATCH_MASK) >= 0
+        return self.watching
+
+    def _read(self) -> bytes:
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self.fd, READ_BUFFER_SIZE)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def parse(self, data: bytes) -> list[ChangeEvent]:
+        events: list[ChangeEvent] = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    self.watching = False
+                events.append(ChangeEvent(RESCAN, self.directory))
+                continue
+            if not name or not fnmatch(name, self.pattern):
+                continue
+            kind = DELETED if mask & (IN_DELETE | IN_MOVED_FROM) else CHANGED
+            events.append(ChangeEvent(kind, self.directory / name))
+        return events
+
+    def poll(self) -> list[ChangeEvent]:
+        events = self.parse(self._read())
+        if not self.watching and self.directory.is_dir() and self._add_watch():
+            events.append(ChangeEvent(RESCAN, self.directory))
+        return coalesce(events)
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(directory: Path, pattern: str) -> InotifyWatcher | PollingWatcher:
+    libc = _load_libc()
+    if libc is not None:
+        try:
+            return InotifyWatcher(directory, pattern, libc)
+        except OSError:
+            # Out of watches or an unsupported filesystem; polling still works.
+            pass
+    return PollingWatcher(directory, pattern)
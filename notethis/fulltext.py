@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import json
+import math
+import os
+import re
+import threading
+
+from . import fileio
+from .paths import INDEX_DIR_NAME
+from .text_tools import extract_note_title
+
+SNAPSHOT_FILE_NAME = "fulltext.json"
+JOURNAL_FILE_NAME = "fulltext.log"
+LOCK_FILE_NAME = "fulltext.lock"
+# Compaction holds the lock while it re-reads changed notes.
+LOCK_TIMEOUT_SECONDS = 30
+INDEX_VERSION = 2
+COMPACT_AFTER_ENTRIES = 200
+SNIPPET_BEFORE = 40
+SNIPPET_AFTER = 80
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class IndexedNote:
+    name: str
+    title: str
+    mtime_ns: int
+    size: int
+    terms: dict[str, int]
+    length: int
+
+
+@dataclass
+class SearchHit:
+    name: str
+    title: str
+    score: float
+    snippet: str
+
+
+def put_entry(name: str, mtime_ns: int, size: int) -> dict:
+    return {"op": "put", "name": name, "mtime_ns": mtime_ns, "size": size}
+
+
+def tokenize(text: str) -> list[tuple[str, int]]:
+    return [(match.group(0).lower(), match.start()) for match in TOKEN_PATTERN.finditer(text)]
+
+
+class FullTextIndex:
+    def __init__(self, notes_dir: Path) -> None:
+        self.notes_dir = notes_dir
+        self.notes: dict[str, IndexedNote] = {}
+        self.postings: dict[str, dict[str, list[int]]] = {}
+        self.total_length = 0
+        self._sorted_terms: list[str] | None = None
+
+    @property
+    def index_dir(self) -> Path:
+        return self.notes_dir / INDEX_DIR_NAME
+
+    def _add(self, name: str, text: str, mtime_ns: int, size: int) -> None:
+        self._remove(name)
+        compact_text = " ".join(text.split())
+        positions: dict[str, list[int]] = {}
+        for term, offset in tokenize(compact_text):
+            positions.setdefault(term, []).append(offset)
+
+        for term, offsets in positions.items():
+            self.postings.setdefault(term, {})[name] = offsets
+        note = IndexedNote(
+            name=name,
+            title=extract_note_title(text.strip()) or Path(name).stem,
+            mtime_ns=mtime_ns,
+            size=size,
+            terms={term: len(offsets) for term, offsets in positions.items()},
+            length=sum(len(offsets) for offsets in positions.values()),
+        )
+        self.notes[name] = note
+        self.total_length += note.length
+        self._sorted_terms = None
+
+    def _remove(self, name: str) -> None:
+        note = self.notes.pop(name, None)
+        if note is None:
+            return
+        for term in note.terms:
+            term_postings = self.postings.get(term)
+            if term_postings is None:
+                continue
+            term_postings.pop(name, None)
+            if not term_postings:
+                del self.postings[term]
+        self.total_length -= note.length
+        self._sorted_terms = None
+
+    def update_note(self, name: str, text: str, mtime_ns: int, size: int) -> None:
+        self._add(name, text, mtime_ns, size)
+        append_journal(self.notes_dir, put_entry(name, mtime_ns, size))
+
+    def remove_note(self, name: str) -> None:
+        if name not in self.notes:
+            return
+        self._remove(name)
+        append_journal(self.notes_dir, {"op": "del", "name": name})
+
+    def _refresh_from_disk(self, name: str) -> None:
+        path = self.notes_dir / name
+        try:
+            stat = path.stat()
+            note = self.notes.get(name)
+            if note is not None and (note.mtime_ns, note.size) == (stat.st_mtime_ns, stat.st_size):
+                return
+            text = path.read_text(encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            self._remove(name)
+            return
+        except OSError:
+            return
+        self._add(name, text, stat.st_mtime_ns, stat.st_size)
+
+    def _read_journal(self) -> tuple[list[dict], int]:
+        try:
+            lines = (self.index_dir / JOURNAL_FILE_NAME).read_text(encoding="utf-8").splitlines()
+        except OSError:
+            lines = []
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            # Entries that parse but are incomplete are skipped like bad JSON.
+            if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+                continue
+            if entry.get("op") == "put":
+                if isinstance(entry.get("mtime_ns"), int) and isinstance(entry.get("size"), int):
+                    entries.append(entry)
+            elif entry.get("op") == "del":
+                entries.append(entry)
+        return entries, len(lines)
+
+    def _replay(self, entries: list[dict]) -> None:
+        # The journal names what changed; the text is read back from the
+        # notes themselves, once per note however often it was saved.
+        latest = {entry["name"]: entry for entry in entries}
+        for name, entry in latest.items():
+            note = self.notes.get(name)
+            indexed = note is not None and (note.mtime_ns, note.size) == (entry.get("mtime_ns"), entry.get("size"))
+            if entry["op"] == "put" and indexed:
+                continue
+            self._refresh_from_disk(name)
+
+    def load(self) -> None:
+        with journal_lock(self.notes_dir):
+            try:
+                payload = json.loads((self.index_dir / SNAPSHOT_FILE_NAME).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                payload = {}
+            entries, line_count = self._read_journal()
+
+        if payload.get("version") == INDEX_VERSION:
+            try:
+                self.notes = {item["name"]: IndexedNote(**item) for item in payload.get("notes", [])}
+                self.postings = payload.get("postings", {})
+            except (TypeError, KeyError):
+                self.notes = {}
+                self.postings = {}
+        self.total_length = sum(note.length for note in self.notes.values())
+        self._replay(entries)
+        _journal_lines[self.notes_dir] = line_count
+
+    def save(self) -> None:
+        with journal_lock(self.notes_dir):
+            # Another process may have appended since this index was loaded;
+            # fold its entries in before the journal is dropped.
+            entries, _line_count = self._read_journal()
+            self._replay(entries)
+            payload = {
+                "version": INDEX_VERSION,
+                "notes": [asdict(note) for note in self.notes.values()],
+                "postings": self.postings,
+            }
+            snapshot_path = self.index_dir / SNAPSHOT_FILE_NAME
+            fileio.atomic_write_text(snapshot_path, json.dumps(payload, ensure_ascii=False), durable=False)
+            (self.index_dir / JOURNAL_FILE_NAME).unlink(missing_ok=True)
+            _journal_lines[self.notes_dir] = 0
+
+    def sync(self, file_stats: dict[str, tuple[int, int]]) -> int:
+        changed = 0
+        for name in [name for name in self.notes if name not in file_stats]:
+            self.remove_note(name)
+            changed += 1
+
+        for name, (mtime_ns, size) in file_stats.items():
+            note = self.notes.get(name)
+            if note is not None and note.mtime_ns == mtime_ns and note.size == size:
+                continue
+            try:
+                text = (self.notes_dir / name).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            self.update_note(name, text, mtime_ns, size)
+            changed += 1
+        return changed
+
+    def _expand_prefix(self, prefix: str) -> list[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        terms = []
+        position = bisect_left(self._sorted_terms, prefix)
+        while position < len(self._sorted_terms) and self._sorted_terms[position].startswith(prefix):
+            terms.append(self._sorted_terms[position])
+            position += 1
+        return terms
+
+    def search(self, query: str, limit: int = 50) -> list[SearchHit]:
+        query_terms = [term for term, _offset in tokenize(query)]
+        if not query_terms or not self.notes:
+            return []
+
+        term_groups = [[term] for term in query_terms[:-1]]
+        term_groups.append(self._expand_prefix(query_terms[-1]))
+
+        candidates: set[str] | None = None
+        for group in term_groups:
+            names = set()
+            for term in group:
+                names.update(self.postings.get(term, {}))
+            candidates = names if candidates is None else candidates & names
+            if not candidates:
+                return []
+
+        note_count = len(self.notes)
+        average_length = self.total_length / note_count or 1
+        scored: list[tuple[float, str]] = []
+        for name in candidates:
+            note = self.notes[name]
+            score = 0.0
+            for group in term_groups:
+                for term in group:
+                    offsets = self.postings.get(term, {}).get(name)
+                    if not offsets:
+                        continue
+                    document_frequency = len(self.postings[term])
+                    idf = math.log(1 + (note_count - document_frequency + 0.5) / (document_frequency + 0.5))
+                    frequency = len(offsets)
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * note.length / average_length)
+                    score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            scored.append((score, name))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        hits = []
+        for score, name in scored[:limit]:
+            note = self.notes[name]
+            hits.append(SearchHit(name=name, title=note.title, score=score, snippet=self._snippet(note, term_groups)))
+        return hits
+
+    def _note_text(self, name: str) -> str:
+        # Offsets in the postings refer to the whitespace-collapsed text.
+        try:
+            return " ".join((self.notes_dir / name).read_text(encoding="utf-8", errors="replace").split())
+        except OSError:
+            return ""
+
+    def _snippet(self, note: IndexedNote, term_groups: list[list[str]]) -> str:
+        offsets = [
+            self.postings[term][note.name][0]
+            for group in term_groups
+            for term in group
+            if note.name in self.postings.get(term, {})
+        ]
+        text = self._note_text(note.name)
+        start = max(0, min(offsets, default=0) - SNIPPET_BEFORE)
+        end = start + SNIPPET_BEFORE + SNIPPET_AFTER
+        snippet = text[start:end].strip()
+        if start > 0:
+            snippet = "..." + snippet
+        if end < len(text):
+            snippet = snippet + "..."
+        return snippet
+
+
+_indexes: dict[Path, FullTextIndex] = {}
+# Saves run on autosave worker threads, so index updates and journal appends
+# are serialized with searches from the UI thread.
+index_lock = threading.RLock()
+# Journal length per directory, counted once from disk and then kept up to
+# date, so saves made while no index is loaded know when to compact.
+_journal_lines: dict[Path, int] = {}
+
+
+@contextmanager
+def journal_lock(notes_dir: Path):
+    """Serialize journal appends, compaction and snapshot writes across processes."""
+    index_dir = notes_dir / INDEX_DIR_NAME
+    index_dir.mkdir(parents=True, exist_ok=True)
+    with index_lock, fileio.file_lock(index_dir / LOCK_FILE_NAME, LOCK_TIMEOUT_SECONDS):
+        yield
+
+
+def journal_line_count(notes_dir: Path) -> int:
+    count = _journal_lines.get(notes_dir)
+    if count is None:
+        try:
+            count = (notes_dir / INDEX_DIR_NAME / JOURNAL_FILE_NAME).read_bytes().count(b"\n")
+        except OSError:
+            count = 0
+        _journal_lines[notes_dir] = count
+    return count
+
+
+def append_journal(notes_dir: Path, entry: dict) -> int:
+    with journal_lock(notes_dir):
+        count = journal_line_count(notes_dir)
+        with (notes_dir / INDEX_DIR_NAME / JOURNAL_FILE_NAME).open("a", encoding="utf-8") as journal:
+            journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        _journal_lines[notes_dir] = count + 1
+    return count + 1
+
+
+def compact_journal(notes_dir: Path) -> None:
+    # Folds the journal into the snapshot without keeping the index loaded.
+    index = FullTextIndex(notes_dir)
+    index.load()
+    index.save()
+
+
+def needs_compaction(notes_dir: Path) -> bool:
+    return journal_line_count(notes_dir) >= COMPACT_AFTER_ENTRIES
+
+
+def compact_if_needed(notes_dir: Path) -> bool:
+    """Fold a long journal into the snapshot; callers run this off the save path."""
+    with index_lock:
+        if not needs_compaction(notes_dir):
+            return False
+        index = _indexes.get(notes_dir)
+        if index is not None:
+            index.save()
+        else:
+            compact_journal(notes_dir)
+        return True
+
+
+def get_index(notes_dir: Path) -> FullTextIndex:
+    with index_lock:
+        index = _indexes.get(notes_dir)
+        if index is None:
+            index = FullTextIndex(notes_dir)
+            index.load()
+            _indexes[notes_dir] = index
+        return index
+
+
+def reset_index(notes_dir: Path) -> None:
+    with journal_lock(notes_dir):
+        _indexes.pop(notes_dir, None)
+        _journal_lines.pop(notes_dir, None)
+        index_dir = notes_dir / INDEX_DIR_NAME
+        (index_dir / SNAPSHOT_FILE_NAME).unlink(missing_ok=True)
+        (index_dir / JOURNAL_FILE_NAME).unlink(missing_ok=True)
+
+
+def record_note(file_path: Path, text: str, stat: os.stat_result | None = None) -> None:
+    if stat is None:
+        stat = file_path.stat()
+    with index_lock:
+        index = _indexes.get(file_path.parent)
+        if index is not None:
+            index.update_note(file_path.name, text, stat.st_mtime_ns, stat.st_size)
+            return
+        append_journal(file_path.parent, put_entry(file_path.name, stat.st_mtime_ns, stat.st_size))
+
+
+def forget_note(file_path: Path) -> None:
+    with index_lock:
+        index = _indexes.get(file_path.parent)
+        if index is not None:
+            index.remove_note(file_path.name)
+            return
+        append_journal(file_path.parent, {"op": "del", "name": file_path.name})
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+# Notes above this many characters are inserted a chunk at a time from the
+# event loop instead of in one Text.insert call that freezes the window.
+LARGE_FILE_CHARS = 2_000_000
+CHUNK_CHARS = 256 * 1024
+LOAD_STEP_MS = 1
+
+
+def is_large(char_count: int, threshold: int = LARGE_FILE_CHARS) -> bool:
+    return char_count > threshold
+
+
+def iter_chunks(text: str, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    """Yield slices of about chunk_chars, ending after a newline when possible.
+
+    Whole lines per chunk let the line-based heading pass style each chunk
+    on its own as it arrives.
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_chars, length)
+        if end < length:
+            cut = text.rfind("\n", start, end)
+            if cut >= start:
+                end = cut + 1
+        yield text[start:end]
+        start = end
+
+
+class ChunkedLoad:
+    def __init__(self, text: str, chunk_chars: int = CHUNK_CHARS) -> None:
+        self.total = len(text)
+        self.loaded = 0
+        self._chunks = iter_chunks(text, chunk_chars)
+        self.done = self.total == 0
+
+    def next_chunk(self) -> str:
+        chunk = next(self._chunks, "")
+        self.loaded += len(chunk)
+        self.done = self.loaded >= self.total
+        return chunk
+
+    @property
+    def percent(self) -> int:
+        if self.total == 0:
+            return 100
+        return self.loaded * 100 // self.total
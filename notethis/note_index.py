@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+import atexit
+import hashlib
+import json
+import os
+
+from . import fileio
+from .paths import INDEX_DIR_NAME
+from .text_tools import compact_prefix, extract_note_title
+
+INDEX_FILE_NAME = "notes_meta.json"
+INDEX_VERSION = 1
+PREVIEW_CHARS = 240
+PARALLEL_READ_THRESHOLD = 16
+MAX_READ_WORKERS = 8
+
+
+@dataclass
+class NoteMeta:
+    name: str
+    title: str
+    preview: str
+    created: float
+    updated: float
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+_indexes: dict[Path, dict[str, NoteMeta]] = {}
+# Directories whose in-memory index has entries not yet written to disk.
+_dirty: set[Path] = set()
+
+
+def index_path(notes_dir: Path) -> Path:
+    return notes_dir / INDEX_DIR_NAME / INDEX_FILE_NAME
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def build_note_meta(file_path: Path, data: bytes, stat: os.stat_result) -> NoteMeta:
+    text = data.decode("utf-8", errors="replace").strip()
+    return NoteMeta(
+        name=file_path.name,
+        title=extract_note_title(text) or file_path.stem,
+        preview=compact_prefix(text, PREVIEW_CHARS + 1),
+        created=stat.st_ctime,
+        updated=stat.st_mtime,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        digest=content_digest(data),
+    )
+
+
+def is_current(meta: NoteMeta | None, stat: os.stat_result) -> bool:
+    return meta is not None and meta.mtime_ns == stat.st_mtime_ns and meta.size == stat.st_size
+
+
+def load_index(notes_dir: Path) -> dict[str, NoteMeta]:
+    cached = _indexes.get(notes_dir)
+    if cached is not None:
+        return cached
+
+    entries: dict[str, NoteMeta] = {}
+    try:
+        payload = json.loads(index_path(notes_dir).read_text(encoding="utf-8"))
+        if payload.get("version") == INDEX_VERSION:
+            for item in payload.get("notes", []):
+                meta = NoteMeta(**item)
+                entries[meta.name] = meta
+    except (OSError, ValueError, TypeError, AttributeError):
+        entries = {}
+
+    _indexes[notes_dir] = entries
+    return entries
+
+
+def reset_index(notes_dir: Path) -> None:
+    _indexes.pop(notes_dir, None)
+    _dirty.discard(notes_dir)
+    index_path(notes_dir).unlink(missing_ok=True)
+
+
+def save_index(notes_dir: Path, entries: dict[str, NoteMeta]) -> None:
+    path = index_path(notes_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": INDEX_VERSION, "notes": [asdict(meta) for meta in entries.values()]}
+    fileio.atomic_write_text(path, json.dumps(payload, ensure_ascii=False), durable=False)
+    _dirty.discard(notes_dir)
+
+
+def flush() -> None:
+    for notes_dir in list(_dirty):
+        entries = _indexes.get(notes_dir)
+        if entries is None:
+            _dirty.discard(notes_dir)
+        else:
+            save_index(notes_dir, entries)
+
+
+# note_meta only marks the index dirty; whatever is left is written on exit.
+atexit.register(flush)
+
+
+def _read_meta(item: tuple[Path, os.stat_result]) -> NoteMeta | None:
+    file_path, stat = item
+    try:
+        data = file_path.read_bytes()
+    except OSError:
+        return None
+    return build_note_meta(file_path, data, stat)
+
+
+def _read_metas(stale: list[tuple[Path, os.stat_result]]) -> list[NoteMeta | None]:
+    if len(stale) < PARALLEL_READ_THRESHOLD:
+        return [_read_meta(item) for item in stale]
+
+    workers = min(MAX_READ_WORKERS, len(stale))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_read_meta, stale))
+
+
+def refresh_index(notes_dir: Path, pattern: str) -> dict[str, NoteMeta]:
+    entries = load_index(notes_dir)
+    current: dict[str, NoteMeta] = {}
+    stale: list[tuple[Path, os.stat_result]] = []
+
+    try:
+        with os.scandir(notes_dir) as scan:
+            for entry in scan:
+                if not fnmatch(entry.name, pattern):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                meta = entries.get(entry.name)
+                if is_current(meta, stat):
+                    current[entry.name] = meta
+                else:
+                    stale.append((Path(entry.path), stat))
+    except FileNotFoundError:
+        pass
+
+    for meta in _read_metas(stale):
+        if meta is not None:
+            current[meta.name] = meta
+
+    changed = bool(stale) or current.keys() != entries.keys() or notes_dir in _dirty
+    _indexes[notes_dir] = current
+    if changed:
+        save_index(notes_dir, current)
+    return current
+
+
+def apply_changes(
+    notes_dir: Path,
+    changed: list[tuple[Path, bytes, os.stat_result]],
+    removed: list[str],
+) -> None:
+    entries = load_index(notes_dir)
+    for file_path, data, stat in changed:
+        entries[file_path.name] = build_note_meta(file_path, data, stat)
+    for name in removed:
+        entries.pop(name, None)
+    if changed or removed:
+        save_index(notes_dir, entries)
+
+
+def note_meta(file_path: Path) -> NoteMeta:
+    notes_dir = file_path.parent
+    entries = load_index(notes_dir)
+    stat = file_path.stat()
+    meta = entries.get(file_path.name)
+    if is_current(meta, stat):
+        return meta
+
+    meta = build_note_meta(file_path, file_path.read_bytes(), stat)
+    entries[meta.name] = meta
+    # Rewriting the whole index per stale note would make a batch of
+    # lookups quadratic; callers flush once when the batch is done.
+    _dirty.add(notes_dir)
+    return meta
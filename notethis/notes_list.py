@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from .note_index import NoteMeta
+
+SORT_UPDATED = "Senast ändrad"
+SORT_CREATED = "Skapad"
+SORT_TITLE = "Titel"
+SORT_NAME = "Filnamn"
+SORT_OPTIONS = (SORT_UPDATED, SORT_CREATED, SORT_TITLE, SORT_NAME)
+PREVIEW_CHARS = 60
+
+
+@dataclass(frozen=True)
+class NoteRow:
+    path: Path
+    label: str
+    title: str
+    name: str
+    preview: str
+    created: float
+    updated: float
+
+
+def row_from_meta(meta: NoteMeta, notes_dir: Path, label: str) -> NoteRow:
+    preview = meta.preview[:PREVIEW_CHARS].rstrip() + "..." if len(meta.preview) > PREVIEW_CHARS else meta.preview
+    return NoteRow(
+        path=notes_dir / meta.name,
+        label=label,
+        title=meta.title.lower(),
+        name=meta.name.lower(),
+        preview=(preview or "(tom anteckning)").lower(),
+        created=meta.created,
+        updated=meta.updated,
+    )
+
+
+_SORTS: dict[str, tuple[Callable[[NoteRow], object], bool]] = {
+    SORT_UPDATED: (lambda row: row.updated, True),
+    SORT_CREATED: (lambda row: row.created, True),
+    SORT_TITLE: (lambda row: row.title, False),
+    SORT_NAME: (lambda row: row.name, False),
+}
+
+
+def matches(row: NoteRow, query: str) -> bool:
+    return not query or query in row.title or query in row.name or query in row.preview
+
+
+class NotesListModel:
+    """Sorted, filtered rows for a list view that only draws what is visible.
+
+    Each sort order is computed once per set of rows; filtering walks the
+    presorted list, and a query that extends the previous one only narrows
+    the rows that already matched.
+    """
+
+    def __init__(self) -> None:
+        self.rows: list[NoteRow] = []
+        self.visible: list[NoteRow] = []
+        self.query = ""
+        self.sort_key = SORT_UPDATED
+        self.selected_path: Path | None = None
+        self._selected_index: int | None = None
+        self._orders: dict[str, list[NoteRow]] = {}
+
+    def __len__(self) -> int:
+        return len(self.visible)
+
+    def set_rows(self, rows: list[NoteRow]) -> None:
+        self.rows = rows
+        self._orders.clear()
+        self._rebuild(self.query, narrow=False)
+
+    def set_sort(self, sort_key: str) -> None:
+        if sort_key not in _SORTS or sort_key == self.sort_key:
+            return
+        self.sort_key = sort_key
+        self._rebuild(self.query, narrow=False)
+
+    def set_query(self, query: str) -> None:
+        query = query.strip().lower()
+        if query == self.query:
+            return
+        narrow = bool(self.query) and self.query in query
+        self._rebuild(query, narrow=narrow)
+
+    def _sorted_rows(self) -> list[NoteRow]:
+        ordered = self._orders.get(self.sort_key)
+        if ordered is None:
+            key, reverse = _SORTS[self.sort_key]
+            ordered = sorted(self.rows, key=key, reverse=reverse)
+            self._orders[self.sort_key] = ordered
+        return ordered
+
+    def _rebuild(self, query: str, narrow: bool) -> None:
+        source = self.visible if narrow else self._sorted_rows()
+        self.query = query
+        self.visible = [row for row in source if matches(row, query)] if query else list(source)
+        # The selection follows its note, not its position, across refreshes;
+        # a note hidden by the filter is selected again once it reappears.
+        self._selected_index = None if self.selected_path is None else self.index_of(self.selected_path)
+
+    def index_of(self, path: Path) -> int | None:
+        for index, row in enumerate(self.visible):
+            if row.path == path:
+                return index
+        return None
+
+    def selected_index(self) -> int | None:
+        return self._selected_index
+
+    def selected_row(self) -> NoteRow | None:
+        if self._selected_index is None:
+            return None
+        return self.visible[self._selected_index]
+
+    def select_index(self, index: int) -> int | None:
+        if not self.visible:
+            self.selected_path = None
+            self._selected_index = None
+            return None
+        index = max(0, min(index, len(self.visible) - 1))
+        self.selected_path = self.visible[index].path
+        self._selected_index = index
+        return index
+
+    def move_selection(self, delta: int) -> int | None:
+        current = self.selected_index()
+        if current is None:
+            # Start just above the first row, so Down and Home both land on it
+            # and End still reaches the last one.
+            return self.select_index(max(delta - 1, 0))
+        return self.select_index(current + delta)
+
+    def window(self, top: int, count: int) -> list[NoteRow]:
+        return self.visible[top:top + count]
@@ -8,8 +8,10 @@ TOKENS_CONFIG_PATH = SETTINGS_DIR / "tokens.json"
 TOOLTIPS_CONFIG_PATH = SETTINGS_DIR / "tooltips.json"
 ABOUT_MARKDOWN_PATH = SETTINGS_DIR / "about_notethis.md"
 USER_SETTINGS_PATH = SETTINGS_DIR / "user_settings.json"
+INDEX_DIR_NAME = ".index"
 
 FILE_PREFIX = "note_A"
 FILE_SUFFIX = ".md"
 AUTOSAVE_INTERVAL_MINUTES = 5
 AUTOSAVE_INTERVAL_MS = AUTOSAVE_INTERVAL_MINUTES * 60_000
+BACKUP_COUNT = 3
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+import os
+
+from . import fileio
+
+PAGE_MARGIN = 48
+LINE_HEIGHT = 14
+FONT_NAME = "Helvetica"
+FONT_SIZE = 12
+PROGRESS_EVERY_LINES = 500
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class PdfUnavailableError(RuntimeError):
+    pass
+
+
+class WidthCache:
+    """Per-character widths for one font, measured once and reused."""
+
+    def __init__(self, measure: Callable[[str], float]) -> None:
+        self.measure = measure
+        self.widths: dict[str, float] = {}
+
+    def char_width(self, char: str) -> float:
+        width = self.widths.get(char)
+        if width is None:
+            width = self.measure(char)
+            self.widths[char] = width
+        return width
+
+    def text_width(self, text: str) -> float:
+        return sum(self.char_width(char) for char in text)
+
+
+_width_caches: dict[tuple[str, float], WidthCache] = {}
+
+
+def width_cache_for(font_name: str, font_size: float) -> WidthCache:
+    key = (font_name, font_size)
+    cache = _width_caches.get(key)
+    if cache is None:
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        cache = WidthCache(lambda char: stringWidth(char, font_name, font_size))
+        _width_caches[key] = cache
+    return cache
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find("\n", start)
+        if end == -1:
+            end = length
+        yield text[start:end].rstrip("\r")
+        start = end + 1
+    if not text:
+        yield ""
+
+
+def wrap_line(line: str, max_width: float, widths: WidthCache) -> Iterator[str]:
+    """Split a line into chunks that fit within max_width, preferring spaces."""
+    chunk_start = 0
+    width = 0.0
+    last_space = -1
+    index = 0
+    while index < len(line):
+        char = line[index]
+        char_width = widths.char_width(char)
+        if width + char_width > max_width and index > chunk_start:
+            if last_space > chunk_start:
+                yield line[chunk_start:last_space]
+                chunk_start = last_space + 1
+            else:
+                yield line[chunk_start:index]
+                chunk_start = index
+            width = widths.text_width(line[chunk_start:index])
+            last_space = line.rfind(" ", chunk_start, index)
+            continue
+        if char == " ":
+            last_space = index
+        width += char_width
+        index += 1
+    if chunk_start < len(line):
+        yield line[chunk_start:]
+
+
+def iter_layout_lines(text: str, max_width: float, widths: WidthCache) -> Iterator[tuple[str, int]]:
+    """Yield (chunk, consumed) pairs; an empty chunk is a blank line."""
+    consumed = 0
+    for raw_line in iter_lines(text):
+        consumed += len(raw_line) + 1
+        line = raw_line.rstrip()
+        if not line:
+            yield "", consumed
+            continue
+        for chunk in wrap_line(line, max_width, widths):
+            yield chunk, consumed
+
+
+@dataclass(frozen=True)
+class PdfResult:
+    path: Path
+    pages: int
+
+
+def export_pdf(
+    text: str,
+    path: Path,
+    progress: ProgressCallback | None = None,
+    font_name: str = FONT_NAME,
+    font_size: float = FONT_SIZE,
+) -> PdfResult:
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+    except Exception as exc:
+        raise PdfUnavailableError(
+            "PDF-export kräver paketet reportlab. Installera med: pip install reportlab"
+        ) from exc
+
+    width, height = A4
+    widths = width_cache_for(font_name, font_size)
+    total = max(len(text), 1)
+
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        # Page streams are compressed and the text is wrapped lazily line by
+        # line, so long notes never exist as one big list of wrapped lines.
+        c = canvas.Canvas(str(temp_path), pagesize=A4, pageCompression=1)
+        c.setFont(font_name, font_size)
+        pages = 1
+        y = height - PAGE_MARGIN
+        for line_number, (chunk, consumed) in enumerate(
+            iter_layout_lines(text, width - 2 * PAGE_MARGIN, widths), start=1
+        ):
+            if y <= PAGE_MARGIN:
+                c.showPage()
+                c.setFont(font_name, font_size)
+                pages += 1
+                y = height - PAGE_MARGIN
+            if chunk:
+                c.drawString(PAGE_MARGIN, y, chunk)
+            y -= LINE_HEIGHT
+            if progress is not None and line_number % PROGRESS_EVERY_LINES == 0:
+                progress(min(consumed, total), total)
+        c.save()
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    fileio.fsync_directory(path.parent)
+    if progress is not None:
+        progress(total, total)
+    return PdfResult(path=path, pages=pages)
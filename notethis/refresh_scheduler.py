@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Callable
+import time
+import tkinter as tk
+
+from . import diagnostics
+
+REFRESH_DELAY_MS = 40
+REFRESH_MAX_DELAY_MS = 150
+
+
+class RefreshScheduler:
+    def __init__(
+        self,
+        widget: tk.Misc,
+        stages: list[tuple[str, Callable[[], None]]],
+        delay_ms: int = REFRESH_DELAY_MS,
+        max_delay_ms: int = REFRESH_MAX_DELAY_MS,
+    ) -> None:
+        self.widget = widget
+        self.stages = stages
+        self.stage_keys = {name: f"refresh.{name}" for name, _stage in stages}
+        self.delay_ms = delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.dirty: set[str] = set()
+        self.after_id: str | None = None
+        self.idle_pending = False
+        self.first_request_at: float | None = None
+
+    @property
+    def stage_names(self) -> tuple[str, ...]:
+        return tuple(name for name, _stage in self.stages)
+
+    def request(self, *stage_names: str, debounce: bool = False) -> None:
+        self.dirty.update(stage_names or self.stage_names)
+        now = time.monotonic()
+        if self.first_request_at is None:
+            self.first_request_at = now
+
+        if self.after_id is not None:
+            if self.idle_pending:
+                return
+            self.widget.after_cancel(self.after_id)
+
+        waited_ms = (now - self.first_request_at) * 1000
+        self.idle_pending = not debounce or waited_ms >= self.max_delay_ms
+        if self.idle_pending:
+            self.after_id = self.widget.after_idle(self.flush)
+        else:
+            self.after_id = self.widget.after(self.delay_ms, self.flush)
+
+    def cancel(self) -> None:
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+        self.after_id = None
+        self.idle_pending = False
+        self.first_request_at = None
+
+    def flush(self) -> None:
+        self.after_id = None
+        self.idle_pending = False
+        self.first_request_at = None
+        dirty, self.dirty = self.dirty, set()
+        with diagnostics.measure("refresh.total"):
+            for name, stage in self.stages:
+                if name in dirty:
+                    with diagnostics.measure(self.stage_keys[name]):
+                        stage()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterator
+import re
+
+from .editor_changes import EditEvent, merge_pending_lines
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    text: str
+    regex: bool = False
+    case_sensitive: bool = False
+
+
+@lru_cache(maxsize=64)
+def compile_query(query: SearchQuery) -> re.Pattern:
+    pattern = query.text if query.regex else re.escape(query.text)
+    flags = 0 if query.case_sensitive else re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+def narrows(previous: SearchQuery, query: SearchQuery) -> bool:
+    return (
+        not previous.regex
+        and not query.regex
+        and previous.case_sensitive == query.case_sensitive
+        and query.text.startswith(previous.text)
+    )
+
+
+def find_line_matches(pattern: re.Pattern, line: str) -> list[tuple[int, int]]:
+    return [match.span() for match in pattern.finditer(line) if match.end() > match.start()]
+
+
+def find_text_matches(pattern: re.Pattern, query: SearchQuery, text: str) -> dict[int, list[tuple[int, int]]]:
+    matches: dict[int, list[tuple[int, int]]] = {}
+    if query.regex:
+        for offset, line in enumerate(text.split("\n")):
+            spans = find_line_matches(pattern, line)
+            if spans:
+                matches[offset + 1] = spans
+        return matches
+
+    line_starts = [0] + [match.end() for match in re.finditer("\n", text)]
+    for match in pattern.finditer(text):
+        line_index = bisect_right(line_starts, match.start()) - 1
+        line_start = line_starts[line_index]
+        matches.setdefault(line_index + 1, []).append((match.start() - line_start, match.end() - line_start))
+    return matches
+
+
+class SearchCache:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.query: SearchQuery | None = None
+        self.matches: dict[int, list[tuple[int, int]]] = {}
+        self.count = 0
+        self.pending: tuple[int, int] | None = None
+
+    def note_edit(self, event: EditEvent) -> None:
+        if self.query is None:
+            return
+
+        if event.old_last_line - event.first_line < len(self.matches):
+            touched = [line for line in range(event.first_line, event.old_last_line + 1) if line in self.matches]
+        else:
+            touched = [line for line in self.matches if event.first_line <= line <= event.old_last_line]
+        for line in touched:
+            self.count -= len(self.matches.pop(line))
+
+        if event.line_delta:
+            self.matches = {
+                line + event.line_delta if line > event.old_last_line else line: spans
+                for line, spans in self.matches.items()
+            }
+        self.pending = merge_pending_lines(self.pending, event)
+
+    def spans_in_range(self, first_line: int, last_line: int) -> Iterator[tuple[int, list[tuple[int, int]]]]:
+        if last_line - first_line < len(self.matches):
+            for line in range(first_line, last_line + 1):
+                if line in self.matches:
+                    yield line, self.matches[line]
+            return
+        for line, spans in self.matches.items():
+            if first_line <= line <= last_line:
+                yield line, spans
+
+    def _set_line(self, line: int, spans: list[tuple[int, int]]) -> None:
+        self.count -= len(self.matches.pop(line, ()))
+        if spans:
+            self.matches[line] = spans
+            self.count += len(spans)
+
+    def _search_pending(
+        self,
+        pattern: re.Pattern,
+        read_text: Callable[[int, int], str],
+        line_count: int,
+    ) -> tuple[int, int] | None:
+        if self.pending is None:
+            return None
+        first_line = max(1, min(self.pending[0], line_count))
+        last_line = max(first_line, min(self.pending[1], line_count))
+        self.pending = None
+        for offset, line in enumerate(read_text(first_line, last_line).split("\n")):
+            self._set_line(first_line + offset, find_line_matches(pattern, line))
+        return first_line, last_line
+
+    def update(
+        self,
+        query: SearchQuery,
+        read_text: Callable[[int, int], str],
+        line_count: int,
+    ) -> tuple[int, int] | None:
+        pattern = compile_query(query)
+        if query == self.query:
+            return self._search_pending(pattern, read_text, line_count)
+
+        if self.query is not None and narrows(self.query, query):
+            candidates = list(self.matches)
+            self.matches = {}
+            self.count = 0
+            for line in candidates:
+                self._set_line(line, find_line_matches(pattern, read_text(line, line)))
+            self.query = query
+            self._search_pending(pattern, read_text, line_count)
+            return 1, line_count
+
+        text = read_text(1, line_count)
+        self.matches = find_text_matches(pattern, query, text)
+        self.count = sum(len(spans) for spans in self.matches.values())
+        self.query = query
+        self.pending = None
+        return 1, line_count
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import re
+
+SESSION_KEY = "session"
+TEXT_INDEX_PATTERN = re.compile(r"^\d+\.\d+$")
+
+
+@dataclass(frozen=True)
+class TabSession:
+    path: Path
+    cursor: str = "1.0"
+    yview: float = 0.0
+
+
+@dataclass(frozen=True)
+class Session:
+    tabs: tuple[TabSession, ...] = ()
+    selected: int = 0
+
+
+def _stored_path(path: Path, notes_dir: Path) -> str:
+    # Notes are stored by name so the session survives moving the app folder.
+    return path.name if path.parent == notes_dir else str(path)
+
+
+def session_to_settings(session: Session, notes_dir: Path) -> dict:
+    return {
+        "tabs": [
+            {"path": _stored_path(tab.path, notes_dir), "cursor": tab.cursor, "yview": round(tab.yview, 6)}
+            for tab in session.tabs
+        ],
+        "selected": session.selected,
+    }
+
+
+def _tab_from_settings(item: object, notes_dir: Path) -> TabSession | None:
+    if not isinstance(item, dict) or not isinstance(item.get("path"), str) or not item["path"]:
+        return None
+    path = Path(item["path"])
+    if not path.is_absolute():
+        path = notes_dir / path
+    if not path.is_file():
+        return None
+
+    cursor = item.get("cursor")
+    if not isinstance(cursor, str) or not TEXT_INDEX_PATTERN.match(cursor):
+        cursor = "1.0"
+    yview = item.get("yview")
+    if isinstance(yview, bool) or not isinstance(yview, (int, float)):
+        yview = 0.0
+    return TabSession(path=path, cursor=cursor, yview=min(max(float(yview), 0.0), 1.0))
+
+
+def session_from_settings(value: object, notes_dir: Path) -> Session:
+    if not isinstance(value, dict) or not isinstance(value.get("tabs"), list):
+        return Session()
+
+    tabs = []
+    selected = value.get("selected")
+    selected = selected if isinstance(selected, int) and not isinstance(selected, bool) else 0
+    restored_selected = 0
+    for index, item in enumerate(value["tabs"]):
+        tab = _tab_from_settings(item, notes_dir)
+        if tab is None:
+            continue
+        if index <= selected:
+            restored_selected = len(tabs)
+        tabs.append(tab)
+    return Session(tabs=tuple(tabs), selected=restored_selected)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import time
+
+# Time from the first notethis import until the main window is drawn.
+FIRST_PAINT_BUDGET_MS = 400.0
+
+FIRST_PAINT = "first_paint"
+
+
+class StartupTimer:
+    def __init__(self, started_at: float | None = None) -> None:
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+        self.marks.append((name, elapsed_ms))
+        return elapsed_ms
+
+    def elapsed(self, name: str) -> float | None:
+        for mark_name, elapsed_ms in self.marks:
+            if mark_name == name:
+                return elapsed_ms
+        return None
+
+    def over_budget(self, budget_ms: float = FIRST_PAINT_BUDGET_MS) -> bool:
+        first_paint = self.elapsed(FIRST_PAINT)
+        return first_paint is None or first_paint > budget_ms
+
+    def report(self, budget_ms: float = FIRST_PAINT_BUDGET_MS) -> str:
+        lines = []
+        previous = 0.0
+        for name, elapsed_ms in self.marks:
+            lines.append(f"{name:<16} {elapsed_ms:8.1f} ms  (+{elapsed_ms - previous:.1f})")
+            previous = elapsed_ms
+        first_paint = self.elapsed(FIRST_PAINT)
+        if first_paint is None:
+            lines.append("Fönstret ritades aldrig.")
+        else:
+            verdict = "över budget" if first_paint > budget_ms else "inom budget"
+            lines.append(f"Första ritning {first_paint:.1f} ms, {verdict} ({budget_ms:.0f} ms)")
+        return "\n".join(lines)
+
+
+timer = StartupTimer()
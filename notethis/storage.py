@@ -1,59 +1,399 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import count
 from pathlib import Path
+from typing import TYPE_CHECKING
+import json
+import os
 import re
+import threading
+import time
 
-from .paths import FILE_PREFIX, FILE_SUFFIX, NOTES_DIR, TEMPLATES_DIR
+from . import fileio
+from . import fulltext
+from . import note_index
+from . import template_catalog
+from .note_index import NoteMeta
+from .paths import BACKUP_COUNT, FILE_PREFIX, FILE_SUFFIX, INDEX_DIR_NAME, NOTES_DIR, TEMPLATES_DIR
+from .text_tools import extract_note_title
 
+if TYPE_CHECKING:
+    from . import fs_watcher
 
-def list_note_files() -> list[Path]:
+SEQUENCE_FILE_NAME = "sequence.json"
+SEQUENCE_LOCK_FILE_NAME = "sequence.lock"
+SEQUENCE_LOCK_TIMEOUT_SECONDS = 5
+# A staged backup is rotated into place within moments; one this old was
+# orphaned by a process that exited before its backup thread ran.
+STAGED_BACKUP_STALE_SECONDS = 60
+# .note_A001.md.bak-<pid>-<staged at, unix seconds>-<n>. The file is a hard
+# link to the note, so its own mtime says nothing about when it was staged.
+STAGED_BACKUP_PATTERN = re.compile(r"\.bak-(\d+)-(\d+)-\d+$")
+
+_sequence_thread_lock = threading.Lock()
+# Backup rotation and full-text compaction run on one background thread so
+# they stay out of the save that triggered them.
+_background_lock = threading.Lock()
+_background_executor: ThreadPoolExecutor | None = None
+_pending_jobs: list[Future] = []
+_staged_backup_ids = count(1)
+# (mtime_ns, size) after each write this process made, or None after a
+# delete, so the watcher can tell our own changes from everyone else's.
+_own_writes: dict[Path, tuple[int, int] | None] = {}
+_own_writes_lock = threading.Lock()
+# While a watcher feeds apply_note_changes the index for this directory is
+# kept current and listing it needs no directory walk.
+_live_notes_dir: Path | None = None
+_live_index_needs_scan = True
+# Notes this process saved since the last listing. Their metadata is read
+# once when the list is next shown, not on every autosave the watcher sees.
+_saved_since_listing: set[Path] = set()
+
+
+def note_pattern() -> str:
+    return f"{FILE_PREFIX}*{FILE_SUFFIX}"
+
+
+def list_note_metas() -> list[NoteMeta]:
+    global _live_index_needs_scan
     NOTES_DIR.mkdir(parents=True, exist_ok=True)
-    return sorted(NOTES_DIR.glob(f"{FILE_PREFIX}*{FILE_SUFFIX}"))
+    if NOTES_DIR == _live_notes_dir and not _live_index_needs_scan:
+        _refresh_saved_notes()
+        entries = note_index.load_index(NOTES_DIR)
+    else:
+        entries = note_index.refresh_index(NOTES_DIR, note_pattern())
+        _live_index_needs_scan = False
+    return [entries[name] for name in sorted(entries)]
 
 
-def list_template_files() -> list[Path]:
+def _refresh_saved_notes() -> None:
+    saved = list(_saved_since_listing)
+    _saved_since_listing.clear()
+    for file_path in saved:
+        try:
+            note_index.note_meta(file_path)
+        except FileNotFoundError:
+            continue
+    if saved:
+        note_index.flush()
+
+
+def set_live_notes_dir(notes_dir: Path | None) -> None:
+    global _live_notes_dir, _live_index_needs_scan
+    _live_notes_dir = notes_dir
+    # Changes made while nothing was watching are picked up by one walk.
+    _live_index_needs_scan = True
+    _saved_since_listing.clear()
+
+
+def _remember_own_write(file_path: Path, stat: os.stat_result | None) -> None:
+    with _own_writes_lock:
+        _own_writes[file_path] = None if stat is None else (stat.st_mtime_ns, stat.st_size)
+
+
+def is_own_write(file_path: Path, stat: os.stat_result | None) -> bool:
+    with _own_writes_lock:
+        if file_path not in _own_writes:
+            return False
+        expected = _own_writes[file_path]
+    if stat is None:
+        return expected is None
+    return expected == (stat.st_mtime_ns, stat.st_size)
+
+
+def apply_note_changes(events: list[fs_watcher.ChangeEvent]) -> list[fs_watcher.ChangeEvent]:
+    """Fold watcher events into the note and full-text indexes.
+
+    Each path is checked against the disk as it is now, so stale or
+    reordered events settle on the right state. Returns the events this
+    process did not cause itself.
+    """
+    global _live_index_needs_scan
+    from . import fs_watcher
+
+    changed: list[tuple[Path, bytes, os.stat_result]] = []
+    removed: list[str] = []
+    external: list[fs_watcher.ChangeEvent] = []
+    for event in events:
+        if event.kind == fs_watcher.RESCAN:
+            _live_index_needs_scan = True
+            external.append(event)
+            continue
+
+        try:
+            stat = event.path.stat()
+        except FileNotFoundError:
+            stat = None
+        except OSError:
+            continue
+
+        if is_own_write(event.path, stat):
+            # The full-text index already has our own saves; only the note
+            # list is behind, and it catches up when it is next shown.
+            if stat is None:
+                removed.append(event.path.name)
+                _saved_since_listing.discard(event.path)
+            else:
+                _saved_since_listing.add(event.path)
+            continue
+
+        if stat is None:
+            removed.append(event.path.name)
+            _saved_since_listing.discard(event.path)
+            fulltext.forget_note(event.path)
+            external.append(fs_watcher.ChangeEvent(fs_watcher.DELETED, event.path))
+            continue
+        try:
+            data = event.path.read_bytes()
+        except OSError:
+            # Removed since the stat; the watcher reports that delete next.
+            continue
+
+        changed.append((event.path, data, stat))
+        _saved_since_listing.discard(event.path)
+        fulltext.record_note(event.path, data.decode("utf-8", errors="replace"), stat)
+        external.append(fs_watcher.ChangeEvent(fs_watcher.CHANGED, event.path))
+
+    if changed or removed:
+        note_index.apply_changes(NOTES_DIR, changed, removed)
+    return external
+
+
+def list_note_files() -> list[Path]:
+    return [NOTES_DIR / meta.name for meta in list_note_metas()]
+
+
+def sync_fulltext_index() -> int:
+    file_stats = {meta.name: (meta.mtime_ns, meta.size) for meta in list_note_metas()}
+    with fulltext.index_lock:
+        changed = fulltext.get_index(NOTES_DIR).sync(file_stats)
+    _schedule_fulltext_compaction(NOTES_DIR)
+    return changed
+
+
+def reindex_notes(full: bool = False) -> tuple[int, int]:
+    if full:
+        note_index.reset_index(NOTES_DIR)
+        fulltext.reset_index(NOTES_DIR)
+    note_count = len(list_note_metas())
+    changed = sync_fulltext_index()
+    with fulltext.index_lock:
+        fulltext.get_index(NOTES_DIR).save()
+    return note_count, changed
+
+
+def search_notes(query: str, limit: int = 50) -> list[fulltext.SearchHit]:
+    with fulltext.index_lock:
+        return fulltext.get_index(NOTES_DIR).search(query, limit)
+
+
+def delete_note_file(file_path: Path) -> None:
+    file_path.unlink(missing_ok=True)
+    _remember_own_write(file_path, None)
+    fulltext.forget_note(file_path)
+    _schedule_fulltext_compaction(file_path.parent)
+
+
+def _template_catalog() -> template_catalog.TemplateCatalog:
+    return template_catalog.get_catalog(TEMPLATES_DIR, f"*{FILE_SUFFIX}")
+
+
+def list_templates() -> list[template_catalog.Template]:
     TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
-    return sorted(TEMPLATES_DIR.glob(f"*{FILE_SUFFIX}"))
+    return _template_catalog().refresh()
 
 
-def next_note_file() -> Path:
+def list_template_files() -> list[Path]:
+    return [template.path for template in list_templates()]
+
+
+def read_template(file_path: Path) -> template_catalog.Template:
+    return _template_catalog().get(file_path)
+
+
+def note_file_for_number(number: int) -> Path:
+    return NOTES_DIR / f"{FILE_PREFIX}{number:03d}{FILE_SUFFIX}"
+
+
+def scan_max_note_number() -> int:
     max_number = 0
-    for file_path in list_note_files():
-        name = file_path.stem
-        number_part = name.replace(FILE_PREFIX, "", 1)
-        if number_part.isdigit():
-            max_number = max(max_number, int(number_part))
+    try:
+        with os.scandir(NOTES_DIR) as scan:
+            for entry in scan:
+                name = entry.name
+                if not (name.startswith(FILE_PREFIX) and name.endswith(FILE_SUFFIX)):
+                    continue
+                number_part = name[len(FILE_PREFIX):len(name) - len(FILE_SUFFIX)]
+                if number_part.isdigit():
+                    max_number = max(max_number, int(number_part))
+    except FileNotFoundError:
+        pass
+    return max_number
 
-    next_number = max_number + 1
-    return NOTES_DIR / f"{FILE_PREFIX}{next_number:03d}{FILE_SUFFIX}"
 
+@contextmanager
+def _sequence_lock(lock_path: Path):
+    with _sequence_thread_lock, fileio.file_lock(lock_path, SEQUENCE_LOCK_TIMEOUT_SECONDS):
+        yield
 
-def write_note_file(file_path: Path, text: str, create_backup: bool = False) -> None:
-    if create_backup and file_path.exists():
-        backup_file_path = file_path.with_name(f"{file_path.name}.bak")
-        backup_file_path.unlink(missing_ok=True)
-        file_path.replace(backup_file_path)
 
-    file_path.write_text(text + "\n", encoding="utf-8")
+def _read_sequence(sequence_path: Path) -> int | None:
+    try:
+        value = json.loads(sequence_path.read_text(encoding="utf-8")).get("last")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return value if isinstance(value, int) and value >= 0 else None
 
 
-def extract_note_title(text: str) -> str:
-    for raw_line in text.splitlines():
-        line = raw_line.strip()
-        if not line:
+def next_note_file() -> Path:
+    index_dir = NOTES_DIR / INDEX_DIR_NAME
+    index_dir.mkdir(parents=True, exist_ok=True)
+    sequence_path = index_dir / SEQUENCE_FILE_NAME
+
+    with _sequence_lock(index_dir / SEQUENCE_LOCK_FILE_NAME):
+        last_number = _read_sequence(sequence_path)
+        if last_number is None:
+            last_number = scan_max_note_number()
+        next_number = last_number + 1
+        if note_file_for_number(next_number).exists():
+            next_number = max(next_number, scan_max_note_number() + 1)
+
+        fileio.atomic_write_text(sequence_path, json.dumps({"last": next_number}), durable=False)
+
+    return note_file_for_number(next_number)
+
+
+def backup_file_path(file_path: Path, slot: int) -> Path:
+    suffix = ".bak" if slot == 1 else f".bak{slot}"
+    return file_path.with_name(f"{file_path.name}{suffix}")
+
+
+def _process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        # os.kill cannot probe a process on Windows; the age check decides.
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_staged_backups(notes_dir: Path | None = None) -> int:
+    """Remove staged backups left behind by a process that died before rotating them."""
+    notes_dir = notes_dir or NOTES_DIR
+    cutoff = time.time() - STAGED_BACKUP_STALE_SECONDS
+    removed = 0
+    for staged_path in notes_dir.glob(f".{note_pattern()}.bak-*"):
+        match = STAGED_BACKUP_PATTERN.search(staged_path.name)
+        if match is None or int(match.group(2)) > cutoff or _process_alive(int(match.group(1))):
             continue
-        heading_match = re.match(r"^#{1,6}\s+(.*)$", line)
-        if heading_match:
-            return heading_match.group(1).strip()
-        return line
-    return ""
+        try:
+            staged_path.unlink()
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def _stage_backup(file_path: Path) -> Path | bytes | None:
+    staged_at = int(time.time())
+    staged_path = file_path.with_name(f".{file_path.name}.bak-{os.getpid()}-{staged_at}-{next(_staged_backup_ids)}")
+    try:
+        os.link(file_path, staged_path)
+        return staged_path
+    except FileNotFoundError:
+        return None
+    except OSError:
+        pass
+
+    try:
+        return file_path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _rotate_backups(file_path: Path, staged: Path | bytes, backup_count: int) -> None:
+    for slot in range(backup_count, 1, -1):
+        older = backup_file_path(file_path, slot - 1)
+        if older.exists():
+            os.replace(older, backup_file_path(file_path, slot))
+
+    newest = backup_file_path(file_path, 1)
+    if isinstance(staged, bytes):
+        fileio.atomic_write_bytes(newest, staged, durable=False)
+    else:
+        os.replace(staged, newest)
+
+
+def flush_backups() -> None:
+    """Wait for backup rotations and index compactions started by earlier writes."""
+    with _background_lock:
+        pending = list(_pending_jobs)
+        _pending_jobs.clear()
+    for future in pending:
+        future.result()
+
+
+def _submit_background(job, *args) -> None:
+    global _background_executor
+    with _background_lock:
+        if _background_executor is None:
+            _background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notethis-background")
+        _pending_jobs[:] = [future for future in _pending_jobs if not future.done()]
+        _pending_jobs.append(_background_executor.submit(job, *args))
+
+
+def _submit_backup(file_path: Path, staged: Path | bytes, backup_count: int) -> None:
+    _submit_background(_rotate_backups, file_path, staged, backup_count)
+
+
+def _schedule_fulltext_compaction(notes_dir: Path) -> None:
+    if fulltext.needs_compaction(notes_dir):
+        _submit_background(fulltext.compact_if_needed, notes_dir)
+
+
+def write_note_file(
+    file_path: Path,
+    text: str,
+    create_backup: bool = False,
+    backup_count: int = BACKUP_COUNT,
+) -> None:
+    staged_backup = None
+    if create_backup and backup_count > 0:
+        staged_backup = _stage_backup(file_path)
+
+    fileio.atomic_write_text(file_path, text + "\n")
+    stat = file_path.stat()
+    _remember_own_write(file_path, stat)
+    if staged_backup is not None:
+        _submit_backup(file_path, staged_backup, backup_count)
+    fulltext.record_note(file_path, text, stat)
+    _schedule_fulltext_compaction(file_path.parent)
 
 
 def note_list_label(file_path: Path, max_chars: int = 60) -> str:
+    meta = note_index.note_meta(file_path)
+    if max_chars <= note_index.PREVIEW_CHARS:
+        return format_note_label(meta.title, meta.name, meta.preview, max_chars)
+
     text = file_path.read_text(encoding="utf-8").strip()
-    title = extract_note_title(text) or file_path.stem
-    compact_text = " ".join(text.split())
+    return format_note_label(meta.title, meta.name, " ".join(text.split()), max_chars)
+
+
+def note_list_labels(file_paths: list[Path], max_chars: int = 60) -> list[str]:
+    labels = [note_list_label(file_path, max_chars) for file_path in file_paths]
+    note_index.flush()
+    return labels
+
 
+def format_note_label(title: str, name: str, compact_text: str, max_chars: int = 60) -> str:
     if len(compact_text) > max_chars:
         preview = compact_text[:max_chars].rstrip() + "..."
     else:
@@ -62,11 +402,8 @@ def note_list_label(file_path: Path, max_chars: int = 60) -> str:
     if not preview:
         preview = "(tom anteckning)"
 
-    return f"{title} ({file_path.name}) - {preview}"
+    return f"{title} ({name}) - {preview}"
 
 
 def template_list_label(file_path: Path) -> str:
-    stem = file_path.stem
-    if "_" in stem:
-        return stem.split("_", 1)[1]
-    return stem
+    return template_catalog.template_label(file_path)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+import os
+import threading
+
+from .template_engine import DECL_PATTERN, TOKEN_PATTERN
+
+
+@dataclass(frozen=True)
+class Template:
+    path: Path
+    label: str
+    text: str
+    mtime_ns: int
+    size: int
+    variables: dict[str, str]
+    tokens: tuple[str, ...]
+
+
+def template_label(file_path: Path) -> str:
+    stem = file_path.stem
+    if "_" in stem:
+        return stem.split("_", 1)[1]
+    return stem
+
+
+def parse_template(file_path: Path, text: str, stat: os.stat_result) -> Template:
+    variables = {match.group(1).strip(): match.group(2)[1:-1] for match in DECL_PATTERN.finditer(text)}
+    return Template(
+        path=file_path,
+        label=template_label(file_path),
+        text=text,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        variables=variables,
+        tokens=tuple(dict.fromkeys(TOKEN_PATTERN.findall(text))),
+    )
+
+
+def _is_current(template: Template | None, stat: os.stat_result) -> bool:
+    return template is not None and template.mtime_ns == stat.st_mtime_ns and template.size == stat.st_size
+
+
+class TemplateCatalog:
+    def __init__(self, templates_dir: Path, pattern: str) -> None:
+        self.templates_dir = templates_dir
+        self.pattern = pattern
+        self.templates: dict[str, Template] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, file_path: Path, stat: os.stat_result) -> Template | None:
+        cached = self.templates.get(file_path.name)
+        if _is_current(cached, stat):
+            return cached
+        try:
+            text = file_path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        return parse_template(file_path, text, stat)
+
+    def refresh(self) -> list[Template]:
+        current: dict[str, Template] = {}
+        with self._lock:
+            try:
+                with os.scandir(self.templates_dir) as scan:
+                    for entry in scan:
+                        if not fnmatch(entry.name, self.pattern):
+                            continue
+                        try:
+                            if not entry.is_file():
+                                continue
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        template = self._load(Path(entry.path), stat)
+                        if template is not None:
+                            current[entry.name] = template
+            except FileNotFoundError:
+                pass
+            self.templates = current
+        return [current[name] for name in sorted(current)]
+
+    def get(self, file_path: Path) -> Template:
+        stat = file_path.stat()
+        with self._lock:
+            template = self._load(file_path, stat)
+            if template is None:
+                raise OSError(f"Kunde inte läsa mallen {file_path.name}")
+            if file_path.parent == self.templates_dir:
+                self.templates[file_path.name] = template
+        return template
+
+
+_catalogs: dict[tuple[Path, str], TemplateCatalog] = {}
+
+
+def get_catalog(templates_dir: Path, pattern: str) -> TemplateCatalog:
+    key = (templates_dir, pattern)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        catalog = TemplateCatalog(templates_dir, pattern)
+        _catalogs[key] = catalog
+    return catalog
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from typing import Callable, Optional
+import re
+
+TOKEN_PATTERN = re.compile(r"\[([A-Z0-9_]+)\]")
+DECL_PATTERN = re.compile(r"\[€\s*([^\s=\]]+)\s*=\s*(\"[^\"]*\"|'[^']*')\s*\]")
+USAGE_PATTERN = re.compile(r"€([\wÅÄÖåäö]+)(?:\[(\d+)\])?", re.UNICODE)
+LINE_BREAKS = frozenset("\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029")
+
+TokenResolver = Callable[[str], Optional[str]]
+
+
+class _NeedsLegacyRender(Exception):
+    pass
+
+
+def clean_lines(lines: list[str]) -> list[str]:
+    cleaned_lines = [line.rstrip() for line in lines]
+    start = 0
+    while start < len(cleaned_lines) and cleaned_lines[start] == "":
+        start += 1
+    return cleaned_lines[start:]
+
+
+def resolve_usage(match: re.Match, variables: dict[str, str]) -> str:
+    key = match.group(1)
+    index = match.group(2)
+    if key not in variables:
+        return match.group(0)
+    value = variables[key]
+    if index is None:
+        return value
+    parts = value.split()
+    idx = int(index)
+    if 0 <= idx < len(parts):
+        return parts[idx]
+    return ""
+
+
+def _line_safe_resolver(resolve_token: TokenResolver) -> TokenResolver:
+    checked: dict[str, str | None] = {}
+
+    def resolve(name: str) -> str | None:
+        if name not in checked:
+            value = resolve_token(name)
+            if value is not None and not LINE_BREAKS.isdisjoint(value):
+                raise _NeedsLegacyRender
+            checked[name] = value
+        return checked[name]
+
+    return resolve
+
+
+def _render_lines(text: str, resolve_token: TokenResolver | None) -> str:
+    # Lone "\r" breaks can merge with a following "\n" once declarations are
+    # removed, which only the whole-text pipeline reproduces.
+    if "\r" in text and text.count("\r") != text.count("\r\n"):
+        raise _NeedsLegacyRender
+    if resolve_token is not None:
+        resolve_token = _line_safe_resolver(resolve_token)
+
+    variables: dict[str, str] = {}
+    decls_at_top: bool | None = None
+    content_seen = False
+    cleaned: list[str] = []
+    usage_lines: list[int] = []
+    last_line_vanished = False
+
+    def collect(match: re.Match) -> str:
+        variables[match.group(1).strip()] = match.group(2)[1:-1]
+        return ""
+
+    for line in text.splitlines():
+        if resolve_token is not None and "[" in line:
+            line = _resolve_tokens(line, resolve_token)
+        if "[€" in line:
+            if decls_at_top is None:
+                first_decl = DECL_PATTERN.search(line)
+                if first_decl is not None:
+                    decls_at_top = not content_seen and line[:first_decl.start()].strip() == ""
+            line = DECL_PATTERN.sub(collect, line)
+            if "[€" in line:
+                # Possibly a declaration continued on the next line.
+                raise _NeedsLegacyRender
+        last_line_vanished = not line
+        line = line.rstrip()
+        if line:
+            content_seen = True
+        elif not cleaned:
+            continue
+        if "€" in line:
+            usage_lines.append(len(cleaned))
+        cleaned.append(line)
+
+    if last_line_vanished and text[-1] not in LINE_BREAKS and cleaned and cleaned[-1] == "":
+        # splitlines() on the resolved text would not see a final empty line.
+        cleaned.pop()
+    if decls_at_top and variables and cleaned:
+        cleaned.insert(0, "")
+        usage_lines = [index + 1 for index in usage_lines]
+
+    if variables:
+        # Usages resolve against the final declarations, so they are filled in
+        # once the walk is done, touching only the lines that contain a "€".
+        def replace_var(match: re.Match) -> str:
+            return resolve_usage(match, variables)
+
+        for index in usage_lines:
+            cleaned[index] = USAGE_PATTERN.sub(replace_var, cleaned[index])
+    return "\n".join(cleaned)
+
+
+def _resolve_tokens(text: str, resolve_token: TokenResolver) -> str:
+    def replace_token(match: re.Match) -> str:
+        value = resolve_token(match.group(1))
+        return match.group(0) if value is None else value
+
+    return TOKEN_PATTERN.sub(replace_token, text)
+
+
+def legacy_render(text: str, resolve_token: TokenResolver | None = None) -> str:
+    if resolve_token is not None:
+        text = _resolve_tokens(text, resolve_token)
+
+    variables: dict[str, str] = {}
+
+    def collect(match: re.Match) -> str:
+        variables[match.group(1).strip()] = match.group(2)[1:-1]
+        return ""
+
+    first_decl = DECL_PATTERN.search(text)
+    decls_at_top = bool(first_decl and text[:first_decl.start()].strip() == "")
+    cleaned_lines = clean_lines(DECL_PATTERN.sub(collect, text).splitlines())
+    if decls_at_top and variables and cleaned_lines:
+        cleaned_lines.insert(0, "")
+
+    def replace_var(match: re.Match) -> str:
+        return resolve_usage(match, variables)
+
+    return USAGE_PATTERN.sub(replace_var, "\n".join(cleaned_lines))
+
+
+def render(text: str, resolve_token: TokenResolver | None = None) -> str:
+    if "[€" not in text and (resolve_token is None or "[" not in text):
+        return "\n".join(clean_lines(text.splitlines()))
+    try:
+        return _render_lines(text, resolve_token)
+    except _NeedsLegacyRender:
+        return legacy_render(text, resolve_token)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+import hashlib
 import re
 
 
@@ -22,3 +24,49 @@ def parse_participant_list(text: str) -> list[str]:
         names.append(cleaned)
 
     return names
+
+
+def extract_note_title(text: str) -> str:
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        heading_match = re.match(r"^#{1,6}\s+(.*)$", line)
+        if heading_match:
+            return heading_match.group(1).strip()
+        return line
+    return ""
+
+
+def compact_prefix(text: str, limit: int) -> str:
+    parts: list[str] = []
+    length = -1
+    for match in re.finditer(r"\S+", text):
+        parts.append(match.group(0))
+        length += len(match.group(0)) + 1
+        if length >= limit:
+            break
+    return " ".join(parts)[:limit]
+
+
+def text_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class ContentBaseline:
+    """Length and digest of saved text, in place of a copy of the text."""
+
+    length: int
+    digest: str
+
+    @classmethod
+    def of(cls, text: str) -> ContentBaseline:
+        return cls(len(text), text_digest(text))
+
+    def matches(self, text: str) -> bool:
+        # The length check settles most mismatches without hashing.
+        return len(text) == self.length and text_digest(text) == self.digest
+
+
+EMPTY_BASELINE = ContentBaseline.of("")
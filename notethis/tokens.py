@@ -1,27 +1,23 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-import json
-import re
 import socket
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Tuple
 
-_token_config_cache: Dict[Path, dict] = {}
+from . import config_cache
+from . import template_engine
 
+DATE_SOURCES = frozenset({"date", "time", "datetime"})
+PLAN_SOURCES = DATE_SOURCES | {"hostname", "note_id", "created_at", "updated_at"}
 
-def load_token_config(config_path: Path) -> dict:
-    cached = _token_config_cache.get(config_path)
-    if cached is not None:
-        return cached
+_token_plan_cache: Dict[Path, Tuple[dict, TokenPlan]] = {}
 
-    try:
-        config = json.loads(config_path.read_text(encoding="utf-8"))
-    except (FileNotFoundError, json.JSONDecodeError):
-        config = {}
 
-    _token_config_cache[config_path] = config
-    return config
+def load_token_config(config_path: Path) -> dict:
+    return config_cache.load_json(config_path, {})
 
 
 def format_with_fallback(value: datetime, fmt: str) -> str:
@@ -40,45 +36,90 @@ def extract_note_id(file_path: Path | None, file_prefix: str) -> str:
     return stem
 
 
-def build_token_values(
-    config_path: Path,
-    file_path: Path | None,
-    created_at: datetime | None,
-    updated_at: datetime,
-    file_prefix: str,
-) -> dict[str, str]:
-    config = load_token_config(config_path)
-    values: dict[str, str] = {}
-    now = updated_at
-    note_created_at = created_at or updated_at
+@dataclass(frozen=True)
+class TokenSpec:
+    source: str
+    fmt: str
+
+
+@dataclass(frozen=True)
+class TokenPlan:
+    constants: dict[str, str]
+    specs: dict[str, TokenSpec]
+
+    @property
+    def names(self) -> frozenset[str]:
+        return frozenset(self.constants) | frozenset(self.specs)
+
+    def resolve(
+        self,
+        names: Iterable[str],
+        file_path: Path | None,
+        created_at: datetime | None,
+        updated_at: datetime,
+        file_prefix: str,
+    ) -> dict[str, str]:
+        values: dict[str, str] = {}
+        for name in names:
+            spec = self.specs.get(name)
+            if spec is None:
+                if name in self.constants:
+                    values[name] = self.constants[name]
+                continue
+
+            if spec.source in DATE_SOURCES:
+                values[name] = format_with_fallback(updated_at, spec.fmt)
+            elif spec.source == "hostname":
+                values[name] = host_name()
+            elif spec.source == "note_id":
+                values[name] = extract_note_id(file_path, file_prefix)
+            elif spec.source == "created_at":
+                values[name] = format_with_fallback(created_at or updated_at, spec.fmt)
+            elif spec.source == "updated_at":
+                values[name] = format_with_fallback(updated_at, spec.fmt)
+        return values
 
-    globals_config = config.get("globals", {})
-    for key, value in globals_config.items():
-        values[str(key)] = str(value)
 
-    tokens_config = config.get("tokens", {})
-    for token_group in tokens_config.values():
+@lru_cache(maxsize=1)
+def host_name() -> str:
+    return socket.gethostname()
+
+
+def compile_token_plan(config: dict) -> TokenPlan:
+    constants = {str(key): str(value) for key, value in config.get("globals", {}).items()}
+    specs: dict[str, TokenSpec] = {}
+    for token_group in config.get("tokens", {}).values():
         if not isinstance(token_group, dict):
             continue
         for token_name, token_spec in token_group.items():
             if not isinstance(token_spec, dict):
                 continue
-
             source = token_spec.get("source", "")
-            fmt = token_spec.get("format", "%Y-%m-%d")
+            if source in PLAN_SOURCES:
+                specs[token_name] = TokenSpec(source=source, fmt=token_spec.get("format", "%Y-%m-%d"))
+    return TokenPlan(constants=constants, specs=specs)
 
-            if source in {"date", "time", "datetime"}:
-                values[token_name] = format_with_fallback(now, fmt)
-            elif source == "hostname":
-                values[token_name] = socket.gethostname()
-            elif source == "note_id":
-                values[token_name] = extract_note_id(file_path, file_prefix)
-            elif source == "created_at":
-                values[token_name] = format_with_fallback(note_created_at, fmt)
-            elif source == "updated_at":
-                values[token_name] = format_with_fallback(updated_at, fmt)
 
-    return values
+def load_token_plan(config_path: Path) -> TokenPlan:
+    config = load_token_config(config_path)
+    cached = _token_plan_cache.get(config_path)
+    if cached is not None and cached[0] is config:
+        return cached[1]
+
+    plan = compile_token_plan(config)
+    _token_plan_cache[config_path] = (config, plan)
+    return plan
+
+
+def build_token_values(
+    config_path: Path,
+    file_path: Path | None,
+    created_at: datetime | None,
+    updated_at: datetime,
+    file_prefix: str,
+) -> dict[str, str]:
+    plan = load_token_plan(config_path)
+    return plan.resolve(plan.names, file_path, created_at, updated_at, file_prefix)
 
 
 def apply_tokens(
@@ -89,62 +130,22 @@ def apply_tokens(
     updated_at: datetime,
     file_prefix: str,
 ) -> str:
-    token_values = build_token_values(
-        config_path=config_path,
-        file_path=file_path,
-        created_at=created_at,
-        updated_at=updated_at,
-        file_prefix=file_prefix,
-    )
+    if "[" not in text:
+        return template_engine.render(text)
 
-    def replace_token(match: re.Match) -> str:
-        token_name = match.group(1)
-        return token_values.get(token_name, match.group(0))
+    plan = load_token_plan(config_path)
+    names = plan.names
+    resolved: dict[str, str] = {}
 
-    resolved = re.sub(r"\[([A-Z0-9_]+)\]", replace_token, text)
-    resolved = replace_dynamic_variables(resolved)
-    return resolved
+    def resolve_token(name: str) -> str | None:
+        if name not in names:
+            return None
+        if name not in resolved:
+            resolved.update(plan.resolve((name,), file_path, created_at, updated_at, file_prefix))
+        return resolved[name]
 
+    return template_engine.render(text, resolve_token)
 
-def replace_dynamic_variables(text: str) -> str:
-    variables: dict[str, str] = {}
-    decl_pattern = re.compile(r"\[€\s*([^\s=\]]+)\s*=\s*(\"[^\"]*\"|'[^']*')\s*\]")
-
-    def _collect(match: re.Match) -> str:
-        key = match.group(1).strip()
-        raw_value = match.group(2)
-        value = raw_value[1:-1]
-        variables[key] = value
-        return ""
 
-    first_decl = decl_pattern.search(text)
-    decls_at_top = bool(first_decl and text[:first_decl.start()].strip() == "")
-    without_decls = decl_pattern.sub(_collect, text)
-    cleaned_lines = []
-    for line in without_decls.splitlines():
-        cleaned_lines.append(line.rstrip())
-
-    while cleaned_lines and cleaned_lines[0] == "":
-        cleaned_lines.pop(0)
-
-    if decls_at_top and variables and cleaned_lines:
-        cleaned_lines.insert(0, "")
-
-    remaining = "\n".join(cleaned_lines)
-
-    def replace_var(match: re.Match) -> str:
-        key = match.group(1)
-        index = match.group(2)
-        if key not in variables:
-            return match.group(0)
-        value = variables[key]
-        if index is None:
-            return value
-        parts = value.split()
-        idx = int(index)
-        if 0 <= idx < len(parts):
-            return parts[idx]
-        return ""
-
-    usage_pattern = re.compile(r"€([\wÅÄÖåäö]+)(?:\[(\d+)\])?", re.UNICODE)
-    return usage_pattern.sub(replace_var, remaining)
+def replace_dynamic_variables(text: str) -> str:
+    return template_engine.render(text)
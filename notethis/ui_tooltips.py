@@ -7,9 +7,13 @@ from . import settings_store
 
 
 class ToolTip:
-    def __init__(self, widget: tk.Widget, text: str, theme_getter: Callable[[], dict]) -> None:
+    def __init__(self, widget: tk.Widget, key: str, fallback: str, theme_getter: Callable[[], dict]) -> None:
         self.widget = widget
-        self.text = text
+        self.key = key
+        self.fallback = fallback
+        # Resolved on first show so that creating the main window does not
+        # have to read the tooltip config.
+        self.text: str | None = None
         self.theme_getter = theme_getter
         self.tip_window = None
         self.after_id = None
@@ -18,6 +22,10 @@ class ToolTip:
         self.widget.bind("<Leave>", self.on_leave, add="+")
         self.widget.bind("<ButtonPress>", self.on_leave, add="+")
 
+    def refresh(self) -> None:
+        config = settings_store.load_tooltips_config()
+        self.text = tooltip_text(self.key, self.fallback) if config.get("enabled", True) else ""
+
     def on_enter(self, _event=None) -> None:
         if self.after_id is None:
             self.after_id = self.widget.after(500, self.show_tip)
@@ -30,6 +38,8 @@ class ToolTip:
 
     def show_tip(self) -> None:
         self.after_id = None
+        if self.text is None:
+            self.refresh()
         if self.tip_window is not None or not self.text:
             return
 
@@ -75,12 +85,17 @@ def attach_tooltip(
     theme_getter: Callable[[], dict],
     tooltip_objects: list[ToolTip],
 ) -> None:
-    config = settings_store.load_tooltips_config()
-    if not config.get("enabled", True):
-        return
-
-    text = tooltip_text(key, fallback)
-    if not text:
-        return
-
-    tooltip_objects.append(ToolTip(widget, text, theme_getter))
+    tooltip_objects.append(ToolTip(widget, key, fallback, theme_getter))
+
+
+def refresh_tooltips(tooltip_objects: list[ToolTip]) -> None:
+    alive = []
+    for tooltip in tooltip_objects:
+        try:
+            exists = bool(tooltip.widget.winfo_exists())
+        except tk.TclError:
+            exists = False
+        if exists:
+            tooltip.refresh()
+            alive.append(tooltip)
+    tooltip_objects[:] = alive
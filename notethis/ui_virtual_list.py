@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Callable
+import tkinter as tk
+
+from .notes_list import NotesListModel
+
+WHEEL_ROWS = 3
+
+
+class VirtualListView:
+    """A Listbox that only holds the rows currently on screen.
+
+    The scrollbar is driven from the model's length, so redrawing costs the
+    same whether the model has a hundred rows or a hundred thousand.
+    """
+
+    def __init__(self, parent: tk.Widget, model: NotesListModel, on_activate: Callable[[], None]) -> None:
+        self.model = model
+        self.on_activate = on_activate
+        self.top = 0
+        self.page_size = 1
+        self.shown: list[str] = []
+
+        self.frame = tk.Frame(parent)
+        self.scrollbar = tk.Scrollbar(self.frame, command=self.handle_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox = tk.Listbox(self.frame, activestyle="none", exportselection=False, takefocus=True)
+        self.listbox.pack(side="left", fill="both", expand=True)
+
+        self.listbox.bind("<Configure>", self.handle_resize)
+        self.listbox.bind("<Button-1>", self.handle_click)
+        self.listbox.bind("<B1-Motion>", lambda _event: "break")
+        self.listbox.bind("<Double-Button-1>", lambda _event: self.on_activate())
+        self.listbox.bind("<Return>", lambda _event: self.on_activate())
+        self.listbox.bind("<MouseWheel>", self.handle_wheel)
+        self.listbox.bind("<Button-4>", lambda _event: self.scroll_rows(-WHEEL_ROWS))
+        self.listbox.bind("<Button-5>", lambda _event: self.scroll_rows(WHEEL_ROWS))
+        for sequence, step in (("<Up>", -1), ("<Down>", 1)):
+            self.listbox.bind(sequence, lambda _event, step=step: self.move_selection(step))
+        self.listbox.bind("<Prior>", lambda _event: self.move_selection(-self.page_size))
+        self.listbox.bind("<Next>", lambda _event: self.move_selection(self.page_size))
+        self.listbox.bind("<Home>", lambda _event: self.move_selection(-len(self.model)))
+        self.listbox.bind("<End>", lambda _event: self.move_selection(len(self.model)))
+
+    def pack(self, **options) -> None:
+        self.frame.pack(**options)
+
+    def max_top(self) -> int:
+        return max(0, len(self.model) - self.page_size)
+
+    def render(self) -> None:
+        self.top = max(0, min(self.top, self.max_top()))
+        labels = [row.label for row in self.model.window(self.top, self.page_size)]
+        if labels != self.shown:
+            self.listbox.delete(0, tk.END)
+            if labels:
+                self.listbox.insert(tk.END, *labels)
+            self.shown = labels
+
+        self.listbox.selection_clear(0, tk.END)
+        selected = self.model.selected_index()
+        if selected is not None and self.top <= selected < self.top + len(labels):
+            self.listbox.selection_set(selected - self.top)
+
+        total = len(self.model)
+        if total <= self.page_size:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + len(labels)) / total)
+
+    def refresh(self) -> None:
+        # Called after the model changed; keep the selected note in view.
+        self.shown = []
+        self.ensure_visible(self.model.selected_index())
+        self.render()
+
+    def ensure_visible(self, index: int | None) -> None:
+        if index is None:
+            return
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.page_size:
+            self.top = index - self.page_size + 1
+
+    def scroll_rows(self, rows: int) -> str:
+        self.top += rows
+        self.render()
+        return "break"
+
+    def move_selection(self, delta: int) -> str:
+        self.ensure_visible(self.model.move_selection(delta))
+        self.render()
+        return "break"
+
+    def handle_scrollbar(self, action: str, amount: str, unit: str | None = None) -> None:
+        if action == "moveto":
+            self.top = int(float(amount) * len(self.model))
+        elif action == "scroll":
+            step = self.page_size if unit == "pages" else 1
+            self.top += int(amount) * step
+        self.render()
+
+    def handle_wheel(self, event: tk.Event) -> str:
+        direction = -1 if event.delta > 0 else 1
+        return self.scroll_rows(direction * WHEEL_ROWS)
+
+    def handle_resize(self, event: tk.Event) -> None:
+        row_height = max(1, self.listbox.bbox(0)[3] if self.listbox.bbox(0) else 16)
+        page_size = max(1, event.height // row_height)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render()
+
+    def handle_click(self, event: tk.Event) -> str:
+        self.listbox.focus_set()
+        if self.shown:
+            row = self.listbox.nearest(event.y)
+            self.model.select_index(self.top + row)
+            self.render()
+        return "break"
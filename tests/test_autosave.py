@@ -0,0 +1,88 @@
+from datetime import datetime
+from pathlib import Path
+import threading
+
+from notethis import autosave, storage
+from notethis.paths import TOKENS_CONFIG_PATH
+from notethis.text_tools import ContentBaseline
+
+
+def make_job(file_path: Path, text: str, saved_text: str | None = None, key: str = "tab1") -> autosave.AutosaveJob:
+    moment = datetime(2024, 5, 1, 9, 30)
+    return autosave.AutosaveJob(
+        key=key,
+        generation=3,
+        text=text,
+        file_path=file_path,
+        created_at=moment,
+        updated_at=moment,
+        saved=None if saved_text is None else ContentBaseline.of(saved_text),
+        config_path=TOKENS_CONFIG_PATH,
+        file_prefix="note_A",
+    )
+
+
+def test_run_autosave_job_writes_resolved_text(tmp_path: Path) -> None:
+    file_path = tmp_path / "note_A001.md"
+    result = autosave.run_autosave_job(make_job(file_path, "# Titel\nText"))
+
+    assert result.error is None
+    assert result.written
+    assert file_path.read_text(encoding="utf-8") == f"{result.resolved_text}\n"
+    assert result.saved == ContentBaseline.of(result.resolved_text)
+
+
+def test_run_autosave_job_skips_unchanged_output(tmp_path: Path) -> None:
+    file_path = tmp_path / "note_A001.md"
+    result = autosave.run_autosave_job(make_job(file_path, "Text", saved_text="Text"))
+
+    assert not result.written
+    assert not file_path.exists()
+    assert result.saved == ContentBaseline.of("Text")
+
+
+def test_run_autosave_job_reports_errors(tmp_path: Path) -> None:
+    file_path = tmp_path / "saknas" / "note_A001.md"
+    result = autosave.run_autosave_job(make_job(file_path, "Text"))
+
+    assert isinstance(result.error, OSError)
+    assert not result.written
+
+
+def test_worker_returns_results_through_queue(tmp_path: Path) -> None:
+    worker = autosave.AutosaveWorker(max_workers=2)
+    try:
+        assert worker.submit(make_job(tmp_path / "note_A001.md", "Ett", key="tab1"))
+        assert worker.submit(make_job(tmp_path / "note_A002.md", "Två", key="tab2"))
+        worker.wait()
+        storage.flush_backups()
+
+        results = sorted(worker.drain(), key=lambda result: result.job.key)
+        assert [result.job.key for result in results] == ["tab1", "tab2"]
+        assert all(result.written for result in results)
+        assert not worker.has_pending()
+        assert worker.drain() == []
+    finally:
+        worker.shutdown()
+
+
+def test_worker_keeps_one_job_per_key(monkeypatch, tmp_path: Path) -> None:
+    release = threading.Event()
+    original = autosave.run_autosave_job
+
+    def blocking_job(job: autosave.AutosaveJob) -> autosave.AutosaveResult:
+        release.wait(5)
+        return original(job)
+
+    monkeypatch.setattr(autosave, "run_autosave_job", blocking_job)
+    worker = autosave.AutosaveWorker()
+    try:
+        assert worker.submit(make_job(tmp_path / "note_A001.md", "Ett"))
+        assert worker.is_pending("tab1")
+        assert not worker.submit(make_job(tmp_path / "note_A001.md", "Ett igen"))
+        release.set()
+        worker.wait("tab1")
+        assert len(worker.drain()) == 1
+    finally:
+        release.set()
+        worker.shutdown()
@@ -0,0 +1,45 @@
+from pathlib import Path
+import os
+
+import pytest
+
+from notethis import batch_export
+
+
+def write_note(path: Path, text: str, mtime_ns: int) -> Path:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_batch_exports_text_formats_and_skips_fresh_outputs(tmp_path: Path) -> None:
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    first = write_note(notes / "note_A1.md", "# Ett\n", 1_000_000_000)
+    second = write_note(notes / "note_A2.md", "# Två\n", 1_000_000_000)
+    target = tmp_path / "export"
+
+    summary = batch_export.run_batch_export([first, second], target, "txt")
+    assert summary.exported == 2
+    assert (target / "note_A1.txt").read_text(encoding="utf-8") == "# Ett\n"
+
+    write_note(second, "# Två ändrad\n", 4_000_000_000_000_000_000)
+    progress: list[tuple[int, int]] = []
+    summary = batch_export.run_batch_export(
+        [first, second], target, "txt", progress=lambda done, total: progress.append((done, total))
+    )
+    assert [outcome.status for outcome in summary.outcomes] == ["skipped", "exported"]
+    assert (target / "note_A2.txt").read_text(encoding="utf-8") == "# Två ändrad\n"
+    assert progress[-1] == (2, 2)
+
+
+def test_missing_source_is_reported_as_failure(tmp_path: Path) -> None:
+    summary = batch_export.run_batch_export([tmp_path / "saknas.md"], tmp_path / "export", "md")
+    assert summary.exported == 0
+    assert len(summary.failures) == 1
+    assert "saknas.md" in summary.format_summary()
+
+
+def test_unknown_format_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        batch_export.plan_exports([tmp_path / "a.md"], tmp_path, "docx")
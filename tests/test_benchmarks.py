@@ -0,0 +1,42 @@
+from pathlib import Path
+import json
+import random
+
+from benchmarks import corpus
+from benchmarks import run
+from notethis import storage
+from notethis import text_tools
+
+
+def test_generated_corpus_is_reproducible_and_sized(tmp_path: Path) -> None:
+    first = corpus.generate_corpus(tmp_path / "a", 5, 1 * corpus.KB, 8 * corpus.KB, seed=3)
+    second = corpus.generate_corpus(tmp_path / "b", 5, 1 * corpus.KB, 8 * corpus.KB, seed=3)
+
+    assert [path.name for path in first] == [f"note_A00{number}.md" for number in range(1, 6)]
+    assert [path.read_text(encoding="utf-8") for path in first] == [path.read_text(encoding="utf-8") for path in second]
+    assert max(path.stat().st_size for path in first) >= 8 * corpus.KB
+
+
+def test_generated_notes_contain_markdown_tokens_and_participants() -> None:
+    text = corpus.generate_note(16 * corpus.KB, random.Random(1))
+    assert text.startswith("[€ projekt")
+    assert "\n## " in text or "\n### " in text or "\n#### " in text
+    assert "- [ ] " in text
+    assert "[TODAY]" in text
+    participant_line = next(line for line in text.splitlines() if "@example.com" in line)
+    assert len(text_tools.parse_participant_list(participant_line)) >= 2
+
+
+def test_run_writes_comparable_json(tmp_path: Path) -> None:
+    preset = run.Preset(notes=4, min_size=1 * corpus.KB, max_size=2 * corpus.KB, large_note=8 * corpus.KB, repeat=1)
+    previous_notes_dir = storage.NOTES_DIR
+
+    report = run.run_benchmarks(preset, tmp_path)
+    json.dumps(report)
+
+    assert storage.NOTES_DIR == previous_notes_dir
+    names = {result["name"] for result in report["results"]}
+    assert {"storage.list_note_files[cold]", "tokens.apply_tokens[large]", "text_tools.parse_participant_list"} <= names
+    measured = [result for result in report["results"] if not result["skipped"]]
+    assert all(len(result["runs"]) == 1 and result["median"] >= 0 for result in measured)
+    assert "storage.next_note_file" in run.compare(report, report)
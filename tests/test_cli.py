@@ -0,0 +1,71 @@
+from pathlib import Path
+import json
+import subprocess
+import sys
+
+from notethis import cli
+from notethis import storage
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def use_dirs(monkeypatch, tmp_path: Path) -> tuple[Path, Path]:
+    notes_dir = tmp_path / "notes"
+    templates_dir = tmp_path / "templates"
+    notes_dir.mkdir()
+    templates_dir.mkdir()
+    monkeypatch.setattr(storage, "NOTES_DIR", notes_dir)
+    monkeypatch.setattr(storage, "TEMPLATES_DIR", templates_dir)
+    return notes_dir, templates_dir
+
+
+def test_cli_does_not_import_tkinter() -> None:
+    code = (
+        "import sys\n"
+        "from notethis import cli, exporting, batch_export\n"
+        "cli.build_parser()\n"
+        "assert 'tkinter' not in sys.modules, sorted(m for m in sys.modules if 'tk' in m)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True)
+
+
+def test_list_and_search_notes(monkeypatch, tmp_path: Path, capsys) -> None:
+    notes_dir, _templates_dir = use_dirs(monkeypatch, tmp_path)
+    (notes_dir / "note_A001.md").write_text("# Inköp\nmjölk och bröd\n", encoding="utf-8")
+    (notes_dir / "note_A002.md").write_text("# Möte\nagenda\n", encoding="utf-8")
+
+    assert cli.main(["list"]) == 0
+    listed = capsys.readouterr().out.splitlines()
+    assert [line.split("\t")[0] for line in listed] == ["note_A001.md", "note_A002.md"]
+
+    assert cli.main(["search", "mjölk"]) == 0
+    assert capsys.readouterr().out.startswith("note_A001.md\tInköp")
+    assert cli.main(["search", "saknas"]) == 1
+    capsys.readouterr()
+    assert cli.main(["search", "saknas", "--json"]) == 1
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def test_new_from_template_writes_next_note(monkeypatch, tmp_path: Path, capsys) -> None:
+    notes_dir, templates_dir = use_dirs(monkeypatch, tmp_path)
+    (templates_dir / "01_Möte.md").write_text("[€ rum = \"A1\"]\n# Möte i €rum\n", encoding="utf-8")
+
+    assert cli.main(["new-from-template", "möte"]) == 0
+    created = Path(capsys.readouterr().out.strip())
+    assert created.parent == notes_dir
+    assert "# Möte i A1" in created.read_text(encoding="utf-8")
+
+    assert cli.main(["new-from-template", "saknas"]) == 1
+
+
+def test_export_and_reindex(monkeypatch, tmp_path: Path, capsys) -> None:
+    notes_dir, _templates_dir = use_dirs(monkeypatch, tmp_path)
+    (notes_dir / "note_A001.md").write_text("# Ett\n", encoding="utf-8")
+    output = tmp_path / "export"
+
+    assert cli.main(["export", "--all", "--format", "txt", "--output", str(output)]) == 0
+    assert (output / "note_A001.txt").read_text(encoding="utf-8") == "# Ett\n"
+    assert "Exporterade: 1" in capsys.readouterr().out
+
+    assert cli.main(["reindex", "--full"]) == 0
+    assert capsys.readouterr().out.startswith("1 anteckningar indexerade")
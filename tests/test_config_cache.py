@@ -0,0 +1,71 @@
+from pathlib import Path
+import json
+
+from notethis import config_cache
+
+
+def write_json(path: Path, payload: dict) -> None:
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_load_json_reparses_only_when_file_changes(tmp_path: Path) -> None:
+    cache = config_cache.ConfigCache()
+    path = tmp_path / "tokens.json"
+    write_json(path, {"globals": {"APP": "NoteThis"}})
+
+    first = cache.load_json(path, {})
+    assert cache.load_json(path, {}) is first
+
+    write_json(path, {"globals": {"APP": "NoteThis", "USER": "Ny"}})
+    second = cache.load_json(path, {})
+    assert second is not first
+    assert second["globals"]["USER"] == "Ny"
+
+
+def test_missing_file_uses_default_until_created(tmp_path: Path) -> None:
+    cache = config_cache.ConfigCache()
+    path = tmp_path / "tooltips.json"
+    assert cache.load_json(path, {"enabled": False}) == {"enabled": False}
+
+    write_json(path, {"enabled": True})
+    assert cache.load_json(path, {"enabled": False}) == {"enabled": True}
+
+
+def test_invalid_json_keeps_last_good_value(tmp_path: Path) -> None:
+    cache = config_cache.ConfigCache()
+    path = tmp_path / "tokens.json"
+    write_json(path, {"globals": {"APP": "NoteThis"}})
+    cache.load_json(path, {})
+
+    path.write_text('{"globals": ', encoding="utf-8")
+    assert cache.load_json(path, {}) == {"globals": {"APP": "NoteThis"}}
+
+
+def test_poll_notifies_subscribers_once_per_change(tmp_path: Path) -> None:
+    cache = config_cache.ConfigCache()
+    path = tmp_path / "tokens.json"
+    write_json(path, {"version": 1})
+    cache.load_json(path, {})
+    seen: list[dict] = []
+    cache.subscribe(path, seen.append)
+
+    assert cache.poll() == []
+    write_json(path, {"version": 2, "extra": True})
+    assert cache.poll() == [path]
+    assert cache.poll() == []
+    assert seen == [{"version": 2, "extra": True}]
+
+
+def test_store_does_not_report_own_writes(tmp_path: Path) -> None:
+    cache = config_cache.ConfigCache()
+    path = tmp_path / "user_settings.json"
+    cache.load_json(path, {})
+    seen: list[dict] = []
+    cache.subscribe(path, seen.append)
+
+    write_json(path, {"theme_mode": "dark"})
+    cache.store(path, {"theme_mode": "dark"})
+
+    assert cache.poll() == []
+    assert seen == []
+    assert cache.load_json(path, {}) == {"theme_mode": "dark"}
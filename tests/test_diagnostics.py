@@ -0,0 +1,50 @@
+from pathlib import Path
+import json
+
+from notethis import diagnostics
+
+
+def test_measure_is_a_shared_noop_when_disabled() -> None:
+    recorder = diagnostics.Diagnostics()
+    assert recorder.measure("a") is recorder.measure("b")
+    with recorder.measure("a"):
+        pass
+    assert recorder.summary() == {}
+
+
+def test_enabled_measurements_are_recorded_per_stage() -> None:
+    recorder = diagnostics.Diagnostics()
+    recorder.enabled = True
+    with recorder.measure("refresh.stats"):
+        pass
+    with recorder.measure("refresh.stats"):
+        pass
+    summary = recorder.summary()
+    assert summary["refresh.stats"]["count"] == 2
+    assert summary["refresh.stats"]["p50"] >= 0
+
+
+def test_percentiles_use_the_ring_buffer() -> None:
+    timings = diagnostics.StageTimings(ring_size=100)
+    for value in range(1, 201):
+        timings.record(float(value))
+
+    summary = timings.summary()
+    assert summary["count"] == 200
+    assert summary["max"] == 200.0
+    assert summary["p50"] == 150.0
+    assert summary["p95"] == 195.0
+    assert summary["p99"] == 199.0
+    assert len(timings.samples) == 100
+
+
+def test_dump_writes_summary_and_samples(tmp_path: Path) -> None:
+    recorder = diagnostics.Diagnostics(ring_size=4)
+    recorder.record("save_note.write", 2.5)
+    path = tmp_path / "diagnostik.json"
+    recorder.dump(path)
+
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    assert payload["ring_size"] == 4
+    assert payload["stages"]["save_note.write"]["samples"] == [2.5]
+    assert payload["stages"]["save_note.write"]["p99"] == 2.5
@@ -0,0 +1,67 @@
+from notethis import editor_changes
+
+
+def test_tracker_counts_generations_and_length() -> None:
+    tracker = editor_changes.ChangeTracker()
+    events: list[editor_changes.EditEvent] = []
+    tracker.add_listener(events.append)
+
+    tracker._handle_edit("1", "1", "2", "", "ab\nc")
+    assert tracker.generation == 1
+    assert tracker.length == 4
+    assert events[0].line_delta == 1
+    assert tracker.is_dirty()
+
+    tracker.mark_saved("ab\nc")
+    assert not tracker.is_dirty()
+
+
+class FakeText:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def get(self, start: str, end: str) -> str:
+        if start == "1.0":
+            return self.text + "\n"
+        tail_chars = int(start.rsplit("-", 1)[1].rstrip("c"))
+        return self.text[-tail_chars:]
+
+
+def test_trailing_whitespace_does_not_make_the_tab_dirty() -> None:
+    tracker = editor_changes.ChangeTracker()
+    tracker.text_widget = FakeText("ab")
+    tracker.length = 2
+    tracker.mark_saved("ab")
+
+    tracker.text_widget.text = "ab\n\n "
+    tracker._handle_edit("1", "1", "3", "ab", "ab\n\n ")
+    assert not tracker.is_dirty()
+
+    tracker.text_widget.text = "ab\n\nc"
+    tracker._handle_edit("3", "3", "3", " ", "c")
+    assert tracker.is_dirty()
+
+
+def test_tracker_compares_digest_when_length_returns_to_saved() -> None:
+    tracker = editor_changes.ChangeTracker()
+    tracker.reset_baseline()
+    tracker._handle_edit("1", "1", "1", "", "x")
+    assert tracker.is_dirty()
+
+    tracker._handle_edit("1", "1", "1", "x", "")
+    assert tracker.length == 0
+    assert not tracker.is_dirty()
+    assert tracker.saved_generation == tracker.generation
+
+
+def test_merge_pending_lines_shifts_and_widens() -> None:
+    typed = editor_changes.EditEvent(10, 10, 10, "", "x")
+    pending = editor_changes.merge_pending_lines(None, typed)
+    assert pending == (10, 10)
+
+    pasted_above = editor_changes.EditEvent(2, 2, 5, "", "a\nb\nc\nd")
+    pending = editor_changes.merge_pending_lines(pending, pasted_above)
+    assert pending == (2, 13)
+
+    deleted_below = editor_changes.EditEvent(20, 22, 20, "x\ny\nz", "xz")
+    assert editor_changes.merge_pending_lines(pending, deleted_below) == (2, 20)
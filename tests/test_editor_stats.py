@@ -0,0 +1,37 @@
+from notethis import editor_stats
+from notethis.editor_changes import EditEvent
+
+
+def test_stats_recount_lazily_when_stale() -> None:
+    stats = editor_stats.DocumentStats()
+    reads: list[str] = []
+
+    def read_text() -> str:
+        reads.append("read")
+        return "ett två\ntre"
+
+    assert stats.counts(read_text) == (3, 11)
+    assert stats.counts(read_text) == (3, 11)
+    assert reads == ["read"]
+
+
+def test_stats_follow_edit_deltas() -> None:
+    stats = editor_stats.DocumentStats()
+    stats.recount("ett två\ntre")
+
+    stats.note_edit(EditEvent(1, 1, 1, "ett två", "ett tvåfyra fem"))
+    assert (stats.words, stats.characters) == (4, 19)
+
+    stats.note_edit(EditEvent(1, 2, 1, "ett tvåfyra fem\ntre", "etttre"))
+    assert (stats.words, stats.characters) == (1, 6)
+    assert stats.counts(lambda: "unused") == (1, 6)
+
+
+def test_large_edit_forces_full_recount() -> None:
+    stats = editor_stats.DocumentStats()
+    stats.recount("")
+    pasted = "ord " * editor_stats.FULL_RECOUNT_CHARS
+    stats.note_edit(EditEvent(1, 1, 1, "", pasted))
+
+    assert stats.stale
+    assert stats.counts(lambda: pasted) == editor_stats.text_stats(pasted)
@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import pytest
+
+from notethis import fileio
+from notethis import fs_watcher
+from notethis import note_index
+from notethis import storage
+
+PATTERN = "note_A*.md"
+
+
+def kinds(events: list[fs_watcher.ChangeEvent]) -> dict[str, str]:
+    return {event.path.name: event.kind for event in events}
+
+
+def test_polling_watcher_reports_changes_since_last_poll(tmp_path: Path) -> None:
+    existing = tmp_path / "note_A001.md"
+    existing.write_text("ett", encoding="utf-8")
+    (tmp_path / "other.txt").write_text("ignoreras", encoding="utf-8")
+    watcher = fs_watcher.PollingWatcher(tmp_path, PATTERN)
+    assert watcher.poll() == []
+
+    (tmp_path / "note_A002.md").write_text("två", encoding="utf-8")
+    existing.write_text("ett, ändrad", encoding="utf-8")
+    assert kinds(watcher.poll()) == {"note_A001.md": fs_watcher.CHANGED, "note_A002.md": fs_watcher.CHANGED}
+
+    existing.unlink()
+    assert kinds(watcher.poll()) == {"note_A001.md": fs_watcher.DELETED}
+
+
+def test_inotify_watcher_sees_atomic_writes_and_deletes(tmp_path: Path) -> None:
+    watcher = fs_watcher.create_watcher(tmp_path, PATTERN)
+    if not isinstance(watcher, fs_watcher.InotifyWatcher):
+        pytest.skip("inotify saknas")
+    try:
+        note = tmp_path / "note_A001.md"
+        fileio.atomic_write_text(note, "ett\n", durable=False)
+        fileio.atomic_write_text(note, "ett igen\n", durable=False)
+        (tmp_path / "note_A002.md").write_text("två", encoding="utf-8")
+        assert kinds(watcher.poll()) == {"note_A001.md": fs_watcher.CHANGED, "note_A002.md": fs_watcher.CHANGED}
+
+        note.unlink()
+        assert kinds(watcher.poll()) == {"note_A001.md": fs_watcher.DELETED}
+        assert watcher.poll() == []
+    finally:
+        watcher.close()
+
+
+def test_coalesce_keeps_last_event_per_path(tmp_path: Path) -> None:
+    path = tmp_path / "note_A001.md"
+    events = [
+        fs_watcher.ChangeEvent(fs_watcher.CHANGED, path),
+        fs_watcher.ChangeEvent(fs_watcher.DELETED, path),
+    ]
+    assert fs_watcher.coalesce(events) == [fs_watcher.ChangeEvent(fs_watcher.DELETED, path)]
+    rescan = fs_watcher.ChangeEvent(fs_watcher.RESCAN, tmp_path)
+    assert fs_watcher.coalesce(events + [rescan]) == [rescan]
+
+
+def test_apply_note_changes_updates_index_and_skips_own_writes(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    storage.set_live_notes_dir(tmp_path)
+    try:
+        assert storage.list_note_metas() == []
+        own = tmp_path / "note_A001.md"
+        storage.write_note_file(own, "# Egen")
+        external = tmp_path / "note_A002.md"
+        external.write_text("# Extern\n", encoding="utf-8")
+
+        read_names: list[str] = []
+        read_bytes = Path.read_bytes
+        monkeypatch.setattr(Path, "read_bytes", lambda path: read_names.append(path.name) or read_bytes(path))
+        events = [
+            fs_watcher.ChangeEvent(fs_watcher.CHANGED, own),
+            fs_watcher.ChangeEvent(fs_watcher.CHANGED, external),
+        ]
+        assert storage.apply_note_changes(events) == [events[1]]
+        assert read_names == ["note_A002.md"]
+        assert {meta.name: meta.title for meta in storage.list_note_metas()} == {
+            "note_A001.md": "Egen",
+            "note_A002.md": "Extern",
+        }
+        assert [hit.name for hit in storage.search_notes("extern")] == ["note_A002.md"]
+
+        external.unlink()
+        storage.delete_note_file(own)
+        removed = storage.apply_note_changes(
+            [fs_watcher.ChangeEvent(fs_watcher.DELETED, own), fs_watcher.ChangeEvent(fs_watcher.CHANGED, external)]
+        )
+        assert removed == [fs_watcher.ChangeEvent(fs_watcher.DELETED, external)]
+        assert note_index.load_index(tmp_path) == {}
+    finally:
+        storage.set_live_notes_dir(None)
+
+
+def test_live_index_lists_notes_without_walking(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    (tmp_path / "note_A001.md").write_text("ett", encoding="utf-8")
+    storage.set_live_notes_dir(tmp_path)
+    try:
+        assert [meta.name for meta in storage.list_note_metas()] == ["note_A001.md"]
+
+        def no_walk(*_args):
+            raise AssertionError("index walked")
+
+        monkeypatch.setattr(note_index, "refresh_index", no_walk)
+        added = tmp_path / "note_A002.md"
+        added.write_text("två", encoding="utf-8")
+        storage.apply_note_changes([fs_watcher.ChangeEvent(fs_watcher.CHANGED, added)])
+        assert [meta.name for meta in storage.list_note_metas()] == ["note_A001.md", "note_A002.md"]
+    finally:
+        storage.set_live_notes_dir(None)
@@ -0,0 +1,139 @@
+from pathlib import Path
+import json
+import os
+
+import pytest
+
+from notethis import fulltext, storage
+
+
+def index_note(index: fulltext.FullTextIndex, name: str, text: str) -> None:
+    path = index.notes_dir / name
+    path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    index.update_note(name, text, stat.st_mtime_ns, stat.st_size)
+
+
+def test_search_ranks_and_builds_snippets(tmp_path: Path) -> None:
+    index = fulltext.FullTextIndex(tmp_path)
+    index_note(index, "note_A001.md", "# Budget\nBudget för budget och möte")
+    index_note(index, "note_A002.md", "Möte om budget")
+    index_note(index, "note_A003.md", "Inget relevant")
+
+    hits = index.search("budget")
+    assert [hit.name for hit in hits] == ["note_A001.md", "note_A002.md"]
+    assert hits[0].title == "Budget"
+    assert "Budget" in hits[0].snippet
+
+    assert [hit.name for hit in index.search("möte bud")] == ["note_A001.md", "note_A002.md"]
+    assert index.search("saknas") == []
+
+
+def test_remove_and_reload_from_journal(tmp_path: Path) -> None:
+    index = fulltext.FullTextIndex(tmp_path)
+    index_note(index, "note_A001.md", "Äpple päron")
+    index_note(index, "note_A002.md", "Äpple banan")
+    (tmp_path / "note_A001.md").unlink()
+    index.remove_note("note_A001.md")
+
+    reloaded = fulltext.FullTextIndex(tmp_path)
+    reloaded.load()
+    assert [hit.name for hit in reloaded.search("äpple")] == ["note_A002.md"]
+    assert "päron" not in reloaded.postings
+
+    reloaded.save()
+    assert not (tmp_path / ".index" / fulltext.JOURNAL_FILE_NAME).exists()
+    snapshot = fulltext.FullTextIndex(tmp_path)
+    snapshot.load()
+    assert snapshot.notes["note_A002.md"].terms == {"äpple": 1, "banan": 1}
+
+
+def test_storage_writes_and_deletes_update_index(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    monkeypatch.setattr(fulltext, "_indexes", {})
+    note_path = tmp_path / "note_A001.md"
+
+    storage.write_note_file(note_path, "Projektplan för hösten")
+    assert storage.sync_fulltext_index() == 0
+    assert [hit.name for hit in storage.search_notes("projektplan")] == ["note_A001.md"]
+
+    (tmp_path / "note_A002.md").write_text("Extern projektplan", encoding="utf-8")
+    assert storage.sync_fulltext_index() == 1
+    assert len(storage.search_notes("projektplan")) == 2
+
+    storage.delete_note_file(note_path)
+    assert [hit.name for hit in storage.search_notes("projektplan")] == ["note_A002.md"]
+
+
+def test_journal_keeps_metadata_and_compacts_off_the_save_path(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    note = tmp_path / "note_A001.md"
+    journal = tmp_path / ".index" / fulltext.JOURNAL_FILE_NAME
+
+    note.write_text("Revision\n", encoding="utf-8")
+    for revision in range(fulltext.COMPACT_AFTER_ENTRIES + 5):
+        fulltext.record_note(note, f"Revision {revision}")
+    assert tmp_path not in fulltext._indexes
+    lines = journal.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == fulltext.COMPACT_AFTER_ENTRIES + 5
+    assert all("Revision" not in line for line in lines)
+
+    storage.write_note_file(note, "Sista revisionen")
+    storage.flush_backups()
+    assert not journal.exists()
+    index = fulltext.FullTextIndex(tmp_path)
+    index.load()
+    assert index.search("sista")[0].snippet == "Sista revisionen"
+    snapshot = json.loads((tmp_path / ".index" / fulltext.SNAPSHOT_FILE_NAME).read_text(encoding="utf-8"))
+    assert "text" not in snapshot["notes"][0]
+
+
+def test_load_skips_incomplete_journal_entries(tmp_path: Path) -> None:
+    for name in ("note_A001.md", "note_A002.md"):
+        (tmp_path / name).write_text("Äpple", encoding="utf-8")
+    journal = tmp_path / ".index" / fulltext.JOURNAL_FILE_NAME
+    journal.parent.mkdir()
+    journal.write_text(
+        '{"op": "put", "name": "note_A001.md"}\n'
+        '[1, 2]\n'
+        '{"op": "del"}\n'
+        '{"op": "put", "name": "note_A002.md", "mtime_ns": 1, "size": 5}\n',
+        encoding="utf-8",
+    )
+
+    index = fulltext.FullTextIndex(tmp_path)
+    index.load()
+    assert list(index.notes) == ["note_A002.md"]
+
+
+def test_save_keeps_entries_appended_by_another_process(tmp_path: Path) -> None:
+    index = fulltext.FullTextIndex(tmp_path)
+    index_note(index, "note_A001.md", "Egen anteckning")
+
+    other = tmp_path / "note_A002.md"
+    other.write_text("Från kommandoraden", encoding="utf-8")
+    stat = other.stat()
+    with (tmp_path / ".index" / fulltext.JOURNAL_FILE_NAME).open("a", encoding="utf-8") as journal:
+        journal.write(json.dumps(fulltext.put_entry(other.name, stat.st_mtime_ns, stat.st_size)) + "\n")
+
+    index.save()
+    reloaded = fulltext.FullTextIndex(tmp_path)
+    reloaded.load()
+    assert sorted(reloaded.notes) == ["note_A001.md", "note_A002.md"]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="flock")
+def test_journal_waits_for_the_lock_of_another_process(monkeypatch, tmp_path: Path) -> None:
+    import fcntl
+
+    monkeypatch.setattr(fulltext, "LOCK_TIMEOUT_SECONDS", 0.05)
+    index_dir = tmp_path / ".index"
+    index_dir.mkdir()
+    holder = os.open(index_dir / fulltext.LOCK_FILE_NAME, os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(holder, fcntl.LOCK_EX)
+        with pytest.raises(TimeoutError):
+            fulltext.append_journal(tmp_path, {"op": "del", "name": "note_A001.md"})
+    finally:
+        os.close(holder)
+    assert fulltext.append_journal(tmp_path, {"op": "del", "name": "note_A001.md"}) >= 1
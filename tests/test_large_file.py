@@ -0,0 +1,30 @@
+from notethis import large_file
+
+
+def test_chunks_end_on_line_breaks_and_cover_the_text() -> None:
+    text = "".join(f"rad {number}\n" for number in range(1000))
+    chunks = list(large_file.iter_chunks(text, chunk_chars=100))
+
+    assert "".join(chunks) == text
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    assert max(len(chunk) for chunk in chunks) <= 100
+
+
+def test_chunks_split_a_line_longer_than_the_chunk() -> None:
+    text = "x" * 250
+    assert [len(chunk) for chunk in large_file.iter_chunks(text, chunk_chars=100)] == [100, 100, 50]
+
+
+def test_chunked_load_reports_progress() -> None:
+    load = large_file.ChunkedLoad("ett\ntvå\ntre\n", chunk_chars=4)
+    assert (load.done, load.percent) == (False, 0)
+
+    loaded = []
+    while not load.done:
+        loaded.append(load.next_chunk())
+    assert "".join(loaded) == "ett\ntvå\ntre\n"
+    assert load.percent == 100
+
+    assert large_file.ChunkedLoad("").done
+    assert large_file.is_large(large_file.LARGE_FILE_CHARS + 1)
+    assert not large_file.is_large(large_file.LARGE_FILE_CHARS)
@@ -0,0 +1,78 @@
+from pathlib import Path
+import os
+
+from notethis import note_index
+
+
+def test_refresh_index_reads_only_changed_files(monkeypatch, tmp_path: Path) -> None:
+    first = tmp_path / "note_A001.md"
+    second = tmp_path / "note_A002.md"
+    first.write_text("# Ett\nFörsta anteckningen", encoding="utf-8")
+    second.write_text("Andra", encoding="utf-8")
+
+    entries = note_index.refresh_index(tmp_path, "note_A*.md")
+    assert entries["note_A001.md"].title == "Ett"
+    assert entries["note_A001.md"].preview == "# Ett Första anteckningen"
+
+    second.write_text("Andra ändrad", encoding="utf-8")
+    os.utime(second, ns=(second.stat().st_atime_ns, second.stat().st_mtime_ns + 1_000_000))
+
+    read_paths: list[Path] = []
+    original = note_index._read_meta
+
+    def tracking_read(item):
+        read_paths.append(item[0])
+        return original(item)
+
+    monkeypatch.setattr(note_index, "_read_meta", tracking_read)
+    entries = note_index.refresh_index(tmp_path, "note_A*.md")
+    assert read_paths == [second]
+    assert entries["note_A002.md"].title == "Andra ändrad"
+
+
+def test_refresh_index_persists_and_drops_deleted(tmp_path: Path) -> None:
+    (tmp_path / "note_A001.md").write_text("Ett", encoding="utf-8")
+    (tmp_path / "note_A002.md").write_text("Två", encoding="utf-8")
+    note_index.refresh_index(tmp_path, "note_A*.md")
+
+    (tmp_path / "note_A002.md").unlink()
+    note_index._indexes.clear()
+    entries = note_index.refresh_index(tmp_path, "note_A*.md")
+    assert sorted(entries) == ["note_A001.md"]
+
+    note_index._indexes.clear()
+    assert sorted(note_index.load_index(tmp_path)) == ["note_A001.md"]
+
+
+def test_refresh_index_parallel_cold_start(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(note_index, "PARALLEL_READ_THRESHOLD", 2)
+    for number in range(1, 6):
+        (tmp_path / f"note_A{number:03d}.md").write_text(f"Anteckning {number}", encoding="utf-8")
+
+    entries = note_index.refresh_index(tmp_path, "note_A*.md")
+    assert [entries[name].title for name in sorted(entries)] == [f"Anteckning {n}" for n in range(1, 6)]
+    assert all(len(meta.digest) == 32 for meta in entries.values())
+
+
+def test_note_meta_batch_writes_index_once(monkeypatch, tmp_path: Path) -> None:
+    paths = []
+    for number in range(5):
+        path = tmp_path / f"note_A{number:03d}.md"
+        path.write_text(f"# Titel {number}", encoding="utf-8")
+        paths.append(path)
+
+    saves: list[Path] = []
+    original = note_index.save_index
+
+    def tracking_save(notes_dir, entries):
+        saves.append(notes_dir)
+        original(notes_dir, entries)
+
+    monkeypatch.setattr(note_index, "save_index", tracking_save)
+    assert [note_index.note_meta(path).title for path in paths] == [f"Titel {number}" for number in range(5)]
+    assert saves == []
+
+    note_index.flush()
+    assert saves == [tmp_path]
+    note_index._indexes.pop(tmp_path)
+    assert len(note_index.load_index(tmp_path)) == 5
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+from notethis import notes_list
+from notethis.note_index import NoteMeta
+
+NOTES_DIR = Path("notes")
+
+
+def make_rows(count: int) -> list[notes_list.NoteRow]:
+    rows = []
+    for number in range(count):
+        meta = NoteMeta(
+            name=f"note_A{number:03d}.md",
+            title=f"Rubrik {count - number:03d}",
+            preview="jämn" if number % 2 == 0 else "udda",
+            created=float(number),
+            updated=float(number),
+            mtime_ns=number,
+            size=10,
+            digest="",
+        )
+        rows.append(notes_list.row_from_meta(meta, NOTES_DIR, meta.name))
+    return rows
+
+
+def test_model_sorts_and_filters_rows() -> None:
+    model = notes_list.NotesListModel()
+    model.set_rows(make_rows(6))
+
+    assert [row.label for row in model.window(0, 2)] == ["note_A005.md", "note_A004.md"]
+
+    model.set_sort(notes_list.SORT_NAME)
+    assert model.window(0, 1)[0].label == "note_A000.md"
+
+    model.set_query("UDDA")
+    assert [row.label for row in model.window(0, 10)] == ["note_A001.md", "note_A003.md", "note_A005.md"]
+
+    # A longer query narrows the rows that already matched.
+    model.set_query("udda a005")
+    assert len(model) == 0
+    model.set_query("udda")
+    model.set_query("udda")
+    assert len(model) == 3
+
+
+def test_selection_follows_its_note_across_refreshes() -> None:
+    model = notes_list.NotesListModel()
+    model.set_rows(make_rows(10))
+    model.select_index(3)
+    selected = model.selected_row()
+    assert selected is not None
+
+    model.set_sort(notes_list.SORT_TITLE)
+    assert model.selected_row() == selected
+
+    model.set_query("nothing matches")
+    assert model.selected_row() is None
+    model.set_query("")
+    assert model.selected_row() == selected
+
+    model.set_rows(make_rows(10))
+    assert model.selected_row() is not None
+    assert model.selected_row().path == selected.path
+
+
+def test_move_selection_is_clamped() -> None:
+    model = notes_list.NotesListModel()
+    model.set_rows(make_rows(5))
+
+    assert model.move_selection(1) == 0
+    assert model.move_selection(100) == 4
+    assert model.move_selection(-2) == 2
+    assert model.move_selection(-100) == 0
+
+    model.set_rows([])
+    assert model.move_selection(1) is None
+    assert model.window(0, 10) == []
+
+
+def test_move_selection_without_selection_starts_at_top() -> None:
+    # Home, Up, End and Next with nothing selected yet.
+    for delta, expected in [(-5, 0), (-1, 0), (5, 4), (3, 2)]:
+        model = notes_list.NotesListModel()
+        model.set_rows(make_rows(5))
+        assert model.move_selection(delta) == expected
@@ -0,0 +1,45 @@
+from pathlib import Path
+import importlib.util
+
+import pytest
+
+from notethis import pdf_export
+
+
+def fixed_widths() -> pdf_export.WidthCache:
+    return pdf_export.WidthCache(lambda char: 1.0)
+
+
+def test_iter_lines_matches_splitlines_for_newlines() -> None:
+    for text in ["", "a", "a\n", "a\r\nb", "a\n\nb\n"]:
+        expected = text.splitlines() or [""]
+        assert list(pdf_export.iter_lines(text)) == expected
+
+
+def test_wrap_line_breaks_at_spaces_within_width() -> None:
+    chunks = list(pdf_export.wrap_line("alfa beta gamma delta", 10, fixed_widths()))
+    assert chunks == ["alfa beta", "gamma", "delta"]
+    assert all(len(chunk) <= 10 for chunk in chunks)
+
+
+def test_wrap_line_splits_long_words() -> None:
+    assert list(pdf_export.wrap_line("abcdefghij", 4, fixed_widths())) == ["abcd", "efgh", "ij"]
+
+
+def test_wrap_line_uses_measured_widths() -> None:
+    widths = pdf_export.WidthCache(lambda char: 3.0 if char == "W" else 1.0)
+    assert list(pdf_export.wrap_line("WWWiii", 6, widths)) == ["WW", "Wiii"]
+    assert widths.widths == {"W": 3.0, "i": 1.0}
+
+
+def test_layout_keeps_blank_lines_and_reports_consumed_text() -> None:
+    rows = list(pdf_export.iter_layout_lines("ab cd\n\nef", 3, fixed_widths()))
+    assert rows == [("ab", 6), ("cd", 6), ("", 7), ("ef", 10)]
+
+
+@pytest.mark.skipif(importlib.util.find_spec("reportlab") is not None, reason="reportlab is installed")
+def test_export_without_reportlab_raises_unavailable(tmp_path: Path) -> None:
+    target = tmp_path / "note.pdf"
+    with pytest.raises(pdf_export.PdfUnavailableError):
+        pdf_export.export_pdf("text", target)
+    assert not target.exists()
@@ -0,0 +1,72 @@
+from notethis import refresh_scheduler
+
+
+class FakeWidget:
+    def __init__(self) -> None:
+        self.pending: dict[str, tuple[str, object]] = {}
+        self.counter = 0
+
+    def after(self, _delay_ms: int, callback) -> str:
+        return self._schedule("after", callback)
+
+    def after_idle(self, callback) -> str:
+        return self._schedule("idle", callback)
+
+    def after_cancel(self, after_id: str) -> None:
+        self.pending.pop(after_id, None)
+
+    def _schedule(self, kind: str, callback) -> str:
+        self.counter += 1
+        after_id = f"after#{self.counter}"
+        self.pending[after_id] = (kind, callback)
+        return after_id
+
+    def run_pending(self) -> None:
+        for after_id, (_kind, callback) in list(self.pending.items()):
+            self.pending.pop(after_id, None)
+            callback()
+
+
+def make_scheduler(widget: FakeWidget, calls: list[str]) -> refresh_scheduler.RefreshScheduler:
+    stages = [(name, lambda name=name: calls.append(name)) for name in ("headings", "label", "stats", "search", "status")]
+    return refresh_scheduler.RefreshScheduler(widget, stages)
+
+
+def test_burst_of_requests_runs_each_stage_once() -> None:
+    widget = FakeWidget()
+    calls: list[str] = []
+    scheduler = make_scheduler(widget, calls)
+
+    for _ in range(5):
+        scheduler.request(debounce=True)
+    assert len(widget.pending) == 1
+
+    widget.run_pending()
+    assert calls == ["headings", "label", "stats", "search", "status"]
+
+
+def test_only_dirty_stages_run() -> None:
+    widget = FakeWidget()
+    calls: list[str] = []
+    scheduler = make_scheduler(widget, calls)
+
+    scheduler.request("status", "search")
+    scheduler.request("search", debounce=True)
+    assert [kind for kind, _callback in widget.pending.values()] == ["idle"]
+
+    widget.run_pending()
+    assert calls == ["search", "status"]
+
+
+def test_debounce_is_capped_by_max_delay(monkeypatch) -> None:
+    widget = FakeWidget()
+    scheduler = make_scheduler(widget, [])
+    clock = iter([0.0, 0.01, 0.5])
+    monkeypatch.setattr(refresh_scheduler.time, "monotonic", lambda: next(clock))
+
+    scheduler.request(debounce=True)
+    scheduler.request(debounce=True)
+    assert [kind for kind, _callback in widget.pending.values()] == ["after"]
+
+    scheduler.request(debounce=True)
+    assert [kind for kind, _callback in widget.pending.values()] == ["idle"]
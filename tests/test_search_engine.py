@@ -0,0 +1,68 @@
+import re
+
+import pytest
+
+from notethis import editor_changes, search_engine
+
+
+def reader(lines: list[str]):
+    def read_text(first_line: int, last_line: int) -> str:
+        return "\n".join(lines[first_line - 1:last_line])
+
+    return read_text
+
+
+def test_full_search_is_case_insensitive_by_default() -> None:
+    lines = ["Möte med Anna", "anna och ANNA", "ingen"]
+    cache = search_engine.SearchCache()
+
+    changed = cache.update(search_engine.SearchQuery("anna"), reader(lines), len(lines))
+    assert changed == (1, 3)
+    assert cache.count == 3
+    assert cache.matches == {1: [(9, 13)], 2: [(0, 4), (9, 13)]}
+
+
+def test_case_sensitive_and_regex_modes() -> None:
+    lines = ["Anna anna", "id-42 id-7"]
+    cache = search_engine.SearchCache()
+
+    cache.update(search_engine.SearchQuery("anna", case_sensitive=True), reader(lines), len(lines))
+    assert cache.matches == {1: [(5, 9)]}
+
+    cache.update(search_engine.SearchQuery(r"id-\d+", regex=True), reader(lines), len(lines))
+    assert cache.matches == {2: [(0, 5), (6, 10)]}
+
+    with pytest.raises(re.error):
+        cache.update(search_engine.SearchQuery("(", regex=True), reader(lines), len(lines))
+
+
+def test_extended_query_narrows_previous_lines(monkeypatch) -> None:
+    lines = ["aaab", "xyz", "aab"]
+    cache = search_engine.SearchCache()
+    cache.update(search_engine.SearchQuery("aa"), reader(lines), len(lines))
+
+    read_ranges: list[tuple[int, int]] = []
+
+    def tracking_reader(first_line: int, last_line: int) -> str:
+        read_ranges.append((first_line, last_line))
+        return reader(lines)(first_line, last_line)
+
+    cache.update(search_engine.SearchQuery("aab"), tracking_reader, len(lines))
+    assert sorted(read_ranges) == [(1, 1), (3, 3)]
+    assert cache.matches == {1: [(1, 4)], 3: [(0, 3)]}
+
+
+def test_edits_only_research_touched_lines() -> None:
+    lines = ["träff", "annat", "träff"]
+    cache = search_engine.SearchCache()
+    query = search_engine.SearchQuery("träff")
+    cache.update(query, reader(lines), len(lines))
+
+    lines[1:2] = ["ny träff", "rad"]
+    cache.note_edit(editor_changes.EditEvent(2, 2, 3, "annat", "ny träff\nrad"))
+    assert cache.matches == {1: [(0, 5)], 4: [(0, 5)]}
+
+    changed = cache.update(query, reader(lines), len(lines))
+    assert changed == (2, 3)
+    assert cache.count == 3
+    assert cache.matches[2] == [(3, 8)]
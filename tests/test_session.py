@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from notethis import session
+
+
+def test_session_round_trips_through_settings(tmp_path: Path) -> None:
+    first = tmp_path / "note_A001.md"
+    second = tmp_path / "note_A002.md"
+    outside = tmp_path / "elsewhere" / "note.md"
+    for path in (first, second, outside):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("text", encoding="utf-8")
+
+    saved = session.Session(
+        tabs=(
+            session.TabSession(first, "12.4", 0.25),
+            session.TabSession(second),
+            session.TabSession(outside, "3.0", 0.5),
+        ),
+        selected=2,
+    )
+    stored = session.session_to_settings(saved, tmp_path)
+    assert stored["tabs"][0]["path"] == "note_A001.md"
+    assert stored["tabs"][2]["path"] == str(outside)
+    assert session.session_from_settings(stored, tmp_path) == saved
+
+
+def test_session_skips_missing_and_invalid_entries(tmp_path: Path) -> None:
+    kept = tmp_path / "note_A002.md"
+    kept.write_text("text", encoding="utf-8")
+    stored = {
+        "tabs": [
+            {"path": "note_A001.md", "cursor": "1.0", "yview": 0.0},
+            {"path": "note_A002.md", "cursor": "end", "yview": 7},
+            "trasig",
+        ],
+        "selected": 0,
+    }
+
+    restored = session.session_from_settings(stored, tmp_path)
+    assert restored == session.Session(tabs=(session.TabSession(kept, "1.0", 1.0),), selected=0)
+    assert session.session_from_settings(None, tmp_path) == session.Session()
+    assert session.session_from_settings({"tabs": "x"}, tmp_path) == session.Session()
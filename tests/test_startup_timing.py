@@ -0,0 +1,21 @@
+from notethis import startup_timing
+
+
+def test_report_lists_marks_and_budget_verdict() -> None:
+    timer = startup_timing.StartupTimer(started_at=0.0)
+    timer.marks = [("imports", 40.0), ("tk_root", 90.0), (startup_timing.FIRST_PAINT, 180.0)]
+
+    report = timer.report(budget_ms=200)
+    assert report.splitlines()[1].startswith("tk_root")
+    assert "(+50.0)" in report
+    assert "inom budget" in report
+    assert not timer.over_budget(200)
+    assert timer.over_budget(150)
+
+
+def test_missing_first_paint_counts_as_over_budget() -> None:
+    timer = startup_timing.StartupTimer()
+    timer.mark("imports")
+    assert timer.elapsed("imports") is not None
+    assert timer.over_budget()
+    assert "ritades aldrig" in timer.report()
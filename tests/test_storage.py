@@ -1,4 +1,8 @@
 from pathlib import Path
+import os
+import time
+
+import pytest
 
 from notethis import storage
 
@@ -36,3 +40,148 @@ def test_next_note_file_increments(monkeypatch, tmp_path: Path) -> None:
 def test_template_list_label_strips_prefix() -> None:
     file_path = Path("01_Mall.md")
     assert storage.template_list_label(file_path) == "Mall"
+
+
+def test_list_note_files_uses_persistent_index(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    (tmp_path / "note_A001.md").write_text("# Första\nText", encoding="utf-8")
+    (tmp_path / "other.md").write_text("ignoreras", encoding="utf-8")
+
+    assert storage.list_note_files() == [tmp_path / "note_A001.md"]
+    metas = storage.list_note_metas()
+    assert metas[0].title == "Första"
+    assert (tmp_path / ".index" / "notes_meta.json").exists()
+
+
+def test_next_note_file_reserves_without_rescanning(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    (tmp_path / "note_A004.md").write_text("a", encoding="utf-8")
+
+    assert storage.next_note_file().name == "note_A005.md"
+
+    def fail_scan() -> int:
+        raise AssertionError("sekvensen ska inte skanna om katalogen")
+
+    monkeypatch.setattr(storage, "scan_max_note_number", fail_scan)
+    assert storage.next_note_file().name == "note_A006.md"
+    assert storage.next_note_file().name == "note_A007.md"
+
+
+def test_next_note_file_recovers_from_stale_sequence(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    index_dir = tmp_path / ".index"
+    index_dir.mkdir()
+    (index_dir / "sequence.json").write_text('{"last": 1}', encoding="utf-8")
+    (tmp_path / "note_A002.md").write_text("a", encoding="utf-8")
+    (tmp_path / "note_A009.md").write_text("b", encoding="utf-8")
+
+    assert storage.next_note_file().name == "note_A010.md"
+
+
+def test_next_note_file_ignores_leftover_lock_file(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    index_dir = tmp_path / ".index"
+    index_dir.mkdir()
+    (index_dir / "sequence.lock").write_text("", encoding="utf-8")
+
+    assert storage.next_note_file().name == "note_A001.md"
+    assert storage.next_note_file().name == "note_A002.md"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="flock")
+def test_next_note_file_times_out_instead_of_stealing_lock(monkeypatch, tmp_path: Path) -> None:
+    import fcntl
+
+    monkeypatch.setattr(storage, "NOTES_DIR", tmp_path)
+    monkeypatch.setattr(storage, "SEQUENCE_LOCK_TIMEOUT_SECONDS", 0.05)
+    index_dir = tmp_path / ".index"
+    index_dir.mkdir()
+    holder = os.open(index_dir / "sequence.lock", os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(holder, fcntl.LOCK_EX)
+        with pytest.raises(TimeoutError):
+            storage.next_note_file()
+        assert not (index_dir / "sequence.json").exists()
+    finally:
+        os.close(holder)
+    assert storage.next_note_file().name == "note_A001.md"
+
+
+def test_write_note_file_leaves_no_temp_files(tmp_path: Path) -> None:
+    file_path = tmp_path / "note_A001.md"
+    storage.write_note_file(file_path, "# Titel")
+
+    assert file_path.read_text(encoding="utf-8") == "# Titel\n"
+    assert sorted(path.name for path in tmp_path.iterdir() if path.is_file()) == ["note_A001.md"]
+
+
+def test_write_note_file_keeps_original_when_write_fails(monkeypatch, tmp_path: Path) -> None:
+    file_path = tmp_path / "note_A001.md"
+    file_path.write_text("original\n", encoding="utf-8")
+
+    def failing_fsync(_fd: int) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", failing_fsync)
+    try:
+        storage.write_note_file(file_path, "ny text")
+    except OSError:
+        pass
+    else:
+        raise AssertionError("write_note_file should propagate the failure")
+
+    assert file_path.read_text(encoding="utf-8") == "original\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["note_A001.md"]
+
+
+def test_write_note_file_rotates_backup_ring(tmp_path: Path) -> None:
+    file_path = tmp_path / "note_A001.md"
+    file_path.write_text("v0\n", encoding="utf-8")
+
+    for version in range(1, 5):
+        storage.write_note_file(file_path, f"v{version}", create_backup=True, backup_count=2)
+        storage.flush_backups()
+
+    assert file_path.read_text(encoding="utf-8") == "v4\n"
+    assert storage.backup_file_path(file_path, 1).read_text(encoding="utf-8") == "v3\n"
+    assert storage.backup_file_path(file_path, 2).read_text(encoding="utf-8") == "v2\n"
+    assert not storage.backup_file_path(file_path, 3).exists()
+    assert not [path for path in tmp_path.iterdir() if path.is_file() and path.name.startswith(".")]
+
+
+def test_write_note_file_backs_up_without_hard_links(monkeypatch, tmp_path: Path) -> None:
+    file_path = tmp_path / "note_A001.md"
+    file_path.write_text("gammal\n", encoding="utf-8")
+
+    def unsupported_link(_source, _target) -> None:
+        raise OSError("hard links not supported")
+
+    monkeypatch.setattr(os, "link", unsupported_link)
+    storage.write_note_file(file_path, "ny", create_backup=True)
+    storage.flush_backups()
+
+    assert storage.backup_file_path(file_path, 1).read_text(encoding="utf-8") == "gammal\n"
+
+
+def test_sweep_staged_backups_removes_only_orphans_of_dead_processes(monkeypatch, tmp_path: Path) -> None:
+    dead_pid = 999_999
+    monkeypatch.setattr(storage, "_process_alive", lambda pid: pid != dead_pid)
+    old = int(time.time()) - storage.STAGED_BACKUP_STALE_SECONDS - 10
+    orphan = tmp_path / f".note_A001.md.bak-{dead_pid}-{old}-1"
+    recent = tmp_path / f".note_A002.md.bak-{dead_pid}-{int(time.time())}-2"
+    live = tmp_path / f".note_A003.md.bak-{os.getppid()}-{old}-1"
+    for path in (orphan, recent, live):
+        path.write_text("gammal\n", encoding="utf-8")
+    # A hard-linked backup keeps the note's old mtime however recently it was staged.
+    os.utime(recent, (old, old))
+
+    assert storage.sweep_staged_backups(tmp_path) == 1
+    assert not orphan.exists()
+    assert recent.exists()
+    assert live.exists()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="os.kill")
+def test_process_alive_probes_the_pid() -> None:
+    assert storage._process_alive(os.getpid())
+    assert storage._process_alive(os.getppid())
@@ -0,0 +1,56 @@
+from pathlib import Path
+import os
+
+from notethis import template_catalog
+
+
+def write_template(path: Path, text: str, mtime_ns: int) -> None:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_refresh_parses_labels_variables_and_tokens(tmp_path: Path) -> None:
+    write_template(
+        tmp_path / "mall_01_Möte.md",
+        "[€ projekt = \"NoteThis\"]\n# Möte [DATE]\n€projekt [HOST] [DATE]\n",
+        1_000_000_000,
+    )
+    (tmp_path / "anteckning.txt").write_text("ignoreras", encoding="utf-8")
+
+    catalog = template_catalog.TemplateCatalog(tmp_path, "*.md")
+    templates = catalog.refresh()
+
+    assert [template.label for template in templates] == ["01_Möte"]
+    assert templates[0].variables == {"projekt": "NoteThis"}
+    assert templates[0].tokens == ("DATE", "HOST")
+
+
+def test_refresh_reuses_unchanged_templates(tmp_path: Path) -> None:
+    path = tmp_path / "mall_a.md"
+    write_template(path, "# A\n", 1_000_000_000)
+    catalog = template_catalog.TemplateCatalog(tmp_path, "*.md")
+
+    first = catalog.refresh()[0]
+    assert catalog.refresh()[0] is first
+    assert catalog.get(path) is first
+
+    write_template(path, "# A ändrad\n", 2_000_000_000)
+    second = catalog.refresh()[0]
+    assert second is not first
+    assert second.text == "# A ändrad\n"
+
+
+def test_refresh_drops_removed_templates(tmp_path: Path) -> None:
+    write_template(tmp_path / "mall_a.md", "# A\n", 1_000_000_000)
+    write_template(tmp_path / "mall_b.md", "# B\n", 1_000_000_000)
+    catalog = template_catalog.TemplateCatalog(tmp_path, "*.md")
+    assert len(catalog.refresh()) == 2
+
+    (tmp_path / "mall_a.md").unlink()
+    assert [template.label for template in catalog.refresh()] == ["b"]
+    assert list(catalog.templates) == ["mall_b.md"]
+
+
+def test_missing_directory_has_no_templates(tmp_path: Path) -> None:
+    catalog = template_catalog.TemplateCatalog(tmp_path / "saknas", "*.md")
+    assert catalog.refresh() == []
@@ -0,0 +1,33 @@
+import pytest
+
+from notethis import template_engine
+
+TOKENS = {"TODAY": "2026-02-19", "EMPTY": "", "SPLIT": "a\nb"}
+
+
+def resolve(name: str) -> str | None:
+    return TOKENS.get(name)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Hej €namn\n[€namn=\"Sven Gran\"]",
+        "[€x='1']\n€x\n[€x='2']",
+        "[€datum=\"[TODAY] kl 9\"]\n€datum[0]   \n\n",
+        "Rad ett\r\n[€x='1']\r\nRad €x\r\n",
+        "Rad\r[EMPTY]\nSlut",
+        "[€x=\"flera\nrader\"]\n€x[1]",
+        "Text [SPLIT] mer\n\n",
+        "€na[EMPTY]mn [€namn='ok']",
+        "  \n\n[€a='1'] \nStart €a\n[EMPTY]",
+    ],
+)
+def test_render_matches_legacy_pipeline(text: str) -> None:
+    assert template_engine.render(text, resolve) == template_engine.legacy_render(text, resolve)
+    assert template_engine.render(text) == template_engine.legacy_render(text)
+
+
+def test_render_keeps_unknown_tokens_and_trailing_usage_whitespace() -> None:
+    text = "[€tom='']\nSlut €tom\n[OKÄND]"
+    assert template_engine.render(text, resolve) == "\nSlut \n[OKÄND]"
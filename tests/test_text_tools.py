@@ -9,3 +9,18 @@ def test_parse_participant_list_quotes_and_emails() -> None:
 def test_parse_participant_list_fallback_split() -> None:
     text = "Anna Andersson, Bertil Berg; Cecilia Ceder"
     assert text_tools.parse_participant_list(text) == ["Anna Andersson", "Bertil Berg", "Cecilia Ceder"]
+
+
+def test_compact_prefix_matches_full_compaction() -> None:
+    text = "  Rad ett\n\n\tRad   två  med mer text  "
+    for limit in (0, 3, 8, 15, 100):
+        assert text_tools.compact_prefix(text, limit) == " ".join(text.split())[:limit]
+
+
+def test_content_baseline_matches_only_the_same_text() -> None:
+    baseline = text_tools.ContentBaseline.of("# Rubrik\nText")
+    assert baseline.matches("# Rubrik\nText")
+    assert not baseline.matches("# Rubrik\nTexT")
+    assert not baseline.matches("# Rubrik\nText ")
+    assert text_tools.EMPTY_BASELINE.matches("")
+    assert not hasattr(baseline, "__dict__")
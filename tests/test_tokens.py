@@ -76,3 +76,38 @@ def test_replace_dynamic_variables_with_index() -> None:
 def test_replace_dynamic_variables_multiple_on_line_and_late_decl() -> None:
     text = "Intro\n[€namn=\"Sven Gran\"] [€företag=\"Grans skog\"]\nHej €namn, på €företag."
     assert tokens.replace_dynamic_variables(text) == "Intro\n\nHej Sven Gran, på Grans skog."
+
+
+def test_apply_tokens_evaluates_only_referenced_tokens(monkeypatch, tmp_path: Path) -> None:
+    config_path = tmp_path / "tokens.json"
+    config_path.write_text(
+        json.dumps({"tokens": {"system": {"HOST": {"source": "hostname"}, "NOTE_ID": {"source": "note_id"}}}}),
+        encoding="utf-8",
+    )
+    calls: list[str] = []
+    monkeypatch.setattr(tokens, "host_name", lambda: calls.append("host") or "maskin")
+
+    def resolve(text: str) -> str:
+        return tokens.apply_tokens(
+            text=text,
+            config_path=config_path,
+            file_path=tmp_path / "note_A007.md",
+            created_at=None,
+            updated_at=datetime(2026, 2, 19, 13, 0),
+            file_prefix="note_A",
+        )
+
+    assert resolve("Ingen token här  \n\nrad") == "Ingen token här\n\nrad"
+    assert resolve("Id [NOTE_ID]") == "Id 007"
+    assert calls == []
+    assert resolve("[HOST]") == "maskin"
+    assert calls == ["host"]
+
+
+def test_token_plan_is_reused_until_config_changes(tmp_path: Path) -> None:
+    config_path = tmp_path / "tokens.json"
+    write_tokens_config(config_path)
+
+    plan = tokens.load_token_plan(config_path)
+    assert tokens.load_token_plan(config_path) is plan
+    assert plan.names == {"APP", "TODAY", "NOTE_ID", "CREATED"}